@@ -0,0 +1,67 @@
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from typing import List
+
+from src.evaluator.compiler import CompilingEvaluator
+from src.evaluator.evaluator import Evaluator
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser
+
+
+def generate(functions: int, depth: int, seed: int) -> str:
+    """
+    Functions of nested conditionals, a quarter of them on constants, and a loop calling all of them.
+    """
+    generator = Random(seed)
+
+    def branch(level: int) -> str:
+        if level == depth:
+            return f'x * {generator.randint(1, 9)} - {generator.randint(0, 9)}'
+        if generator.random() < 0.25:
+            condition = f'{generator.randint(0, 9)} > {generator.randint(0, 9)}'
+        else:
+            condition = f'x {generator.choice("<>")} {generator.randint(-50, 50)}'
+        return f'if ({condition}) {{ {branch(level + 1)} }} else {{ {branch(level + 1)} }}'
+
+    lines: List[str] = []
+    for index in range(functions):
+        lines.append(f'var f{index} = func(x) {{ {branch(0)} }};')
+    calls = ' + '.join(f'f{index}(n - 50)' for index in range(functions))
+    lines.append(f'var loop = func(n, acc) {{ if (n == 0) {{ acc }} else {{ loop(n - 1, acc + {calls}) }} }};')
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    """
+    Runs generated branch heavy scripts with the tree walking Evaluator and the CompilingEvaluator.
+
+    python -m benchmarks.branch_bench --functions 20 --depth 6 --iterations 2000
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--functions', type=int, default=20)
+    arguments.add_argument('--depth', type=int, default=6)
+    arguments.add_argument('--iterations', type=int, default=2000)
+    arguments.add_argument('--seed', type=int, default=0)
+    options = arguments.parse_args()
+
+    source = generate(options.functions, options.depth, options.seed) + f'\nloop({options.iterations}, 0);'
+    program = Parser(Lexer(source)).parse_program()
+
+    compiling: CompilingEvaluator = CompilingEvaluator(memo_size=0)
+    results = []
+    timings = []
+    for evaluator in (Evaluator(memo_size=0), compiling):
+        start = perf_counter()
+        results.append(evaluator.evaluate(program))
+        timings.append(perf_counter() - start)
+    assert results[0] == results[1], results
+
+    print(f'functions: {options.functions}, depth: {options.depth}, iterations: {options.iterations}')
+    print(f'tree walking: {timings[0]:.3f}s')
+    print(f'compiled: {timings[1]:.3f}s ({compiling.eliminated_branches} constant branches eliminated)')
+    print(f'speedup: {timings[0] / timings[1]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+from argparse import ArgumentParser
+from os import cpu_count, mkdir
+from os.path import join
+from tempfile import TemporaryDirectory
+from typing import List, Optional
+
+from src.tools.build import Build, BuildReport
+
+
+def module_source(layer: int, index: int, width: int, functions: int) -> str:
+    """
+    A module importing two modules of the layer before it and defining functions that call theirs.
+    """
+    lines: List[str] = []
+    if layer:
+        lines.extend(f'import m{layer - 1}_{(index + step) % width};' for step in (0, 1))
+    for number in range(functions):
+        callee = f'f{layer - 1}_{index % width}_{number}(x)' if layer else 'x'
+        lines.append(f'var f{layer}_{index}_{number} = func(x) {{ if (x > {number}) {{ return {callee} * 2 - 1; }} '
+                     f'{callee} + {number} }};')
+    return '\n'.join(lines) + '\n'
+
+
+def write_modules(directory: str, layers: int, width: int, functions: int) -> None:
+    for layer in range(layers):
+        for index in range(width):
+            with open(join(directory, f'm{layer}_{index}.lang'), 'w', encoding='utf-8') as module_file:
+                module_file.write(module_source(layer, index, width, functions))
+
+
+def timed(label: str, build: Build, directory: str) -> BuildReport:
+    report = build.run([directory])
+    print(f'{label}: {report.wall_seconds:.3f}s, {len(report.rebuilt)} checked, '
+          f'critical path {len(report.critical_path)} modules in {report.critical_seconds:.3f}s')
+    return report
+
+
+def main() -> None:
+    """
+    Builds a layered graph of modules from scratch with one worker and with
+    many, again without changes, and after editing the body of a function of
+    the first layer, which does not change its exports.
+
+    python -m benchmarks.build_bench --layers 8 --width 16 --functions 100
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--layers', type=int, default=8)
+    arguments.add_argument('--width', type=int, default=16)
+    arguments.add_argument('--functions', type=int, default=100)
+    arguments.add_argument('--workers', type=int, default=None)
+    options = arguments.parse_args()
+    workers: Optional[int] = options.workers or cpu_count()
+
+    with TemporaryDirectory() as root:
+        directory = join(root, 'src')
+        mkdir(directory)
+        write_modules(directory, options.layers, options.width, options.functions)
+        print(f'{options.layers * options.width} modules of {options.functions} functions')
+
+        serial = timed('cold, 1 worker', Build(join(root, 'serial.json'), 1), directory)
+        parallel = timed(f'cold, {workers} workers', Build(join(root, 'state.json'), workers), directory)
+        print(f'parallel speedup: {serial.wall_seconds / parallel.wall_seconds:.2f}x')
+
+        timed('no changes', Build(join(root, 'state.json'), workers), directory)
+        with open(join(directory, 'm0_0.lang'), 'w', encoding='utf-8') as module_file:
+            module_file.write(module_source(0, 0, options.width, options.functions).replace('* 2', '* 3'))
+        timed('one body changed', Build(join(root, 'state.json'), workers), directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+from argparse import ArgumentParser
+from mmap import ACCESS_READ, mmap
+from tempfile import TemporaryFile
+from time import perf_counter
+
+from src.lexer.lexer import Lexer
+from src.lexer.token import TokenType
+from src.lexer.vectorized import ByteLexer
+
+UNIT: str = 'var total_{0} = price * 12 + quantity_{0} / 3;\nif (total_{0} != 150) {{ total_{0} }}\n'
+
+
+def count_tokens(lexer: Lexer) -> int:
+    count = 0
+    while lexer.next_token().token_type != TokenType.EOF:
+        count += 1
+    return count
+
+
+def main() -> None:
+    """
+    Lexes a memory mapped file with ByteLexer and a sample of it with Lexer.
+
+    python -m benchmarks.byte_lexer_bench --megabytes 100
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--megabytes', type=int, default=100)
+    arguments.add_argument('--sample-megabytes', type=int, default=4)
+    options = arguments.parse_args()
+
+    units = []
+    size = 0
+    index = 0
+    while size < options.megabytes << 20:
+        unit = UNIT.format(index % 1000)
+        units.append(unit)
+        size += len(unit)
+        index += 1
+    source = ''.join(units).encode()
+    del units
+
+    with TemporaryFile() as file:
+        file.write(source)
+        file.flush()
+        with mmap(file.fileno(), 0, access=ACCESS_READ) as mapped:
+            start = perf_counter()
+            tokens = count_tokens(ByteLexer(mapped))
+            vectorized_seconds = perf_counter() - start
+
+    sample = source[:options.sample_megabytes << 20].decode()
+    sample = sample[:sample.rfind('\n') + 1]
+    start = perf_counter()
+    count_tokens(Lexer(sample))
+    lexer_seconds = (perf_counter() - start) / len(sample) * len(source)
+
+    megabytes = len(source) / (1 << 20)
+    print(f'input: {megabytes:.0f} MB, {tokens:,} tokens')
+    print(f'ByteLexer: {vectorized_seconds:.3f}s ({megabytes / vectorized_seconds:.1f} MB/s)')
+    print(f'Lexer (extrapolated from {len(sample) >> 20} MB): {lexer_seconds:.3f}s '
+          f'({megabytes / lexer_seconds:.1f} MB/s)')
+    print(f'speedup: {lexer_seconds / vectorized_seconds:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+
+from src.lexer.lexer import Lexer
+from src.parser.diff import diff_programs
+from src.parser.parser import Parser
+from src.parser.visitor import NodeVisitor
+
+
+class NodeCounter(NodeVisitor):
+
+    def __init__(self) -> None:
+        self.nodes: int = 0
+
+    def generic_visit(self, node: object) -> None:
+        self.nodes += 1
+
+
+def main() -> None:
+    """
+    Diffs a large generated program against a copy with a few edited statements.
+
+    python -m benchmarks.diff_bench --statements 200000 --edits 100
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--statements', type=int, default=200_000)
+    arguments.add_argument('--edits', type=int, default=100)
+    options = arguments.parse_args()
+
+    random = Random(0)
+    lines = [f'var v{index} = a{index} * (b + {index}) - -c / 3;' for index in range(options.statements)]
+    old_source = '\n'.join(lines)
+    for index in random.sample(range(options.statements), options.edits):
+        lines[index] = f'var v{index} = a{index} * (b + {index + 1}) - -c / 3;'
+    new_source = '\n'.join(lines)
+
+    start = perf_counter()
+    old = Parser(Lexer(old_source)).parse_program()
+    new = Parser(Lexer(new_source)).parse_program()
+    parse_seconds = perf_counter() - start
+
+    counter = NodeCounter()
+    counter.visit(old)
+    counter.visit(new)
+
+    start = perf_counter()
+    changes = diff_programs(old, new)
+    diff_seconds = perf_counter() - start
+
+    print(f'nodes: {counter.nodes}')
+    print(f'parse: {parse_seconds:.3f}s')
+    print(f'diff: {diff_seconds:.3f}s ({diff_seconds / counter.nodes * 1e9:.0f} ns/node), ' +
+          f'{len(changes)} changes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+from argparse import ArgumentParser
+from time import perf_counter
+
+from src.evaluator.evaluator import Evaluator
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser
+
+PROGRAMS = {
+    'fib': '''
+        var fib = func(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); };
+        fib({size});
+    ''',
+    'repeated small calls': '''
+        var area = func(w, h) { w * h + 2 * (w + h) };
+        var loop = func(i, acc) {
+            if (i == 0) { return acc; }
+            return loop(i - 1, acc + area(i / 100, 7) - area(3, i / 1000));
+        };
+        loop({size} * 1000, 0);
+    ''',
+}
+
+
+def main() -> None:
+    """
+    Runs pure recursive and repetitive programs with and without memoization.
+
+    python -m benchmarks.memo_bench --size 24
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--size', type=int, default=24)
+    options = arguments.parse_args()
+
+    for name, template in PROGRAMS.items():
+        program = Parser(Lexer(template.replace('{size}', str(options.size)))).parse_program()
+        seconds = {}
+        for label, evaluator in (('memoized', Evaluator()), ('plain', Evaluator(memo_size=0))):
+            start = perf_counter()
+            result = evaluator.evaluate(program)
+            seconds[label] = perf_counter() - start
+            stats = ', '.join(f'{item.name} {item.hits}/{item.misses}' for item in evaluator.memo_stats())
+            print(f'{name} {label}: {result} in {seconds[label]:.3f}s' +
+                  (f' (hits/misses: {stats})' if stats else ''))
+        print(f'{name} speedup: {seconds["plain"] / seconds["memoized"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+from argparse import ArgumentParser
+from time import perf_counter
+from typing import List
+
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser, parse_many
+
+
+def main() -> None:
+    """
+    Parses many tiny snippets with fresh instances and with parse_many.
+
+    python -m benchmarks.parse_many_bench --snippets 200000
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--snippets', type=int, default=200_000)
+    options = arguments.parse_args()
+
+    sources: List[str] = [f'x{index % 100} + {index};' for index in range(options.snippets)]
+
+    start = perf_counter()
+    for source in sources:
+        Parser(Lexer(source)).parse_program()
+    fresh_seconds = perf_counter() - start
+
+    start = perf_counter()
+    for _ in parse_many(sources):
+        pass
+    reused_seconds = perf_counter() - start
+
+    print(f'snippets: {options.snippets}')
+    print(f'fresh instances: {fresh_seconds:.3f}s ({fresh_seconds / options.snippets * 1e6:.2f} us/snippet)')
+    print(f'parse_many: {reused_seconds:.3f}s ({reused_seconds / options.snippets * 1e6:.2f} us/snippet)')
+    print(f'speedup: {fresh_seconds / reused_seconds:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+from argparse import ArgumentParser
+from time import perf_counter
+
+from src.evaluator.evaluator import Evaluator
+from src.evaluator.profiler import Profiler
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser
+
+SOURCE: str = '''
+var fib = func(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); };
+var count = func(n, acc) { if (n == 0) { return acc; } return count(n - 1, acc + 1); };
+fib({size}) + count({size} * 10000, 0);
+'''
+
+
+def main() -> None:
+    """
+    Overhead of running a program with the Profiler against the plain Evaluator.
+
+    python -m benchmarks.profiler_bench --size 20
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--size', type=int, default=20)
+    options = arguments.parse_args()
+
+    source = SOURCE.replace('{size}', str(options.size))
+    program = Parser(Lexer(source)).parse_program()
+
+    start = perf_counter()
+    plain_result = Evaluator(memo_size=0).evaluate(program)
+    plain_seconds = perf_counter() - start
+
+    profiler = Profiler(source, memo_size=0)
+    start = perf_counter()
+    profiled_result = profiler.run(program)
+    profiled_seconds = perf_counter() - start
+
+    assert plain_result == profiled_result
+    print(f'plain: {plain_seconds:.3f}s')
+    print(f'profiled: {profiled_seconds:.3f}s ({sum(profiler.profile.samples.values())} samples)')
+    print(f'overhead: {(profiled_seconds / plain_seconds - 1) * 100:.1f}%')
+
+
+if __name__ == '__main__':
+    main()
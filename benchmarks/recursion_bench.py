@@ -0,0 +1,55 @@
+from argparse import ArgumentParser
+from sys import getrecursionlimit, setrecursionlimit
+from time import perf_counter
+
+from src.evaluator.evaluator import evaluate
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser
+
+PROGRAMS = {
+    'return tail call': '''
+        var count = func(n, acc) { if (n == 0) { return acc; } return count(n - 1, acc + 1); };
+        count({depth}, 0);
+    ''',
+    'implicit tail call': '''
+        var count = func(n, acc) { if (n == 0) { acc } else { count(n - 1, acc + 1) } };
+        count({depth}, 0);
+    ''',
+    'mutual tail calls': '''
+        var even = func(n) { if (n == 0) { return true; } return odd(n - 1); };
+        var odd = func(n) { if (n == 0) { return false; } return even(n - 1); };
+        even({depth});
+    ''',
+}
+
+
+def main() -> None:
+    """
+    Runs tail recursive programs of the given depth under a small Python
+    recursion limit, which only works when the tail calls use constant stack.
+
+    python -m benchmarks.recursion_bench --depth 1000000
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--depth', type=int, default=1_000_000)
+    arguments.add_argument('--recursion-limit', type=int, default=100)
+    options = arguments.parse_args()
+
+    previous_limit = getrecursionlimit()
+    print(f'depth: {options.depth}, python recursion limit: {options.recursion_limit}')
+    for name, template in PROGRAMS.items():
+        program = Parser(Lexer(template.replace('{depth}', str(options.depth)))).parse_program()
+
+        setrecursionlimit(options.recursion_limit)
+        try:
+            start = perf_counter()
+            result = evaluate(program)
+            seconds = perf_counter() - start
+        finally:
+            setrecursionlimit(previous_limit)
+
+        print(f'{name}: {result} in {seconds:.3f}s ({seconds / options.depth * 1e6:.2f} us/call)')
+
+
+if __name__ == '__main__':
+    main()
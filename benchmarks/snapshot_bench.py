@@ -0,0 +1,64 @@
+from argparse import ArgumentParser
+from time import perf_counter
+from tracemalloc import get_traced_memory, start as start_tracing, stop as stop_tracing
+from typing import Callable, Dict, List, Tuple
+
+from src.evaluator.objects import Environment, Value
+from src.evaluator.persistent import PersistentEnvironment, PersistentMap
+
+
+def copied_session(bindings: int, names: int) -> List[Dict[str, Value]]:
+    """
+    A snapshot after every var, copying the dict of the scope.
+    """
+    environment = Environment()
+    snapshots = []
+    for index in range(bindings):
+        environment.define(f'x{index % names}', index)
+        snapshots.append(dict(environment._store))
+    return snapshots
+
+
+def persistent_session(bindings: int, names: int) -> List[PersistentMap]:
+    """
+    A snapshot after every var, keeping the version of the scope.
+    """
+    environment = PersistentEnvironment()
+    snapshots = []
+    for index in range(bindings):
+        environment.define(f'x{index % names}', index)
+        snapshots.append(environment.snapshot())
+    return snapshots
+
+
+def measure(session: Callable[[int, int], List], bindings: int, names: int) -> Tuple[float, int]:
+    start_tracing()
+    start = perf_counter()
+    snapshots = session(bindings, names)
+    seconds = perf_counter() - start
+    memory, _ = get_traced_memory()
+    stop_tracing()
+    del snapshots
+    return seconds, memory
+
+
+def main() -> None:
+    """
+    Binds names in a session with a snapshot after every binding, with dict copies and with PersistentEnvironment.
+
+    python -m benchmarks.snapshot_bench --bindings 20000 --names 5000
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--bindings', type=int, default=20_000)
+    arguments.add_argument('--names', type=int, default=5_000)
+    options = arguments.parse_args()
+
+    print(f'bindings: {options.bindings}, distinct names: {options.names}, a snapshot after every binding')
+    for label, session in (('dict copies', copied_session), ('persistent', persistent_session)):
+        seconds, memory = measure(session, options.bindings, options.names)
+        print(f'{label}: {seconds:.3f}s ({seconds / options.bindings * 1e6:.2f} us/binding), '
+              f'{memory / (1 << 20):.1f} MB ({memory / options.bindings:.0f} B/snapshot)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+
+from src.evaluator.evaluator import Evaluator
+from src.evaluator.objects import Environment
+from src.evaluator.specializer import SpecializationCache
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser
+
+SCRIPT: str = '''
+var base = tier * 100 + region * 7;
+var margin = (base * 3 - region * region + tier * 11) / 4 - (region - tier) * (region + tier);
+var fee = base + margin + (region * region - 3 * region + 12) * 5 - tier * (base / 10);
+var tax = fee * rate / 100 + (rate * rate - rate / 2) * (tier + 1);
+var limit = (threshold * weight + bonus) * (tier + region) - (weight - bonus) * (weight + bonus);
+var score = func(x) { if (x * weight + bonus * tier > limit / 2) { return x * weight * (rate + 1) + bonus - tax / 3; } x * (weight + tier * region) - margin / 5 };
+score(items) + score(items * 2) + fee - tax;
+'''
+
+
+def main() -> None:
+    """
+    Runs the same script with a few binding sets, evaluating it every time
+    and running the cached residual program of its bindings.
+
+    python -m benchmarks.specialize_bench --runs 20000 --binding-sets 4
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--runs', type=int, default=20000)
+    arguments.add_argument('--binding-sets', type=int, default=4)
+    options = arguments.parse_args()
+
+    random = Random(1)
+    binding_sets = [{'tier': random.randint(1, 5), 'region': random.randint(1, 20),
+                     'rate': random.randint(5, 25), 'threshold': 5, 'weight': 3, 'bonus': 7, 'items': 10}
+                    for _ in range(options.binding_sets)]
+    program = Parser(Lexer(SCRIPT)).parse_program()
+    cache = SpecializationCache(program)
+    evaluator = Evaluator(memo_size=0)
+
+    start = perf_counter()
+    plain = [evaluator.evaluate(program, Environment(dict(bindings)))
+             for bindings in (binding_sets[run % len(binding_sets)] for run in range(options.runs))]
+    plain_seconds = perf_counter() - start
+
+    start = perf_counter()
+    specialized = [cache.run(bindings, evaluator)
+                   for bindings in (binding_sets[run % len(binding_sets)] for run in range(options.runs))]
+    specialized_seconds = perf_counter() - start
+
+    assert plain == specialized
+    print(f'residual program: {cache.specialize(binding_sets[0])}')
+    print(f'evaluated: {plain_seconds:.3f}s ({plain_seconds / options.runs * 1e6:.1f} us/run)')
+    print(f'specialized: {specialized_seconds:.3f}s ({specialized_seconds / options.runs * 1e6:.1f} us/run, '
+          f'{cache.stats().misses} specializations)')
+    print(f'speedup: {plain_seconds / specialized_seconds:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
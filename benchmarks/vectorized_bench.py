@@ -0,0 +1,57 @@
+from argparse import ArgumentParser
+from time import perf_counter
+from typing import cast
+
+import numpy as np
+
+from src.evaluator.vectorized import evaluate_batch, evaluate_row
+from src.lexer.lexer import Lexer
+from src.parser.ast import ExpressionStatement
+from src.parser.parser import Parser
+
+RULE: str = 'price * quantity - discount / 3 > limit'
+
+
+def main() -> None:
+    """
+    Compares the vectorized batch evaluation with one evaluate_row call per record.
+
+    python -m benchmarks.vectorized_bench --rows 1000000
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--rows', type=int, default=1_000_000)
+    arguments.add_argument('--row-sample', type=int, default=20_000)
+    options = arguments.parse_args()
+
+    statement = cast(ExpressionStatement, Parser(Lexer(RULE)).parse_program().statements[0])
+    assert statement.expression
+    expression = statement.expression
+
+    generator = np.random.default_rng(0)
+    columns = {
+        'price': generator.integers(1, 1_000, options.rows),
+        'quantity': generator.integers(1, 100, options.rows),
+        'discount': generator.integers(0, 500, options.rows),
+        'limit': generator.integers(0, 30_000, options.rows),
+    }
+
+    start = perf_counter()
+    result = evaluate_batch(expression, columns)
+    batch_seconds = perf_counter() - start
+
+    sample = min(options.row_sample, options.rows)
+    start = perf_counter()
+    for index in range(sample):
+        row = {name: int(column[index]) for name, column in columns.items()}
+        assert evaluate_row(expression, row) == result[index]
+    row_seconds = (perf_counter() - start) / sample * options.rows
+
+    print(f'rule: {RULE}')
+    print(f'rows: {options.rows}')
+    print(f'batch: {batch_seconds:.3f}s ({options.rows / batch_seconds:,.0f} rows/s)')
+    print(f'per row (extrapolated from {sample} rows): {row_seconds:.3f}s')
+    print(f'speedup: {row_seconds / batch_seconds:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+from argparse import ArgumentParser
+from time import perf_counter
+from typing import Any
+
+from src.lexer.lexer import Lexer
+from src.parser.ast import ASTNode, Identifier, Program
+from src.parser.parser import Parser
+from src.parser.visitor import NodeVisitor, children
+
+
+class CountingVisitor(NodeVisitor):
+
+    def __init__(self) -> None:
+        self.nodes: int = 0
+        self.identifiers: int = 0
+
+    def generic_visit(self, node: ASTNode) -> None:
+        self.nodes += 1
+
+    def visit_Identifier(self, node: Identifier) -> None:
+        self.nodes += 1
+        self.identifiers += 1
+
+
+class GetattrVisitor:
+    """
+    The naive approach, one getattr('visit_' + name) and one Python call frame per node.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: int = 0
+        self.identifiers: int = 0
+
+    def visit(self, node: ASTNode) -> None:
+        getattr(self, f'visit_{type(node).__name__}', self.generic_visit)(node)
+        for child in children(node):
+            self.visit(child)
+
+    def generic_visit(self, node: Any) -> None:
+        self.nodes += 1
+
+    def visit_Identifier(self, node: Identifier) -> None:
+        self.nodes += 1
+        self.identifiers += 1
+
+
+def main() -> None:
+    """
+    Measures the traversal cost per node over a large Program.
+
+    python -m benchmarks.visitor_bench --statements 100000
+    """
+    arguments = ArgumentParser()
+    arguments.add_argument('--statements', type=int, default=100_000)
+    options = arguments.parse_args()
+
+    source = ''.join(f'a{index} * 2 + -b - c / {index};\n' for index in range(options.statements))
+    program: Program = Parser(Lexer(source)).parse_program()
+
+    for visitor in (CountingVisitor(), GetattrVisitor()):
+        start = perf_counter()
+        visitor.visit(program)
+        seconds = perf_counter() - start
+        print(f'{type(visitor).__name__}: {visitor.nodes} nodes in {seconds:.3f}s, ' +
+              f'{seconds / visitor.nodes * 1e9:.0f} ns/node')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,10 @@
-from src.lexer.repl import start_repl
+from sys import argv
 
+from src.cli import run
 
-def main() -> None:
-    print('Welcome to my programming language!!!')
-    print('Write a sentence for starting!!')
 
-    start_repl()
+def main() -> None:
+    raise SystemExit(run(argv[1:]))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,361 @@
+"""
+The commands import what they use when they run, so the startup of main.py
+only pays for the command being run. tools/importtime.py checks it.
+"""
+from argparse import ArgumentParser, Namespace
+from sys import stderr, stdin, stdout
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .parser.ast import Program
+
+
+def build_argument_parser() -> ArgumentParser:
+    argument_parser = ArgumentParser(prog='main.py', description='Interpreter of the language.')
+    commands = argument_parser.add_subparsers(dest='command')
+
+    repl_command = commands.add_parser('repl', help='Start the interactive REPL (default).')
+    repl_command.add_argument('--batch', action='store_true', default=None,
+                              help='Run the lines of stdin without prompts, the default when stdin is not a terminal.')
+
+    run_command = commands.add_parser('run', help='Run a program and print the value of its last statement.')
+    run_command.add_argument('file')
+    run_command.add_argument('--no-memo', action='store_true', help='Do not memoize the pure functions.')
+    run_command.add_argument('--profile', action='store_true',
+                             help='Print the time and the executions of the functions and statements to stderr.')
+    run_command.add_argument('--collapsed', metavar='PATH', default=None,
+                             help='Write the sampled stacks in the collapsed format of flamegraph.pl.')
+    run_command.add_argument('--interval', type=float, default=1.0,
+                             help='Milliseconds of CPU time between two samples.')
+
+    batch_command = commands.add_parser('batch', help='Run programs in a pool of sandboxed worker processes.')
+    batch_command.add_argument('files', nargs='*', help='Programs to run, a built in mix for --load-test when empty.')
+    batch_command.add_argument('--workers', type=int, default=None, help='Worker processes, one per CPU by default.')
+    batch_command.add_argument('--max-steps', type=int, default=100_000, help='Statements every job can execute.')
+    batch_command.add_argument('--timeout', type=float, default=5.0, help='Seconds every job can take.')
+    batch_command.add_argument('--memory', type=int, default=256, help='Megabytes every worker can allocate, 0 for no cap.')
+    batch_command.add_argument('--load-test', type=int, metavar='JOBS', default=None,
+                               help='Run the files round robin JOBS times and print the throughput and latency.')
+
+    build_command = commands.add_parser('build', help='Check the modules under the paths, only the ones that changed '
+                                                      'or whose imports changed, in worker processes.')
+    build_command.add_argument('paths', nargs='+')
+    build_command.add_argument('--workers', type=int, default=None, help='Worker processes, one per CPU by default.')
+    build_command.add_argument('--state', default=None, help='File of the last build, .language-build.json by default.')
+    build_command.add_argument('--suffix', default=None, help='Extension of the source files, .lang by default.')
+
+    format_command = commands.add_parser('format', help='Print the canonical source of the files.')
+    format_command.add_argument('files', nargs='*', help='Files to format, stdin when empty.')
+    format_command.add_argument('-i', '--in-place', action='store_true',
+                                help='Rewrite the files instead of printing them.')
+
+    diff_command = commands.add_parser('diff', help='Print the structural changes between two files.')
+    diff_command.add_argument('old')
+    diff_command.add_argument('new')
+
+    index_command = commands.add_parser('index', help='Update the symbol index with the files of the paths.')
+    index_command.add_argument('paths', nargs='+')
+    index_command.add_argument('--database', default=None, help='SQLite file, .language-index.sqlite by default.')
+    index_command.add_argument('--suffix', default=None, help='Extension of the source files, .lang by default.')
+
+    where_command = commands.add_parser('where', help='Print where a name is defined and used.')
+    where_command.add_argument('name')
+    where_command.add_argument('--database', default=None, help='SQLite file, .language-index.sqlite by default.')
+
+    daemon_command = commands.add_parser('daemon', help='Serve parse, check and format requests on a Unix socket.')
+    daemon_command.add_argument('--socket', default=None)
+    daemon_command.add_argument('--workers', type=int, default=None)
+
+    check_command = commands.add_parser('check', help='Report the parse errors of the files, through the daemon '
+                                                      'when it is running.')
+    check_command.add_argument('files', nargs='+')
+    check_command.add_argument('--socket', default=None)
+
+    return argument_parser
+
+
+def run(arguments: Optional[List[str]] = None) -> int:
+    """
+    Entry point of main.py, returns the exit status. Without arguments the
+    REPL starts without building the argument parser.
+    """
+    if arguments is not None and not arguments:
+        from .lexer.repl import start_repl
+        return start_repl()
+
+    options = build_argument_parser().parse_args(arguments)
+    if options.command == 'run':
+        return _run(options)
+    elif options.command == 'batch':
+        return _batch(options)
+    elif options.command == 'build':
+        return _build(options)
+    elif options.command == 'format':
+        return _format(options)
+    elif options.command == 'diff':
+        return _diff(options)
+    elif options.command == 'daemon':
+        from .tools.daemon import Daemon
+        try:
+            Daemon(options.socket, options.workers).run()
+        except RuntimeError as error:
+            print(error, file=stderr)
+            return 2
+        return 0
+    elif options.command == 'check':
+        return _check(options)
+    elif options.command == 'index':
+        return _index(options)
+    elif options.command == 'where':
+        return _where(options)
+
+    from .lexer.repl import start_repl
+    return start_repl(getattr(options, 'batch', None))
+
+
+def _batch(options: Namespace) -> int:
+    """
+    Prints the result of every file as it finishes, exits with 1 when one is not ok.
+    """
+    from .tools.farm import LOAD_TEST_PROGRAMS, OK, Farm, JobLimits, load_test
+
+    sources: List[str] = []
+    for path in options.files:
+        with open(path, encoding='utf-8') as source_file:
+            sources.append(source_file.read())
+    limits = JobLimits(options.max_steps, options.timeout, options.memory * 1024 * 1024 or None)
+
+    with Farm(options.workers, limits) as farm:
+        if options.load_test is not None:
+            print(load_test(farm, sources or list(LOAD_TEST_PROGRAMS.values()), options.load_test))
+            return 0
+
+        status = 0
+        for result in farm.run(zip(options.files, sources)):
+            if result.status == OK:
+                print(f'{result.job_id}: {result.value} ({result.steps} steps, '
+                      f'{result.latency_seconds * 1000:.1f} ms)')
+            else:
+                print(f'{result.job_id}: {result.status}: {result.message}', file=stderr)
+                status = 1
+        return status
+
+
+def _build(options: Namespace) -> int:
+    """
+    Prints the timings and the critical path, and the errors to stderr. Exits
+    with 1 when a module has errors and with 2 when the modules can not be built.
+    """
+    from .tools.build import DEFAULT_STATE, DEFAULT_SUFFIX, Build, BuildError
+
+    build = Build(options.state or DEFAULT_STATE, options.workers, options.suffix or DEFAULT_SUFFIX)
+    try:
+        report = build.run(options.paths)
+    except BuildError as error:
+        print(error, file=stderr)
+        return 2
+    print(report)
+    for module_error in report.errors():
+        print(module_error, file=stderr)
+    return 1 if report.errors() else 0
+
+
+def _check(options: Namespace) -> int:
+    from .tools.client import Client
+
+    def requests() -> Iterator[Tuple[str, str]]:
+        for path in options.files:
+            with open(path, encoding='utf-8') as source_file:
+                yield 'check', source_file.read()
+
+    status = 0
+    for path, result in zip(options.files, Client(options.socket).call_many(requests())):
+        for error in result['errors']:
+            print(f'{path}: {error}', file=stderr)
+            status = 1
+    return status
+
+
+def _diff(options: Namespace) -> int:
+    """
+    Exits with 1 when the files are different, like diff.
+    """
+    from .parser.diff import diff_sources
+
+    with open(options.old, encoding='utf-8') as old_file, open(options.new, encoding='utf-8') as new_file:
+        changes, errors = diff_sources(old_file.read(), new_file.read())
+    for error in errors:
+        print(error, file=stderr)
+    if errors:
+        return 2
+
+    for change in changes:
+        print(change)
+    return 1 if changes else 0
+
+
+def _format(options: Namespace) -> int:
+    from io import StringIO
+    from os import replace, unlink
+    from os.path import abspath, dirname
+    from shutil import copymode
+    from tempfile import NamedTemporaryFile
+
+    from .parser.formatter import format_program
+
+    if not options.files:
+        program = _parse_or_report(stdin.read(), '<stdin>')
+        if program is None:
+            return 1
+        format_program(program, stdout)
+        return 0
+
+    status = 0
+    for path in options.files:
+        with open(path, encoding='utf-8') as source_file:
+            program = _parse_or_report(source_file.read(), path)
+        if program is None:
+            status = 1
+            continue
+
+        if not options.in_place:
+            format_program(program, stdout)
+            continue
+
+        formatted = StringIO()
+        format_program(program, formatted)
+        source = formatted.getvalue()
+        if not _formats_back(source):
+            print(f'{path}: The formatted source does not parse back to the same program, '
+                  f'the file was not changed', file=stderr)
+            status = 1
+            continue
+
+        # Written next to the original and then renamed, so an error never leaves half a file.
+        formatted_file = NamedTemporaryFile('w', encoding='utf-8', dir=dirname(abspath(path)), delete=False)
+        try:
+            with formatted_file:
+                formatted_file.write(source)
+            copymode(path, formatted_file.name)
+            replace(formatted_file.name, path)
+        except BaseException:
+            unlink(formatted_file.name)
+            raise
+    return status
+
+
+def _formats_back(source: str) -> bool:
+    """
+    Whether the formatted source parses and formats to itself. The formatter
+    writes different programs differently, so it is then the same program.
+    """
+    from io import StringIO
+
+    from .lexer.lexer import Lexer
+    from .parser.formatter import format_program
+    from .parser.parser import Parser
+
+    parser = Parser(Lexer(source))
+    try:
+        program = parser.parse_program()
+    except RecursionError:
+        return False
+    if parser.errors:
+        return False
+    formatted = StringIO()
+    format_program(program, formatted)
+    return formatted.getvalue() == source
+
+
+def _index(options: Namespace) -> int:
+    from .tools.indexer import DEFAULT_DATABASE, DEFAULT_SUFFIX, SymbolIndex
+
+    with SymbolIndex(options.database or DEFAULT_DATABASE) as index:
+        stats = index.update(options.paths, options.suffix or DEFAULT_SUFFIX)
+    print(f'{stats.scanned} files, {stats.parsed} parsed, {stats.removed} removed')
+    return 0
+
+
+def _parse_or_report(source: str, name: str) -> Optional['Program']:
+    from .lexer.lexer import Lexer
+    from .parser.parser import RECURSION_ERROR, Parser
+
+    parser = Parser(Lexer(source))
+    try:
+        program = parser.parse_program()
+    except RecursionError:
+        print(f'{name}: {RECURSION_ERROR}', file=stderr)
+        return None
+    if parser.errors:
+        for error in parser.errors:
+            print(f'{name}: {error}', file=stderr)
+        return None
+    return program
+
+
+def _run(options: Namespace) -> int:
+    from .evaluator.compiler import CompilingEvaluator
+    from .evaluator.evaluator import EvaluationError
+    from .evaluator.objects import inspect
+    from .evaluator.profiler import Profiler
+    from .lexer.lexer import Lexer
+    from .parser.ast import ImportStatement
+    from .parser.parser import RECURSION_ERROR, Parser
+
+    with open(options.file, encoding='utf-8') as source_file:
+        source = source_file.read()
+    lexer = Lexer(source)
+    parser = Parser(lexer)
+    try:
+        program = parser.parse_program()
+    except RecursionError:
+        print(f'{options.file}: {RECURSION_ERROR}', file=stderr)
+        return 1
+    errors = [f'{options.file}: {error}' for error in parser.errors]
+    modules = None
+    if any(isinstance(statement, ImportStatement) for statement in program.statements):
+        # The modules are the source files in the directory of the program.
+        from os.path import abspath, dirname
+
+        from .tools.build import load_modules
+        modules, module_errors = load_modules(program, [dirname(abspath(options.file))])
+        errors.extend(module_errors)
+    if errors:
+        for error in errors:
+            print(error, file=stderr)
+        return 1
+
+    evaluator_options: Dict[str, Any] = {'modules': modules}
+    if options.no_memo:
+        evaluator_options['memo_size'] = 0
+    profiler = None
+    if options.profile or options.collapsed:
+        profiler = Profiler(source, options.interval / 1000, **evaluator_options)
+
+    status = 0
+    try:
+        result = profiler.run(program) if profiler else CompilingEvaluator(**evaluator_options).evaluate(program)
+        if result is not None:
+            print(inspect(result))
+    except EvaluationError as error:
+        location = f' at {lexer.location(error.offset)}' if error.offset >= 0 else ''
+        print(f'{options.file}: {error.message}{location}', file=stderr)
+        status = 1
+
+    if profiler is not None and options.profile:
+        print(profiler.profile.flat(), file=stderr)
+    if profiler is not None and options.collapsed:
+        with open(options.collapsed, 'w', encoding='utf-8') as collapsed_file:
+            for line in profiler.profile.collapsed():
+                collapsed_file.write(f'{line}\n')
+    return status
+
+
+def _where(options: Namespace) -> int:
+    from .tools.indexer import DEFAULT_DATABASE, SymbolIndex
+
+    with SymbolIndex(options.database or DEFAULT_DATABASE) as index:
+        symbols = index.definitions(options.name) + index.uses(options.name)
+    for symbol in symbols:
+        print(symbol)
+    return 0 if symbols else 1
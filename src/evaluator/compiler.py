@@ -0,0 +1,334 @@
+from typing import (
+    Any,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from weakref import WeakKeyDictionary
+
+from .evaluator import INTEGER_OPERATIONS, EvaluationError, Evaluator, _Return, _TailCall
+from .objects import Closure, Environment, Value, is_truthy
+from ..parser.ast import (
+    ASTNode,
+    Block,
+    Boolean,
+    Call,
+    Expression,
+    ExpressionStatement,
+    Function,
+    Identifier,
+    If,
+    ImportStatement,
+    Infix,
+    Integer,
+    Prefix,
+    Program,
+    ReturnStatement,
+    Statement,
+    VarStatement,
+)
+
+# The opcodes, in the order the run loop checks them.
+CONST = 0
+LOAD = 1
+INFIX = 2
+JUMP_IF_FALSE = 3
+JUMP = 4
+CALL = 5
+TAIL_CALL = 6
+POP = 7
+DEFINE = 8
+PREFIX = 9
+RETURN = 10
+CLOSURE = 11
+IMPORT = 12
+FAIL = 13
+END = 14
+
+INCOMPLETE: str = 'Cannot evaluate an incomplete program'
+
+
+class Instruction(NamedTuple):
+    """
+    One step of compiled code, run over a value stack.
+
+    param: opcode -> What the step does, CONST, LOAD, JUMP...
+    param: argument -> The value, the node or the target of a jump.
+    """
+    opcode: int
+    argument: Any
+
+
+class Code(NamedTuple):
+    """
+    The statements of a Block or a Program compiled to a flat list of instructions.
+
+    Every statement leaves its value on the stack, and the value of the
+    last one is the value of the code. The conditionals are jumps and the
+    branches of the conditions that fold to a constant are not compiled.
+
+    param: instructions -> The instructions, the last one is END.
+    param: eliminated -> Branches dropped because their condition is a constant.
+    """
+    instructions: Tuple[Instruction, ...]
+    eliminated: int
+
+
+class Compiler:
+    """
+    Compiles the statements of one Block, the Blocks of the function literals
+    are compiled when they are called. The Infix and Prefix expressions of
+    literals are folded with the rules of the Evaluator, the ones that would
+    fail, like 1 / 0, are kept for failing at run time.
+
+    In tail position, the last statement of the code and of the branches of
+    an if in tail position and the value of a return statement, a call is a
+    TAIL_CALL, which returns the _TailCall to the trampoline of the Evaluator.
+    """
+
+    def __init__(self, evaluator: Evaluator) -> None:
+        self._evaluator = evaluator
+        self._instructions: List[Instruction] = []
+        self._eliminated: int = 0
+
+    def compile(self, statements: Sequence[Statement], tail: bool) -> Code:
+        self._instructions = []
+        self._eliminated = 0
+        self._statements(statements, tail)
+        self._emit(END)
+        return Code(tuple(self._instructions), self._eliminated)
+
+    def _block(self, block: Optional[Block], tail: bool) -> None:
+        if block is None:
+            # The Evaluator gives null for a missing branch.
+            self._emit(CONST, None)
+        else:
+            self._statements(block.statements, tail)
+
+    def _emit(self, opcode: int, argument: Any = None) -> int:
+        self._instructions.append(Instruction(opcode, argument))
+        return len(self._instructions) - 1
+
+    def _expression(self, expression: Optional[Expression], tail: bool) -> bool:
+        """
+        Emits the code pushing the value of the expression, returns True when it is a single CONST.
+        """
+        expression_type = type(expression)
+        if expression_type is Integer or expression_type is Boolean:
+            self._emit(CONST, expression.value)  # type: ignore
+            return True
+        if expression_type is Identifier:
+            self._emit(LOAD, expression)
+            return False
+        if expression_type is Infix:
+            assert isinstance(expression, Infix)
+            start = len(self._instructions)
+            constant = self._expression(expression.left, False)
+            constant = self._expression(expression.right, False) and constant
+            return self._operation(start, INFIX, expression, constant)
+        if expression_type is Prefix:
+            assert isinstance(expression, Prefix)
+            start = len(self._instructions)
+            constant = self._expression(expression.right, False)
+            return self._operation(start, PREFIX, expression, constant)
+        if expression_type is If:
+            assert isinstance(expression, If)
+            self._if(expression, tail)
+            return False
+        if expression_type is Call:
+            assert isinstance(expression, Call)
+            self._expression(expression.function, False)
+            for argument in expression.arguments:
+                self._expression(argument, False)
+            self._emit(TAIL_CALL if tail else CALL, expression)
+            return False
+        if expression_type is Function:
+            self._emit(CLOSURE, expression)
+            return False
+        self._emit(FAIL, (INCOMPLETE, -1))
+        return False
+
+    def _if(self, expression: If, tail: bool) -> None:
+        start = len(self._instructions)
+        if self._expression(expression.condition, False):
+            # The condition is a constant, only the branch it selects is compiled.
+            condition = self._instructions[start].argument
+            del self._instructions[start:]
+            self._eliminated += 1
+            self._block(expression.consequence if is_truthy(condition) else expression.alternative, tail)
+            return
+
+        jump_if_false = self._emit(JUMP_IF_FALSE)
+        self._block(expression.consequence, tail)
+        jump = self._emit(JUMP)
+        self._patch(jump_if_false)
+        self._block(expression.alternative, tail)
+        self._patch(jump)
+
+    def _operation(self, start: int, opcode: int, expression: Expression, constant: bool) -> bool:
+        """
+        Emits the operation, or replaces the CONSTs of its operands with the CONST of its value.
+        """
+        if constant:
+            operands = [instruction.argument for instruction in self._instructions[start:]]
+            try:
+                if opcode == INFIX:
+                    value = self._evaluator._apply_infix(expression, *operands)  # type: ignore
+                else:
+                    value = self._evaluator._apply_prefix(expression, *operands)  # type: ignore
+            except EvaluationError:
+                pass
+            else:
+                del self._instructions[start:]
+                self._emit(CONST, value)
+                return True
+        self._emit(opcode, expression)
+        return False
+
+    def _patch(self, jump: int) -> None:
+        """
+        Makes the jump go to the next instruction emitted.
+        """
+        self._instructions[jump] = Instruction(self._instructions[jump].opcode, len(self._instructions))
+
+    def _statement(self, statement: Statement, tail: bool) -> None:
+        statement_type = type(statement)
+        if statement_type is ExpressionStatement:
+            assert isinstance(statement, ExpressionStatement)
+            self._expression(statement.expression, tail)
+        elif statement_type is ReturnStatement:
+            assert isinstance(statement, ReturnStatement)
+            self._expression(statement.return_value, True)
+            self._emit(RETURN)
+        elif statement_type is VarStatement:
+            assert isinstance(statement, VarStatement)
+            if statement.name is None:
+                self._emit(FAIL, (INCOMPLETE, statement.offset))
+                return
+            self._expression(statement.value, False)
+            self._emit(DEFINE, statement.name.value)
+        elif statement_type is Block:
+            assert isinstance(statement, Block)
+            self._statements(statement.statements, tail)
+        elif statement_type is ImportStatement:
+            self._emit(IMPORT, statement)
+        else:
+            self._emit(FAIL, (f'Cannot evaluate {statement_type.__name__}', statement.offset))
+
+    def _statements(self, statements: Sequence[Statement], tail: bool) -> None:
+        if not statements:
+            self._emit(CONST, None)
+            return
+        last = len(statements) - 1
+        for index, statement in enumerate(statements):
+            self._statement(statement, tail and index == last)
+            if index != last:
+                self._emit(POP)
+
+
+class CompilingEvaluator(Evaluator):
+    """
+    Evaluator that compiles every Block the first time it runs and then runs
+    its instructions in a loop, so a conditional is a jump and not a nested
+    evaluation of its branch. A return statement or a tail call leaves the
+    loop with its signal, without unwinding the Python stack with _Unwind.
+
+    The code is kept per Block, and per Program for evaluate(), so the
+    function bodies are compiled once for all their calls.
+
+    param: eliminated_branches -> Branches dropped from the code compiled so far, see Compiler.
+    param: _codes -> The code of every Block run, by tail position.
+    """
+
+    def __init__(self, **options: Any) -> None:
+        super().__init__(**options)
+        self.eliminated_branches: int = 0
+        self._codes: Tuple['WeakKeyDictionary[ASTNode, Code]', ...] = (WeakKeyDictionary(), WeakKeyDictionary())
+
+    def evaluate(self, program: Program, environment: Optional[Environment] = None) -> Value:
+        if environment is None:
+            environment = Environment()
+        try:
+            return self._resolve(self._run(self._code(program, program.statements, False), environment))
+        except RecursionError:
+            raise EvaluationError('Maximum recursion depth exceeded') from None
+
+    def _code(self, node: ASTNode, statements: Sequence[Statement], tail: bool) -> Code:
+        codes = self._codes[tail]
+        try:
+            return codes[node]
+        except KeyError:
+            code = codes[node] = Compiler(self).compile(statements, tail)
+            self.eliminated_branches += code.eliminated
+            return code
+
+    def _execute_block(self, block: Optional[Block], environment: Environment, tail: bool) -> object:
+        if block is None:
+            raise EvaluationError(INCOMPLETE)
+        return self._run(self._code(block, block.statements, tail), environment)
+
+    def _run(self, code: Code, environment: Environment) -> object:
+        """
+        Runs the instructions and returns the value of the code, or a _Return or _TailCall signal.
+        """
+        instructions = code.instructions
+        stack: List[Any] = []
+        push = stack.append
+        pop = stack.pop
+        counter = 0
+        while True:
+            opcode, argument = instructions[counter]
+            counter += 1
+            if opcode == CONST:
+                push(argument)
+            elif opcode == LOAD:
+                try:
+                    push(environment.lookup(argument.value))
+                except KeyError:
+                    raise EvaluationError(f'Unknown identifier {argument.value}', argument.offset) from None
+            elif opcode == INFIX:
+                right = pop()
+                left = pop()
+                if type(left) is int and type(right) is int and argument.operator != '/':
+                    push(INTEGER_OPERATIONS[argument.operator](left, right))
+                else:
+                    push(self._apply_infix(argument, left, right))
+            elif opcode == JUMP_IF_FALSE:
+                if not is_truthy(pop()):
+                    counter = argument
+            elif opcode == JUMP:
+                counter = argument
+            elif opcode == CALL or opcode == TAIL_CALL:
+                count = len(argument.arguments)
+                if count:
+                    arguments = stack[-count:]
+                    del stack[-count:]
+                else:
+                    arguments = []
+                function = pop()
+                if opcode == TAIL_CALL:
+                    return _TailCall(function, arguments, argument)
+                push(self._call(function, arguments, argument))
+            elif opcode == POP:
+                pop()
+            elif opcode == DEFINE:
+                value = pop()
+                if isinstance(value, Closure) and value.name is None:
+                    value.name = argument
+                environment.define(argument, value)
+                push(None)
+            elif opcode == PREFIX:
+                push(self._apply_prefix(argument, pop()))
+            elif opcode == RETURN:
+                return _Return(pop())
+            elif opcode == CLOSURE:
+                push(Closure(argument, environment))
+            elif opcode == IMPORT:
+                self._import(argument, environment)
+                push(None)
+            elif opcode == FAIL:
+                raise EvaluationError(*argument)
+            else:
+                return pop()
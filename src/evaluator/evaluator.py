@@ -0,0 +1,468 @@
+from operator import add, eq, gt, lt, mul, ne, sub
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
+from weakref import WeakKeyDictionary, WeakSet
+
+from .memo import DEFAULT_MEMO_SIZE, MISSING, Memo, MemoStats
+from .objects import (
+    Closure,
+    Environment,
+    Value,
+    inspect,
+    is_truthy,
+    type_name,
+)
+from .purity import analyze_purity
+from ..parser.ast import (
+    ASTNode,
+    Block,
+    Boolean,
+    Call,
+    Expression,
+    ExpressionStatement,
+    Function,
+    Identifier,
+    If,
+    ImportStatement,
+    Infix,
+    Integer,
+    Prefix,
+    Program,
+    ReturnStatement,
+    Statement,
+    VarStatement,
+)
+
+EvaluateFn = Callable[['Evaluator', Any, Environment], Value]
+
+INTEGER_OPERATIONS: Dict[str, Callable[[int, int], Value]] = {
+    '+': add,
+    '-': sub,
+    '*': mul,
+    '<': lt,
+    '>': gt,
+    '==': eq,
+    '!=': ne,
+}
+
+
+class EvaluationError(Exception):
+    """
+    Error of the program being evaluated, like an unknown identifier or a type mismatch.
+
+    param: message -> What went wrong.
+    param: offset -> Offset of the node that failed in the source, -1 if unknown.
+    """
+
+    def __init__(self, message: str, offset: int = -1) -> None:
+        super().__init__(message)
+        self.message = message
+        self.offset = offset
+
+
+class _Return:
+    """
+    Signal of a return statement, travels up through the blocks to the call.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value: Value) -> None:
+        self.value = value
+
+
+class _TailCall:
+    """
+    Signal of a call in tail position, the caller returns it instead of calling,
+    and the trampoline in Evaluator._call() runs it in the same Python frame.
+    """
+    __slots__ = ('function', 'arguments', 'node')
+
+    def __init__(self, function: Value, arguments: List[Value], node: Call) -> None:
+        self.function = function
+        self.arguments = arguments
+        self.node = node
+
+
+class _Unwind(Exception):
+    """
+    Carries a signal out of a block that was evaluated inside an expression,
+    for example the return of 'var x = if (y) { return 1; };'.
+    """
+
+    def __init__(self, signal: object) -> None:
+        super().__init__()
+        self.signal = signal
+
+
+Signal = (_Return, _TailCall)
+
+
+class Evaluator:
+    """
+    Tree walking evaluator of Programs.
+
+    The calls in tail position, the value of a return statement and the last
+    statement of a function body or of the branches of an if in tail position,
+    are not called by the evaluator of the call. They are returned as a
+    _TailCall to the trampoline of the function being run, which replaces its
+    function and arguments and loops, so tail recursion of any depth runs in
+    constant Python stack space. The other calls are nested Python calls and
+    raise an EvaluationError when they reach the recursion limit.
+
+    The results of the pure functions (see PurityAnalysis) are cached in a
+    bounded LRU Memo per closure. The key holds the arguments and the closures
+    the names called by the function resolve to at the time of the call,
+    following the callees of the callees, so redefining a function never
+    returns a stale result. The functions named in memo_exclude are not
+    memoized, and a memo_size of 0 disables the memoization.
+
+    The evaluation functions of every node type are looked up once per class
+    in _evaluate_fns.
+
+    An import statement runs the Program of the module the first time it is
+    imported, in its own Environment, and defines the names of that
+    Environment in the scope of the import, the ones it imported included.
+
+    param: _memo_size -> Results cached per function.
+    param: _memo_exclude -> Names of the functions that opted out of the memoization.
+    param: _purity -> The callees of every pure Function node, None for the impure ones.
+    param: _memos -> The memos alive, for memo_stats().
+    param: _modules -> The Programs of the modules that can be imported, by name.
+    param: _module_environments -> The scopes of the modules imported, None while the module runs.
+    """
+    _evaluate_fns: ClassVar[Dict[Type[Optional[ASTNode]], EvaluateFn]]
+
+    def __init__(self,
+                 memo_size: int = DEFAULT_MEMO_SIZE,
+                 memo_exclude: Iterable[str] = (),
+                 modules: Optional[Mapping[str, Program]] = None) -> None:
+        if '_evaluate_fns' not in type(self).__dict__:
+            type(self)._evaluate_fns = type(self)._register_evaluate_fns()
+
+        self._memo_size = memo_size
+        self._memo_exclude: FrozenSet[str] = frozenset(memo_exclude)
+        self._purity: 'WeakKeyDictionary[Function, Optional[Tuple[str, ...]]]' = WeakKeyDictionary()
+        self._memos: 'WeakSet[Memo]' = WeakSet()
+        self._modules: Mapping[str, Program] = modules or {}
+        self._module_environments: Dict[str, Optional[Environment]] = {}
+
+    def evaluate(self, program: Program, environment: Optional[Environment] = None) -> Value:
+        """
+        Runs the statements of the Program and returns the value of the last one,
+        or the value of the first top level return.
+        """
+        if environment is None:
+            environment = Environment()
+        try:
+            result: object = None
+            for statement in program.statements:
+                try:
+                    result = self._execute(statement, environment, False)
+                except _Unwind as unwind:
+                    result = unwind.signal
+                if isinstance(result, Signal):
+                    break
+            return self._resolve(result)
+        except RecursionError:
+            raise EvaluationError('Maximum recursion depth exceeded') from None
+
+    def memo_stats(self) -> List[MemoStats]:
+        """
+        Hits and misses of the memo of every pure function alive.
+        """
+        return sorted((memo.stats() for memo in self._memos), key=lambda stats: stats.name or '')
+
+    def _apply_infix(self, infix: Infix, left: Value, right: Value) -> Value:
+        operator = infix.operator
+        if type(left) is int and type(right) is int:
+            if operator == '/':
+                if right == 0:
+                    raise EvaluationError('Division by zero', infix.offset)
+                return left // right
+            return INTEGER_OPERATIONS[operator](left, right)
+        if operator in ('==', '!=') and type_name(left) == type_name(right):
+            equal = left is right or (not isinstance(left, Closure) and left == right)
+            return equal if operator == '==' else not equal
+        raise EvaluationError(f'Type mismatch: {type_name(left)} {operator} {type_name(right)}', infix.offset)
+
+    def _apply_prefix(self, prefix: Prefix, right: Value) -> Value:
+        if prefix.operator == '!':
+            return not is_truthy(right)
+        if type(right) is not int:
+            raise EvaluationError(f'Type mismatch: {prefix.operator}{type_name(right)}', prefix.offset)
+        return -right
+
+    def _attach_memo(self, closure: Closure) -> Optional[Memo]:
+        closure.analyzed = True
+        if self._memo_size <= 0:
+            return None
+        try:
+            callees = self._purity[closure.function]
+        except KeyError:
+            callees = self._purity[closure.function] = analyze_purity(closure.function)
+        if callees is None:
+            return None
+
+        enabled = closure.name not in self._memo_exclude
+        closure.memo = Memo(closure.name, callees, self._memo_size, enabled)
+        self._memos.add(closure.memo)
+        return closure.memo
+
+    def _call(self, function: Value, arguments: List[Value], node: Call) -> Value:
+        """
+        The trampoline, runs the function and every call it makes in tail position.
+        The result is cached in the memos of the pure functions of the chain of tail calls.
+        """
+        pending: Dict[Memo, Hashable] = {}
+        while True:
+            if not isinstance(function, Closure):
+                raise EvaluationError(f'{inspect(function)} is not a function', node.offset)
+            parameters = function.parameters
+            if len(parameters) != len(arguments):
+                raise EvaluationError(f'The function takes {len(parameters)} arguments ' +
+                                      f'but got {len(arguments)}', node.offset)
+
+            memo = function.memo if function.analyzed else self._attach_memo(function)
+            if memo is not None and memo.enabled:
+                key = self._memo_key(function, memo, arguments)
+                if key is not None:
+                    value = memo.get(key)
+                    if value is not MISSING:
+                        break
+                    if memo not in pending:
+                        pending[memo] = key
+
+            environment = Environment(dict(zip(parameters, arguments)), function.environment)
+            try:
+                result = self._execute_block(function.body, environment, True)
+            except _Unwind as unwind:
+                result = unwind.signal
+
+            if type(result) is _TailCall:
+                function, arguments, node = result.function, result.arguments, result.node
+                continue
+            value = result.value if type(result) is _Return else result
+            break
+
+        for memo, key in pending.items():
+            memo.put(key, value)
+        return value  # type: ignore
+
+    def _evaluate(self, expression: Optional[Expression], environment: Environment) -> Value:
+        return self._evaluate_fns[type(expression)](self, expression, environment)
+
+    def _evaluate_boolean(self, boolean: Boolean, environment: Environment) -> Value:
+        return boolean.value
+
+    def _evaluate_call(self, call: Call, environment: Environment) -> Value:
+        function = self._evaluate(call.function, environment)
+        arguments = [self._evaluate(argument, environment) for argument in call.arguments]
+        return self._call(function, arguments, call)
+
+    def _evaluate_function(self, function: Function, environment: Environment) -> Value:
+        return Closure(function, environment)
+
+    def _evaluate_identifier(self, identifier: Identifier, environment: Environment) -> Value:
+        try:
+            return environment.lookup(identifier.value)
+        except KeyError:
+            raise EvaluationError(f'Unknown identifier {identifier.value}', identifier.offset) from None
+
+    def _evaluate_if(self, if_expression: If, environment: Environment) -> Value:
+        block = self._select_branch(if_expression, environment)
+        if block is None:
+            return None
+        result = self._execute_block(block, environment, False)
+        if isinstance(result, Signal):
+            raise _Unwind(result)
+        return result  # type: ignore
+
+    def _evaluate_infix(self, infix: Infix, environment: Environment) -> Value:
+        evaluate_fns = self._evaluate_fns
+        left = evaluate_fns[type(infix.left)](self, infix.left, environment)
+        right = evaluate_fns[type(infix.right)](self, infix.right, environment)
+        return self._apply_infix(infix, left, right)
+
+    def _evaluate_integer(self, integer: Integer, environment: Environment) -> Value:
+        return integer.value
+
+    def _evaluate_missing(self, expression: None, environment: Environment) -> Value:
+        raise EvaluationError('Cannot evaluate an incomplete program')
+
+    def _evaluate_prefix(self, prefix: Prefix, environment: Environment) -> Value:
+        return self._apply_prefix(prefix, self._evaluate(prefix.right, environment))
+
+    def _evaluate_tail(self, expression: Optional[Expression], environment: Environment) -> object:
+        """
+        Evaluates an expression in tail position, calls are returned as a _TailCall.
+        """
+        expression_type = type(expression)
+        if expression_type is Call:
+            assert isinstance(expression, Call)
+            evaluate_fns = self._evaluate_fns
+            function = self._evaluate(expression.function, environment)
+            arguments = [evaluate_fns[type(argument)](self, argument, environment)
+                         for argument in expression.arguments]
+            return _TailCall(function, arguments, expression)
+        if expression_type is If:
+            assert isinstance(expression, If)
+            block = self._select_branch(expression, environment)
+            if block is None:
+                return None
+            return self._execute_block(block, environment, True)
+        return self._evaluate(expression, environment)
+
+    def _execute(self, statement: Statement, environment: Environment, tail: bool) -> object:
+        """
+        Runs a statement and returns its value, or a _Return or _TailCall signal.
+        """
+        statement_type = type(statement)
+        if statement_type is ExpressionStatement:
+            assert isinstance(statement, ExpressionStatement)
+            if tail:
+                return self._evaluate_tail(statement.expression, environment)
+            return self._evaluate(statement.expression, environment)
+        if statement_type is ReturnStatement:
+            assert isinstance(statement, ReturnStatement)
+            result = self._evaluate_tail(statement.return_value, environment)
+            return result if isinstance(result, Signal) else _Return(result)  # type: ignore
+        if statement_type is VarStatement:
+            assert isinstance(statement, VarStatement)
+            if statement.name is None:
+                raise EvaluationError('Cannot evaluate an incomplete program', statement.offset)
+            value = self._evaluate(statement.value, environment)
+            if isinstance(value, Closure) and value.name is None:
+                value.name = statement.name.value
+            environment.define(statement.name.value, value)
+            return None
+        if statement_type is Block:
+            assert isinstance(statement, Block)
+            return self._execute_block(statement, environment, tail)
+        if statement_type is ImportStatement:
+            assert isinstance(statement, ImportStatement)
+            self._import(statement, environment)
+            return None
+        raise EvaluationError(f'Cannot evaluate {statement_type.__name__}', statement.offset)
+
+    def _execute_block(self, block: Optional[Block], environment: Environment, tail: bool) -> object:
+        if block is None:
+            raise EvaluationError('Cannot evaluate an incomplete program')
+        result: object = None
+        last = len(block.statements) - 1
+        for index, statement in enumerate(block.statements):
+            result = self._execute(statement, environment, tail and index == last)
+            if isinstance(result, Signal):
+                return result
+        return result
+
+    def _import(self, statement: ImportStatement, environment: Environment) -> None:
+        if statement.module is None:
+            raise EvaluationError('Cannot evaluate an incomplete program', statement.offset)
+        name = statement.module.value
+        cycle = f'The imports of the module {name} make a cycle'
+        if name not in self._module_environments:
+            try:
+                program = self._modules[name]
+            except KeyError:
+                raise EvaluationError(f'Unknown module {name}', statement.offset) from None
+            self._module_environments[name] = None
+            module_environment = Environment()
+            try:
+                self.evaluate(program, module_environment)
+            except EvaluationError as error:
+                # The offsets of the module are not offsets of the importing source,
+                # and the error of a cycle through the module already names it.
+                del self._module_environments[name]
+                message = error.message if error.message.startswith(cycle) else f'{error.message} in the module {name}'
+                raise EvaluationError(message, statement.offset) from None
+            self._module_environments[name] = module_environment
+
+        imported = self._module_environments[name]
+        if imported is None:
+            raise EvaluationError(cycle, statement.offset)
+        environment.update(imported)
+
+    def _memo_key(self, closure: Closure, memo: Memo, arguments: List[Value]) -> Optional[Hashable]:
+        """
+        The arguments, with their types because 1 == true in Python, and the
+        closures called directly or indirectly. None when a callee is not a
+        pure function, then the call is not memoized.
+        """
+        if all(type(argument) is int for argument in arguments):
+            arguments_key: Tuple[object, ...] = tuple(arguments)
+        else:
+            arguments_key = tuple((type(argument), argument) for argument in arguments)
+        if not memo.callees:
+            return arguments_key
+
+        callees: List[Closure] = []
+        seen: Set[int] = {id(closure)}
+        pending: List[Tuple[Closure, Memo]] = [(closure, memo)]
+        while pending:
+            caller, caller_memo = pending.pop()
+            for name in caller_memo.callees:
+                try:
+                    callee = caller.environment.lookup(name)
+                except KeyError:
+                    return None
+                if not isinstance(callee, Closure):
+                    return None
+                callee_memo = callee.memo if callee.analyzed else self._attach_memo(callee)
+                if callee_memo is None:
+                    return None
+                callees.append(callee)
+                if id(callee) not in seen:
+                    seen.add(id(callee))
+                    pending.append((callee, callee_memo))
+        return tuple(callees), arguments_key
+
+    @classmethod
+    def _register_evaluate_fns(cls) -> Dict[Type[Optional[ASTNode]], EvaluateFn]:
+        return {
+            Boolean: cls._evaluate_boolean,
+            Call: cls._evaluate_call,
+            Function: cls._evaluate_function,
+            Identifier: cls._evaluate_identifier,
+            If: cls._evaluate_if,
+            Infix: cls._evaluate_infix,
+            Integer: cls._evaluate_integer,
+            Prefix: cls._evaluate_prefix,
+            type(None): cls._evaluate_missing,
+        }
+
+    def _resolve(self, result: object) -> Value:
+        """
+        The value of a signal that reached the top level.
+        """
+        if type(result) is _TailCall:
+            assert isinstance(result, _TailCall)
+            return self._call(result.function, result.arguments, result.node)
+        if type(result) is _Return:
+            assert isinstance(result, _Return)
+            return result.value
+        return result  # type: ignore
+
+    def _select_branch(self, if_expression: If, environment: Environment) -> Optional[Block]:
+        if is_truthy(self._evaluate(if_expression.condition, environment)):
+            return if_expression.consequence
+        return if_expression.alternative
+
+
+def evaluate(program: Program, environment: Optional[Environment] = None, **options: Any) -> Value:
+    """
+    Evaluates the Program with a new Evaluator, the options are passed to the Evaluator.
+    """
+    return Evaluator(**options).evaluate(program, environment)
@@ -0,0 +1,36 @@
+from typing import Any
+
+from .evaluator import EvaluationError, Evaluator
+from .objects import Environment
+from ..parser.ast import Statement
+
+
+class StepLimitExceeded(EvaluationError):
+    """
+    The program executed more statements than its budget.
+    """
+
+
+class LimitedEvaluator(Evaluator):
+    """
+    Evaluator that counts the statements it executes, the steps, and raises
+    StepLimitExceeded after max_steps of them. Every loop of the language is
+    a recursion whose body executes statements, so a program that does not
+    end runs out of steps, tail calls included.
+
+    Only this subclass pays for the counting, like the ProfilingEvaluator.
+
+    param: steps -> Statements executed so far.
+    param: _max_steps -> Statements allowed.
+    """
+
+    def __init__(self, max_steps: int, **options: Any) -> None:
+        super().__init__(**options)
+        self.steps: int = 0
+        self._max_steps = max_steps
+
+    def _execute(self, statement: Statement, environment: Environment, tail: bool) -> object:
+        self.steps += 1
+        if self.steps > self._max_steps:
+            raise StepLimitExceeded(f'Step limit of {self._max_steps} exceeded', statement.offset)
+        return Evaluator._execute(self, statement, environment, tail)
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional, Tuple
+
+DEFAULT_MEMO_SIZE: int = 1024
+
+
+class _Missing:
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+
+# Returned by Memo.get() when the result is not cached.
+MISSING = _Missing()
+
+
+class MemoStats(NamedTuple):
+    """
+    param: name -> The name the function was defined with, None for anonymous functions.
+    param: hits -> Calls answered from the memo.
+    param: misses -> Calls that had to run the function.
+    param: size -> Results cached now.
+    param: max_size -> Results kept before evicting the least recently used one.
+    param: enabled -> False when the function opted out of the memoization.
+    """
+    name: Optional[str]
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+    enabled: bool
+
+
+class Memo:
+    """
+    Bounded LRU of the results of one pure function, keyed by its arguments.
+
+    param: name -> The name of the function.
+    param: callees -> The names of the functions the function calls.
+    param: enabled -> False for a pure function that opted out, nothing is cached.
+    """
+
+    def __init__(self,
+                 name: Optional[str],
+                 callees: Tuple[str, ...],
+                 max_size: int = DEFAULT_MEMO_SIZE,
+                 enabled: bool = True) -> None:
+        self.name = name
+        self.callees = callees
+        self.enabled = enabled
+        self._max_size = max_size
+        self._entries: 'OrderedDict[Hashable, object]' = OrderedDict()
+        self._hits: int = 0
+        self._misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> object:
+        """
+        Returns the cached result or MISSING.
+        """
+        entries = self._entries
+        value = entries.get(key, MISSING)
+        if value is MISSING:
+            self._misses += 1
+        else:
+            self._hits += 1
+            entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: object) -> None:
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self._max_size:
+            entries.popitem(last=False)
+
+    def stats(self) -> MemoStats:
+        return MemoStats(name=self.name,
+                         hits=self._hits,
+                         misses=self._misses,
+                         size=len(self._entries),
+                         max_size=self._max_size,
+                         enabled=self.enabled)
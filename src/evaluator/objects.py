@@ -0,0 +1,105 @@
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Union, cast
+
+from ..parser.ast import Function, int_to_literal
+
+if TYPE_CHECKING:
+    from .memo import Memo
+
+Value = Union[int, bool, None, 'Closure']
+
+
+class Closure:
+    """
+    The value of a function literal, the function and the Environment where it was created.
+
+    param: function -> The Function node, for its representation.
+    param: parameters -> The names of the parameters.
+    param: body -> The Block run by every call.
+    param: environment -> The scope the body reads the free names from.
+    param: name -> The name of the first var the closure was assigned to, None while anonymous.
+    param: analyzed -> True once the evaluator checked if the function is pure.
+    param: memo -> The results of the calls, only for pure functions.
+    """
+    __slots__ = ('function', 'parameters', 'body', 'environment', 'name', 'analyzed', 'memo')
+
+    def __init__(self, function: Function, environment: 'Environment') -> None:
+        self.function = function
+        self.parameters: List[str] = [parameter.value for parameter in function.parameters]
+        self.body = function.body
+        self.environment = environment
+        self.name: Optional[str] = None
+        self.analyzed: bool = False
+        self.memo: Optional['Memo'] = None
+
+    def __repr__(self) -> str:
+        return str(self.function)
+
+
+class Environment:
+    """
+    The names bound in one scope, the names it does not have are looked up in the outer scopes.
+
+    param: _store -> The values of the names of this scope, a dict here, the subclasses
+                     only need a Mapping for lookup() and change it in define() and update().
+    param: _outer -> The enclosing scope, None for the global one.
+    """
+    __slots__ = ('_store', '_outer')
+
+    def __init__(self,
+                 store: Optional[Dict[str, Value]] = None,
+                 outer: Optional['Environment'] = None) -> None:
+        self._store: Mapping[str, Value] = {} if store is None else store
+        self._outer = outer
+
+    def define(self, name: str, value: Value) -> None:
+        cast(Dict[str, Value], self._store)[name] = value
+
+    def update(self, other: 'Environment') -> None:
+        """
+        Defines in this scope the names of the scope of the other Environment, its outer scopes are not copied.
+        """
+        cast(Dict[str, Value], self._store).update(other._store)
+
+    def lookup(self, name: str) -> Value:
+        """
+        Raises KeyError when no scope binds the name.
+        """
+        environment: Optional[Environment] = self
+        while environment is not None:
+            store = environment._store
+            if name in store:
+                return store[name]
+            environment = environment._outer
+        raise KeyError(name)
+
+
+def inspect(value: Value) -> str:
+    """
+    The representation of a value in the language.
+    """
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, Closure):
+        return repr(value)
+    return int_to_literal(value)
+
+
+def is_truthy(value: Value) -> bool:
+    """
+    false, null and 0 are falsy, like !0 being true.
+    """
+    return not (value is None or value is False or (type(value) is int and value == 0))
+
+
+def type_name(value: Value) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'integer'
+    return 'function'
@@ -0,0 +1,216 @@
+from collections.abc import Mapping
+from typing import Any, Hashable, Iterator, Optional, Tuple, Union
+
+from .objects import Environment, Value
+
+# Bits of the hash consumed by every level of the trie, 32 children per node.
+BITS: int = 5
+MASK: int = (1 << BITS) - 1
+
+# The hashes are made non negative with this mask, keys whose 64 bits are equal share a collision node.
+HASH_MASK: int = (1 << 64) - 1
+
+_MISSING = object()
+
+
+class _Entry:
+    """
+    A key and its value, stored in the node of the first level where its hash is not shared.
+    """
+    __slots__ = ('hash', 'key', 'value')
+
+    def __init__(self, hash_: int, key: Hashable, value: Any) -> None:
+        self.hash = hash_
+        self.key = key
+        self.value = value
+
+
+class _BitmapNode:
+    """
+    Node of the trie, only the children present are stored.
+
+    param: bitmap -> Bit i is set when the child for the 5 bits i of the hash is present.
+    param: children -> The children in the order of their bits, entries or nodes.
+    """
+    __slots__ = ('bitmap', 'children')
+
+    def __init__(self, bitmap: int, children: Tuple['_Child', ...]) -> None:
+        self.bitmap = bitmap
+        self.children = children
+
+
+class _CollisionNode:
+    """
+    The entries of the keys with the same 64 bit hash.
+    """
+    __slots__ = ('hash', 'entries')
+
+    def __init__(self, hash_: int, entries: Tuple[_Entry, ...]) -> None:
+        self.hash = hash_
+        self.entries = entries
+
+
+_Child = Union[_Entry, _BitmapNode, _CollisionNode]
+
+EMPTY_NODE: _BitmapNode = _BitmapNode(0, ())
+
+
+def _hash(key: Hashable) -> int:
+    return hash(key) & HASH_MASK
+
+
+def _merge(first: _Child, first_hash: int, second: _Child, second_hash: int, shift: int) -> _Child:
+    """
+    The smallest subtree holding two children whose hashes are equal up to shift.
+    """
+    if first_hash == second_hash:
+        assert isinstance(first, _Entry) and isinstance(second, _Entry)
+        return _CollisionNode(first_hash, (first, second))
+    first_bit = (first_hash >> shift) & MASK
+    second_bit = (second_hash >> shift) & MASK
+    if first_bit == second_bit:
+        return _BitmapNode(1 << first_bit, (_merge(first, first_hash, second, second_hash, shift + BITS),))
+    if first_bit < second_bit:
+        return _BitmapNode((1 << first_bit) | (1 << second_bit), (first, second))
+    return _BitmapNode((1 << first_bit) | (1 << second_bit), (second, first))
+
+
+def _set(node: _Child, hash_: int, key: Hashable, value: Any, shift: int) -> Tuple[_Child, bool]:
+    """
+    The node with the key bound to the value, and whether the key is new. Only the path to the key is copied.
+    """
+    if isinstance(node, _BitmapNode):
+        bit = 1 << ((hash_ >> shift) & MASK)
+        index = bin(node.bitmap & (bit - 1)).count('1')
+        children = node.children
+        if not node.bitmap & bit:
+            entry = _Entry(hash_, key, value)
+            return _BitmapNode(node.bitmap | bit, children[:index] + (entry,) + children[index:]), True
+        child, added = _set(children[index], hash_, key, value, shift + BITS)
+        if child is children[index]:
+            return node, False
+        return _BitmapNode(node.bitmap, children[:index] + (child,) + children[index + 1:]), added
+    if isinstance(node, _Entry):
+        if node.key is key or node.key == key:
+            if node.value is value:
+                return node, False
+            return _Entry(hash_, key, value), False
+        return _merge(node, node.hash, _Entry(hash_, key, value), hash_, shift), True
+    if node.hash != hash_:
+        return _merge(node, node.hash, _Entry(hash_, key, value), hash_, shift), True
+    for index, entry in enumerate(node.entries):
+        if entry.key == key:
+            if entry.value is value:
+                return node, False
+            entries = node.entries[:index] + (_Entry(hash_, key, value),) + node.entries[index + 1:]
+            return _CollisionNode(hash_, entries), False
+    return _CollisionNode(hash_, node.entries + (_Entry(hash_, key, value),)), True
+
+
+def _entries(node: _Child) -> Iterator[_Entry]:
+    if isinstance(node, _Entry):
+        yield node
+    elif isinstance(node, _BitmapNode):
+        for child in node.children:
+            yield from _entries(child)
+    else:
+        yield from node.entries
+
+
+class PersistentMap(Mapping):
+    """
+    Immutable mapping stored as a hash array mapped trie.
+
+    set() returns a new version in O(log n), copying only the nodes on the
+    path to the key, the rest of the trie is shared with the old version.
+    Keeping a version is keeping a reference, so snapshots cost O(1).
+
+    param: _root -> The root node of the trie.
+    param: _size -> How many keys are bound.
+    """
+    __slots__ = ('_root', '_size')
+
+    def __init__(self, root: _BitmapNode = EMPTY_NODE, size: int = 0) -> None:
+        self._root = root
+        self._size = size
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return (entry.key for entry in _entries(self._root))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return f'PersistentMap({dict(self.items())!r})'
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        hash_ = _hash(key)
+        node: _Child = self._root
+        shift = 0
+        while True:
+            if isinstance(node, _BitmapNode):
+                bit = 1 << ((hash_ >> shift) & MASK)
+                if not node.bitmap & bit:
+                    return default
+                node = node.children[bin(node.bitmap & (bit - 1)).count('1')]
+                shift += BITS
+            elif isinstance(node, _Entry):
+                return node.value if node.key is key or node.key == key else default
+            else:
+                for entry in node.entries:
+                    if entry.key == key:
+                        return entry.value
+                return default
+
+    def set(self, key: Hashable, value: Any) -> 'PersistentMap':
+        """
+        A new version with the key bound to the value, this one is not changed.
+        """
+        root, added = _set(self._root, _hash(key), key, value, 0)
+        if root is self._root:
+            return self
+        assert isinstance(root, _BitmapNode)
+        return PersistentMap(root, self._size + 1 if added else self._size)
+
+
+class PersistentEnvironment(Environment):
+    """
+    Environment whose scope is a PersistentMap, every var makes a new version of it.
+
+    The closures keep the Environment and not the version, so they see the
+    names defined after them, as with the dict scope. snapshot() returns the
+    current version and restore() makes it current again, both in O(1).
+    """
+    __slots__ = ()
+
+    def __init__(self,
+                 store: Optional[PersistentMap] = None,
+                 outer: Optional[Environment] = None) -> None:
+        super().__init__(outer=outer)
+        self._store = PersistentMap() if store is None else store
+
+    def define(self, name: str, value: Value) -> None:
+        self._store = self.snapshot().set(name, value)
+
+    def update(self, other: Environment) -> None:
+        store = self.snapshot()
+        for name, value in other._store.items():
+            store = store.set(name, value)
+        self._store = store
+
+    def snapshot(self) -> PersistentMap:
+        store = self._store
+        assert isinstance(store, PersistentMap)
+        return store
+
+    def restore(self, snapshot: PersistentMap) -> None:
+        self._store = snapshot
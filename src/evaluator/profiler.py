@@ -0,0 +1,256 @@
+from collections import Counter, defaultdict
+from signal import ITIMER_PROF, SIGPROF, setitimer, signal
+from threading import current_thread, main_thread
+from time import perf_counter, process_time
+from types import FrameType
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .evaluator import Evaluator
+from .objects import Closure, Environment, Value
+from ..lexer.position import LineIndex
+from ..parser.ast import ASTNode, Block, Function, Program, Statement
+
+# Seconds of CPU time between two samples.
+DEFAULT_INTERVAL: float = 0.001
+
+# Characters of the source shown for every statement in the flat table.
+SOURCE_WIDTH: int = 40
+
+PROGRAM_LABEL: str = '<program>'
+
+# The function running, None for the top level, and the statement it is executing.
+Frame = List[Any]
+StackKey = Tuple[Tuple[Optional[Function], Optional[Statement]], ...]
+
+
+class ProfileRow(NamedTuple):
+    """
+    One line of the flat table.
+
+    param: kind -> 'function' or 'statement'.
+    param: label -> The name of the function or the source of the statement.
+    param: position -> Where the function or the statement starts, 'line:column'.
+    param: executions -> Calls of the function or executions of the statement.
+    param: self_seconds -> CPU time sampled while it was the innermost one.
+    param: total_seconds -> CPU time sampled while it was anywhere in the stack.
+    """
+    kind: str
+    label: str
+    position: str
+    executions: int
+    self_seconds: float
+    total_seconds: float
+
+
+class Profile:
+    """
+    What a ProfilingEvaluator recorded: exact execution counts, and the
+    source stacks seen by the samples.
+
+    param: interval -> Seconds of CPU time between two samples, the timer of
+                       the system may round it up to its tick.
+    param: seconds -> Wall time of the profiled runs.
+    param: samples -> How many samples saw every stack.
+    param: sampled_seconds -> CPU time elapsed before the samples of every stack.
+    param: executions -> Executions of every statement.
+    param: calls -> Calls of every function, tail calls included.
+    param: closures -> The first closure of every function, for its name.
+    """
+
+    def __init__(self, lines: LineIndex, interval: float = DEFAULT_INTERVAL) -> None:
+        self._lines = lines
+        self.interval = interval
+        self.seconds: float = 0.0
+        self.samples: 'Counter[StackKey]' = Counter()
+        self.sampled_seconds: DefaultDict[StackKey, float] = defaultdict(float)
+        self.executions: 'Counter[Statement]' = Counter()
+        self.calls: 'Counter[Function]' = Counter()
+        self.closures: Dict[Function, Closure] = {}
+
+    def collapsed(self) -> List[str]:
+        """
+        The stacks in the collapsed format of flamegraph.pl, 'frame;frame;... samples'.
+        The frames are the functions and, inside each one, the statement it was running.
+        """
+        lines: List[str] = []
+        for stack, count in sorted(self.samples.items(), key=lambda item: self._stack_label(item[0])):
+            lines.append(f'{self._stack_label(stack)} {count}')
+        return lines
+
+    def flat(self) -> str:
+        rows = self.rows()
+        out = [f'{"self ms":>9} {"total ms":>9} {"count":>9}  {"position":<9} {"kind":<9} source']
+        for row in rows:
+            out.append(f'{row.self_seconds * 1000:>9.1f} {row.total_seconds * 1000:>9.1f} '
+                       f'{row.executions:>9}  {row.position:<9} {row.kind:<9} {row.label}')
+        out.append(f'{sum(self.samples.values())} samples, '
+                   f'{sum(self.sampled_seconds.values()) * 1000:.1f} ms of CPU sampled, '
+                   f'{self.seconds * 1000:.1f} ms of wall time')
+        return '\n'.join(out)
+
+    def rows(self) -> List[ProfileRow]:
+        """
+        The functions and the statements, the ones with more self time first.
+        """
+        self_seconds: DefaultDict[ASTNode, float] = defaultdict(float)
+        total_seconds: DefaultDict[ASTNode, float] = defaultdict(float)
+        for stack, seconds in self.sampled_seconds.items():
+            function, statement = stack[-1]
+            if statement is not None:
+                self_seconds[statement] += seconds
+            if function is not None:
+                self_seconds[function] += seconds
+            seen: Set[int] = set()
+            for function, statement in stack:
+                for node in (function, statement):
+                    if node is not None and id(node) not in seen:
+                        seen.add(id(node))
+                        total_seconds[node] += seconds
+
+        rows: List[ProfileRow] = []
+        for function, calls in self.calls.items():
+            rows.append(ProfileRow('function', self._function_label(function), self._position(function),
+                                   calls, self_seconds[function], total_seconds[function]))
+        for statement, executions in self.executions.items():
+            rows.append(ProfileRow('statement', self._source(statement), self._position(statement),
+                                   executions, self_seconds[statement], total_seconds[statement]))
+        rows.sort(key=lambda row: (-row.self_seconds, -row.total_seconds, -row.executions, row.position))
+        return rows
+
+    def _function_label(self, function: Optional[Function]) -> str:
+        if function is None:
+            return PROGRAM_LABEL
+        closure = self.closures.get(function)
+        name = closure.name if closure is not None and closure.name is not None else '<anonymous>'
+        return f'{name} ({self._position(function)})'
+
+    def _position(self, node: ASTNode) -> str:
+        offset = getattr(node, 'offset', -1)
+        if offset < 0:
+            return '-'
+        position = self._lines.location(offset)
+        return f'{position.line}:{position.column}'
+
+    @staticmethod
+    def _source(statement: Statement) -> str:
+        source = ' '.join(str(statement).split())
+        if len(source) > SOURCE_WIDTH:
+            source = source[:SOURCE_WIDTH - 3] + '...'
+        return source
+
+    def _stack_label(self, stack: StackKey) -> str:
+        frames: List[str] = []
+        for function, statement in stack:
+            frames.append(self._function_label(function))
+            if statement is not None:
+                frames.append(f'line {self._position(statement)}')
+        return ';'.join(frame.replace(';', ',') for frame in frames)
+
+
+class ProfilingEvaluator(Evaluator):
+    """
+    Evaluator that keeps the stack of the source being run, the function of
+    every call and the statement it is executing, and counts the executions
+    of the statements and the calls of the functions. The tail calls replace
+    the frame of their caller, like they replace its Python frame.
+
+    Only this subclass pays for the bookkeeping, the plain Evaluator is not
+    slowed down when no profile is taken.
+
+    param: _profile -> Where the counts are recorded.
+    param: _frames -> The stack of the source, the first frame is the top level.
+    param: _bodies -> The Function of every function body seen, for telling the calls apart from the other blocks.
+    """
+
+    def __init__(self, profile: Profile, **options: Any) -> None:
+        super().__init__(**options)
+        self._profile = profile
+        self._executions = profile.executions
+        self._calls = profile.calls
+        self._frames: List[Frame] = [[None, None]]
+        self._bodies: Dict[Block, Function] = {}
+
+    def sample(self, seconds: float) -> None:
+        """
+        Records the current stack, and the CPU time since the previous sample.
+        Called by the timer of the Profiler.
+        """
+        stack = tuple((frame[0], frame[1]) for frame in self._frames)
+        self._profile.samples[stack] += 1
+        self._profile.sampled_seconds[stack] += seconds
+
+    def _evaluate_function(self, function: Function, environment: Environment) -> Value:
+        closure = super()._evaluate_function(function, environment)
+        if function.body is not None and function.body not in self._bodies:
+            self._bodies[function.body] = function
+            self._profile.closures[function] = closure  # type: ignore
+        return closure
+
+    def _execute(self, statement: Statement, environment: Environment, tail: bool) -> object:
+        executions = self._executions
+        executions[statement] = executions.get(statement, 0) + 1
+        frame = self._frames[-1]
+        previous = frame[1]
+        frame[1] = statement
+        result = Evaluator._execute(self, statement, environment, tail)
+        frame[1] = previous
+        return result
+
+    def _execute_block(self, block: Optional[Block], environment: Environment, tail: bool) -> object:
+        function = self._bodies.get(block)  # type: ignore
+        if function is None:
+            return Evaluator._execute_block(self, block, environment, tail)
+
+        calls = self._calls
+        calls[function] = calls.get(function, 0) + 1
+        frames = self._frames
+        frames.append([function, None])
+        try:
+            return Evaluator._execute_block(self, block, environment, tail)
+        finally:
+            frames.pop()
+
+
+class Profiler:
+    """
+    Runs Programs with a ProfilingEvaluator and samples the source stack with
+    SIGPROF every interval seconds of CPU time. The signal is only available
+    in the main thread of Unix, elsewhere only the counts are recorded.
+
+    param: profile -> The counts and the samples of every run.
+    param: _last_sample -> CPU time of the previous sample.
+    """
+
+    def __init__(self, source: str, interval: float = DEFAULT_INTERVAL, **options: Any) -> None:
+        self.profile = Profile(LineIndex(source), interval)
+        self._evaluator = ProfilingEvaluator(self.profile, **options)
+        self._last_sample: float = 0.0
+
+    def run(self, program: Program, environment: Optional[Environment] = None) -> Value:
+        sampling = current_thread() is main_thread()
+        if sampling:
+            self._last_sample = process_time()
+            previous_handler = signal(SIGPROF, self._sample)
+            setitimer(ITIMER_PROF, self.profile.interval, self.profile.interval)
+        start = perf_counter()
+        try:
+            return self._evaluator.evaluate(program, environment)
+        finally:
+            self.profile.seconds += perf_counter() - start
+            if sampling:
+                setitimer(ITIMER_PROF, 0, 0)
+                signal(SIGPROF, previous_handler)
+
+    def _sample(self, signal_number: int, frame: Optional[FrameType]) -> None:
+        now = process_time()
+        self._evaluator.sample(now - self._last_sample)
+        self._last_sample = now
@@ -0,0 +1,91 @@
+from typing import List, Optional, Set, Tuple
+
+from ..parser.ast import (
+    ASTNode,
+    Block,
+    Boolean,
+    Call,
+    ExpressionStatement,
+    Function,
+    Identifier,
+    If,
+    Infix,
+    Integer,
+    Prefix,
+    ReturnStatement,
+)
+from ..parser.visitor import SKIP, NodeVisitor
+
+
+class PurityAnalysis(NodeVisitor):
+    """
+    Decides whether the body of a function is pure: it only reads its
+    parameters, computes with Integer, Boolean, Prefix, Infix and If, and
+    calls other functions by name. The result of a pure function depends on
+    its arguments and on the functions those names resolve to, which have to
+    be pure as well when it runs.
+
+    param: pure -> False once a node that is not allowed was found.
+    param: callees -> The names of the called functions, in order of appearance.
+    """
+
+    def __init__(self, parameters: List[str]) -> None:
+        self._parameters: Set[str] = set(parameters)
+        self.pure: bool = True
+        self.callees: List[str] = []
+
+    def generic_visit(self, node: ASTNode) -> object:
+        self.pure = False
+        return SKIP
+
+    def visit_Block(self, node: Block) -> None:
+        pass
+
+    def visit_Boolean(self, node: Boolean) -> None:
+        pass
+
+    def visit_Call(self, node: Call) -> object:
+        callee = node.function
+        if not isinstance(callee, Identifier) or callee.value in self._parameters:
+            self.pure = False
+            return SKIP
+        if callee.value not in self.callees:
+            self.callees.append(callee.value)
+        for argument in node.arguments:
+            self.visit(argument)
+        return SKIP
+
+    def visit_ExpressionStatement(self, node: ExpressionStatement) -> None:
+        pass
+
+    def visit_Identifier(self, node: Identifier) -> None:
+        if node.value not in self._parameters:
+            self.pure = False
+
+    def visit_If(self, node: If) -> None:
+        pass
+
+    def visit_Infix(self, node: Infix) -> None:
+        pass
+
+    def visit_Integer(self, node: Integer) -> None:
+        pass
+
+    def visit_Prefix(self, node: Prefix) -> None:
+        pass
+
+    def visit_ReturnStatement(self, node: ReturnStatement) -> None:
+        pass
+
+
+def analyze_purity(function: Function) -> Optional[Tuple[str, ...]]:
+    """
+    Returns the names of the functions called by a pure function, None when it is not pure.
+    """
+    if function.body is None:
+        return None
+    analysis = PurityAnalysis([parameter.value for parameter in function.parameters])
+    analysis.visit(function.body)
+    if not analysis.pure:
+        return None
+    return tuple(analysis.callees)
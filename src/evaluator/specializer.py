@@ -0,0 +1,306 @@
+from collections import Counter
+from copy import copy
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+)
+
+from .evaluator import EvaluationError, Evaluator
+from .memo import DEFAULT_MEMO_SIZE, MISSING, Memo, MemoStats
+from .objects import Environment, Value
+from ..lexer.token import Token, TokenType
+from ..parser.ast import (
+    Block,
+    Boolean,
+    Call,
+    Expression,
+    ExpressionStatement,
+    Function,
+    Identifier,
+    If,
+    ImportStatement,
+    Infix,
+    Integer,
+    Prefix,
+    Program,
+    ReturnStatement,
+    Statement,
+    VarStatement,
+    int_to_literal,
+)
+from ..parser.visitor import SKIP, NodeVisitor
+
+Bindings = Mapping[str, Value]
+
+# The values that have a literal, the others are left to the environment.
+Constant = (bool, int)
+
+
+class _Definitions(NodeVisitor):
+    """
+    Counts the var statements of every name, and the import statements, which can define any name.
+
+    param: nested -> False for not entering the functions, for the local vars of a body.
+    """
+
+    def __init__(self, nested: bool = True) -> None:
+        self.counts: 'Counter[str]' = Counter()
+        self.imports: int = 0
+        self._nested = nested
+
+    def visit_Function(self, node: Function) -> object:
+        return None if self._nested else SKIP
+
+    def visit_ImportStatement(self, node: ImportStatement) -> None:
+        self.imports += 1
+
+    def visit_VarStatement(self, node: VarStatement) -> None:
+        if node.name is not None:
+            self.counts[node.name.value] += 1
+
+
+class _Uses(NodeVisitor):
+    """
+    The names read by a program, the names defined by var statements and the parameters are not reads.
+    """
+
+    def __init__(self) -> None:
+        self.names: Set[str] = set()
+
+    def visit_Function(self, node: Function) -> object:
+        if node.body is not None:
+            self.visit(node.body)
+        return SKIP
+
+    def visit_Identifier(self, node: Identifier) -> None:
+        self.names.add(node.value)
+
+    def visit_VarStatement(self, node: VarStatement) -> object:
+        if node.value is not None:
+            self.visit(node.value)
+        return SKIP
+
+
+class Specializer:
+    """
+    Partial evaluator of Programs on the values of some identifiers.
+
+    The identifiers whose integer or boolean value is known are replaced with
+    literals, the Infix and Prefix expressions of literals are folded with the
+    rules of the Evaluator (the ones that would fail, like 1 / 0, are kept for
+    failing at run time), and the top level var statements of a literal or a
+    function that no statement reads anymore are dropped, except the last
+    statement, which gives the value of the program. A top level var of a
+    name defined only once that folds to a literal is known from there on.
+
+    The functions read the globals when they are called, so in their bodies
+    only the names that can not change are replaced: the bindings the program
+    never defines and the single definitions already run, minus the
+    parameters and the local vars of the function. The other names are left
+    for the environment, which is why the residual program has to run with
+    the bindings.
+
+    An import can define any name, the exports of the module are not known
+    here. From an import on no name of its scope is known, and in a program
+    with imports no binding is stable, only the vars, which come after the
+    imports.
+
+    The Program is not modified, the residual one shares the unchanged nodes with it.
+
+    param: _known -> The values of the globals at the statement being specialized.
+    param: _stable -> The known globals that keep their value for the rest of the program.
+    param: _definitions -> Var statements of every name in the program.
+    """
+
+    def __init__(self, bindings: Bindings) -> None:
+        self._bindings = {name: value for name, value in bindings.items() if isinstance(value, Constant)}
+        self._evaluator = Evaluator(memo_size=0)
+        self._known: Dict[str, Value] = {}
+        self._stable: Set[str] = set()
+        self._definitions: 'Counter[str]' = Counter()
+
+    def specialize(self, program: Program) -> Program:
+        definitions = _Definitions()
+        definitions.visit(program)
+        self._definitions = definitions.counts
+        self._known = dict(self._bindings)
+        self._stable = set() if definitions.imports else {name for name in self._known if not self._definitions[name]}
+
+        statements = [self._statement(statement, self._known, True) for statement in program.statements]
+        return Program(statements=self._drop_dead(statements))
+
+    def _block(self, block: Optional[Block], known: Dict[str, Value], top: bool) -> Optional[Block]:
+        if block is None:
+            return None
+        statements = [self._statement(statement, known, top) for statement in block.statements]
+        if all(new is old for new, old in zip(statements, block.statements)):
+            return block
+        return Block(token=block.token, statements=statements)
+
+    @staticmethod
+    def _drop_dead(statements: List[Statement]) -> List[Statement]:
+        while True:
+            uses = _Uses()
+            for statement in statements:
+                uses.visit(statement)
+            kept = [statement for index, statement in enumerate(statements)
+                    if index == len(statements) - 1 or not _is_dead(statement, uses.names)]
+            if len(kept) == len(statements):
+                return kept
+            statements = kept
+
+    def _expression(self, expression: Optional[Expression], known: Dict[str, Value], top: bool) -> Any:
+        """
+        The specialized expression, the same object when nothing changed.
+        """
+        if isinstance(expression, Identifier):
+            if expression.value in known:
+                return _literal(known[expression.value], expression.token) or expression
+            return expression
+        if isinstance(expression, Infix):
+            left = self._expression(expression.left, known, top)
+            right = self._expression(expression.right, known, top)
+            return self._fold(_with(expression, left=left, right=right))
+        if isinstance(expression, Prefix):
+            return self._fold(_with(expression, right=self._expression(expression.right, known, top)))
+        if isinstance(expression, If):
+            # The branches may not run, a var in them is not a definition of the program.
+            condition = self._expression(expression.condition, known, top)
+            consequence = self._block(expression.consequence, known, False)
+            alternative = self._block(expression.alternative, known, False)
+            return _with(expression, condition=condition, consequence=consequence, alternative=alternative)
+        if isinstance(expression, Function):
+            return _with(expression, body=self._block(expression.body, self._function_scope(expression, known), False))
+        if isinstance(expression, Call):
+            function = self._expression(expression.function, known, top)
+            arguments = [self._expression(argument, known, top) for argument in expression.arguments]
+            if all(new is old for new, old in zip(arguments, expression.arguments)):
+                arguments = expression.arguments
+            return _with(expression, function=function, arguments=arguments)
+        return expression
+
+    def _fold(self, expression: Expression) -> Expression:
+        """
+        The literal of the value of an Infix or a Prefix of literals, or the expression.
+        """
+        operands = [expression.right] if isinstance(expression, Prefix) else \
+            [expression.left, expression.right]  # type: ignore
+        if not all(isinstance(operand, (Integer, Boolean)) for operand in operands):
+            return expression
+        try:
+            value = self._evaluator._evaluate(expression, Environment())
+        except EvaluationError:
+            return expression
+        return _literal(value, expression.token) or expression
+
+    def _function_scope(self, function: Function, known: Dict[str, Value]) -> Dict[str, Value]:
+        local_definitions = _Definitions(nested=False)
+        if function.body is not None:
+            local_definitions.visit(function.body)
+        shadowed = {parameter.value for parameter in function.parameters} | set(local_definitions.counts)
+        return {name: value for name, value in known.items()
+                if name not in shadowed and (known is not self._known or name in self._stable)}
+
+    def _statement(self, statement: Statement, known: Dict[str, Value], top: bool) -> Statement:
+        if isinstance(statement, VarStatement):
+            value = self._expression(statement.value, known, top)
+            if statement.name is not None and known is self._known:
+                name = statement.name.value
+                known.pop(name, None)
+                self._stable.discard(name)
+                if top and isinstance(value, (Integer, Boolean)) and self._definitions[name] == 1:
+                    known[name] = value.value
+                    self._stable.add(name)
+            return _with(statement, value=value)
+        if isinstance(statement, ExpressionStatement):
+            return _with(statement, expression=self._expression(statement.expression, known, top))
+        if isinstance(statement, ReturnStatement):
+            return _with(statement, return_value=self._expression(statement.return_value, known, top))
+        if isinstance(statement, Block):
+            return self._block(statement, known, top) or statement
+        if isinstance(statement, ImportStatement):
+            known.clear()
+            if known is self._known:
+                self._stable.clear()
+        return statement
+
+
+class SpecializationCache:
+    """
+    The specializations of one Program, one per set of constant bindings, in
+    a bounded LRU. The bindings that are not integers or booleans do not
+    change the specialization and are not part of the key.
+
+    param: program -> The Program being specialized.
+    param: _memo -> The residual programs by binding set.
+    """
+
+    def __init__(self, program: Program, max_size: int = DEFAULT_MEMO_SIZE) -> None:
+        self.program = program
+        self._memo = Memo('specializations', (), max_size)
+
+    def run(self, bindings: Bindings, evaluator: Optional[Evaluator] = None) -> Value:
+        """
+        Evaluates the residual program of the bindings, in an environment with the bindings.
+        """
+        residual = self.specialize(bindings)
+        return (evaluator or Evaluator()).evaluate(residual, Environment(dict(bindings)))
+
+    def specialize(self, bindings: Bindings) -> Program:
+        key = binding_key(bindings)
+        residual = self._memo.get(key)
+        if residual is MISSING:
+            residual = Specializer(bindings).specialize(self.program)
+            self._memo.put(key, residual)
+        return residual  # type: ignore
+
+    def stats(self) -> MemoStats:
+        return self._memo.stats()
+
+
+def binding_key(bindings: Bindings) -> Hashable:
+    """
+    The constant bindings with their types, because 1 == true in Python.
+    """
+    return tuple(sorted((name, type(value).__name__, value) for name, value in bindings.items()
+                        if isinstance(value, Constant)))
+
+
+def specialize(program: Program, bindings: Bindings) -> Program:
+    return Specializer(bindings).specialize(program)
+
+
+def _is_dead(statement: Statement, uses: Set[str]) -> bool:
+    return (isinstance(statement, VarStatement)
+            and statement.name is not None
+            and statement.name.value not in uses
+            and isinstance(statement.value, (Integer, Boolean, Function)))
+
+
+def _literal(value: Value, token: Token) -> Optional[Expression]:
+    """
+    The Integer or Boolean of a value, at the offset of the token it replaces.
+    """
+    if isinstance(value, bool):
+        token_type = TokenType.TRUE if value else TokenType.FALSE
+        return Boolean(token=Token(token_type, 'true' if value else 'false', token.offset), value=value)
+    if isinstance(value, int):
+        return Integer(token=Token(TokenType.INT, int_to_literal(value), token.offset), value=value)
+    return None
+
+
+def _with(node: Any, **fields: Any) -> Any:
+    """
+    The node with the fields replaced, a copy when one of them changed.
+    """
+    if all(getattr(node, field) is value for field, value in fields.items()):
+        return node
+    node = copy(node)
+    for field, value in fields.items():
+        setattr(node, field, value)
+    return node
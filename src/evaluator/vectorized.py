@@ -0,0 +1,329 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from ..parser.ast import (
+    Expression,
+    Identifier,
+    Infix,
+    Integer,
+    Prefix,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+DEFAULT_CHUNK_SIZE: int = 65536
+
+# The integers of the arrays are int64, the literals out of this range are rejected.
+MIN_INT64: int = -2 ** 63
+MAX_INT64: int = 2 ** 63 - 1
+
+ARITHMETIC_OPERATORS = ('+', '-', '*', '/')
+ORDER_OPERATORS = ('<', '>')
+EQUALITY_OPERATORS = ('==', '!=')
+
+
+class Instruction(NamedTuple):
+    """
+    One step of a compiled expression, executed over a value stack.
+
+    param: kind -> 'const', 'load', 'prefix' or 'infix'.
+    param: argument -> The integer, the column name or the operator.
+    """
+    kind: str
+    argument: Any
+
+
+class CompiledExpression(NamedTuple):
+    """
+    Postfix form of an expression, so every chunk is evaluated without walking the tree again.
+
+    param: instructions -> The instructions in execution order.
+    param: names -> The identifiers the expression reads.
+    """
+    instructions: Tuple[Instruction, ...]
+    names: Tuple[str, ...]
+
+
+class Operations:
+    """
+    The operators of the language for one kind of value (Python scalars or NumPy arrays).
+    """
+
+    def __init__(self,
+                 constant: Callable[[int], Any],
+                 is_boolean: Callable[[Any], bool],
+                 negate: Callable[[Any], Any],
+                 logical_not: Callable[[Any], Any],
+                 binary: Mapping[str, Callable[[Any, Any], Any]],
+                 any_zero: Callable[[Any], bool]) -> None:
+        self.constant = constant
+        self._is_boolean = is_boolean
+        self._negate = negate
+        self._logical_not = logical_not
+        self._binary = binary
+        self._any_zero = any_zero
+
+    def infix(self, operator: str, left: Any, right: Any) -> Any:
+        left_boolean = self._is_boolean(left)
+        right_boolean = self._is_boolean(right)
+        if operator in EQUALITY_OPERATORS:
+            if left_boolean != right_boolean:
+                raise TypeError(f'Cannot compare an integer and a boolean with {operator}')
+        elif operator in ARITHMETIC_OPERATORS or operator in ORDER_OPERATORS:
+            if left_boolean or right_boolean:
+                raise TypeError(f'The operator {operator} only accepts integers')
+        else:
+            raise ValueError(f'Unknown operator {operator}')
+
+        if operator == '/' and self._any_zero(right):
+            raise ZeroDivisionError('Division by zero')
+        return self._binary[operator](left, right)
+
+    def prefix(self, operator: str, right: Any) -> Any:
+        if operator == '-':
+            if self._is_boolean(right):
+                raise TypeError('The operator - only accepts integers')
+            return self._negate(right)
+        elif operator == '!':
+            return self._logical_not(right)
+        raise ValueError(f'Unknown operator {operator}')
+
+
+def _array_constant(value: int) -> Any:
+    if not MIN_INT64 <= value <= MAX_INT64:
+        raise OverflowError(f'The integer {value} does not fit in int64')
+    return np.int64(value)
+
+
+def _array_is_boolean(value: Any) -> bool:
+    return bool(np.asarray(value).dtype.kind == 'b')
+
+
+def _array_not(value: Any) -> Any:
+    if _array_is_boolean(value):
+        return np.logical_not(value)
+    return np.equal(value, 0)
+
+
+def _scalar_not(value: Any) -> bool:
+    if isinstance(value, bool):
+        return not value
+    return value == 0
+
+
+_SCALAR_OPERATIONS = Operations(
+    constant=int,
+    is_boolean=lambda value: isinstance(value, bool),
+    negate=lambda value: -value,
+    logical_not=_scalar_not,
+    binary={
+        '+': lambda left, right: left + right,
+        '-': lambda left, right: left - right,
+        '*': lambda left, right: left * right,
+        '/': lambda left, right: left // right,
+        '<': lambda left, right: left < right,
+        '>': lambda left, right: left > right,
+        '==': lambda left, right: left == right,
+        '!=': lambda left, right: left != right,
+    },
+    any_zero=lambda value: value == 0,
+)
+
+_ARRAY_OPERATIONS = Operations(
+    constant=_array_constant,
+    is_boolean=_array_is_boolean,
+    negate=np.negative,
+    logical_not=_array_not,
+    binary={
+        '+': np.add,
+        '-': np.subtract,
+        '*': np.multiply,
+        '/': np.floor_divide,
+        '<': np.less,
+        '>': np.greater,
+        '==': np.equal,
+        '!=': np.not_equal,
+    },
+    any_zero=lambda value: bool(np.any(np.equal(value, 0))),
+) if np is not None else None
+
+
+def compile_expression(expression: Expression) -> CompiledExpression:
+    """
+    Flattens the tree of Infix, Prefix, Integer and Identifier nodes into postfix order.
+    The traversal uses an explicit stack, so deep expressions do not hit the recursion limit.
+    """
+    instructions: List[Instruction] = []
+    names: Dict[str, None] = {}
+    pending: List[Tuple[Optional[Expression], bool]] = [(expression, False)]
+
+    while pending:
+        node, children_done = pending.pop()
+        if node is None:
+            raise ValueError('Cannot evaluate an incomplete expression')
+
+        if isinstance(node, Integer):
+            instructions.append(Instruction('const', node.value))
+        elif isinstance(node, Identifier):
+            names[node.value] = None
+            instructions.append(Instruction('load', node.value))
+        elif isinstance(node, Prefix):
+            if children_done:
+                instructions.append(Instruction('prefix', node.operator))
+            else:
+                pending.append((node, True))
+                pending.append((node.right, False))
+        elif isinstance(node, Infix):
+            if children_done:
+                instructions.append(Instruction('infix', node.operator))
+            else:
+                pending.append((node, True))
+                pending.append((node.right, False))
+                pending.append((node.left, False))
+        else:
+            raise TypeError(f'Unsupported expression {type(node).__name__}')
+
+    return CompiledExpression(instructions=tuple(instructions), names=tuple(names))
+
+
+def evaluate_batch(expression: Expression,
+                   columns: Mapping[str, Any],
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Any:
+    """
+    Evaluates the expression for every row of the columns and returns the results as one array.
+
+    Semantics:
+    - Integers are int64, so arithmetic overflow wraps around like in NumPy. The integer
+      columns of other widths are converted to int64, and a literal or a uint64 value
+      that does not fit in int64 raises OverflowError.
+    - '/' is the floor division of Python (7 / -2 == -4). A zero divisor in any row
+      raises ZeroDivisionError.
+    - '<', '>', '==' and '!=' return booleans. Arithmetic and ordering only accept
+      integers, equality only accepts operands of the same kind.
+    - '-' negates integers, '!' negates booleans and returns True only for the integer 0.
+
+    The rows are processed in chunks of chunk_size, so the temporary arrays never grow
+    beyond one chunk.
+    """
+    _require_numpy()
+    length = _columns_length(columns)
+    result = None
+    for start, chunk in _iter_results(compile_expression(expression), columns, length, chunk_size):
+        if result is None:
+            result = np.empty(length, dtype=chunk.dtype)
+        result[start:start + len(chunk)] = chunk
+
+    if result is None:
+        return np.empty(0, dtype=np.int64)
+    return result
+
+
+def evaluate_chunks(expression: Expression,
+                    columns: Mapping[str, Any],
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Same as evaluate_batch but yields the result of every chunk, so the memory used
+    stays bounded by chunk_size even for the output.
+    """
+    _require_numpy()
+    length = _columns_length(columns)
+    for _, chunk in _iter_results(compile_expression(expression), columns, length, chunk_size):
+        yield chunk
+
+
+def evaluate_row(expression: Expression, row: Mapping[str, int]) -> Any:
+    """
+    Reference evaluation of one record with Python scalars, following the semantics of
+    evaluate_batch except for the int64 overflow.
+    """
+    return _run(compile_expression(expression), row, _SCALAR_OPERATIONS)
+
+
+def _column_array(name: str, column: Any) -> Any:
+    """
+    The column as an array of booleans or of integers that fit in int64.
+    """
+    array = np.asarray(column)
+    kind = array.dtype.kind
+    if kind not in 'iub':
+        raise TypeError(f'Column {name} must contain integers or booleans, got {array.dtype}')
+    if kind == 'u' and array.dtype.itemsize == 8 and array.size and int(array.max()) > MAX_INT64:
+        raise OverflowError(f'Column {name} has integers that do not fit in int64')
+    return array
+
+
+def _int64_chunk(chunk: Any) -> Any:
+    """
+    The integers of the other widths would wrap at their width or turn into floats, they are made int64 per chunk.
+    """
+    if chunk.dtype.kind == 'b':
+        return chunk
+    return chunk.astype(np.int64, copy=False)
+
+
+def _columns_length(columns: Mapping[str, Any]) -> int:
+    if not columns:
+        raise ValueError('At least one column is needed for knowing the number of rows')
+
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError(f'All the columns must have the same length, got {sorted(lengths)}')
+    return lengths.pop()
+
+
+def _iter_results(compiled: CompiledExpression,
+                  columns: Mapping[str, Any],
+                  length: int,
+                  chunk_size: int) -> Iterator[Tuple[int, Any]]:
+    if chunk_size <= 0:
+        raise ValueError('chunk_size must be positive')
+
+    arrays: Dict[str, Any] = {}
+    for name in compiled.names:
+        if name not in columns:
+            raise NameError(f'Unknown identifier {name}')
+        arrays[name] = _column_array(name, columns[name])
+
+    for start in range(0, length, chunk_size):
+        stop = min(start + chunk_size, length)
+        chunk = {name: _int64_chunk(array[start:stop]) for name, array in arrays.items()}
+        value = _run(compiled, chunk, _ARRAY_OPERATIONS)
+        yield start, np.broadcast_to(np.asarray(value), (stop - start,))
+
+
+def _run(compiled: CompiledExpression,
+         values: Mapping[str, Any],
+         operations: Optional[Operations]) -> Any:
+    assert operations
+    stack: List[Any] = []
+    for kind, argument in compiled.instructions:
+        if kind == 'const':
+            stack.append(operations.constant(argument))
+        elif kind == 'load':
+            try:
+                stack.append(values[argument])
+            except KeyError:
+                raise NameError(f'Unknown identifier {argument}')
+        elif kind == 'prefix':
+            stack.append(operations.prefix(argument, stack.pop()))
+        else:
+            right = stack.pop()
+            stack.append(operations.infix(argument, stack.pop(), right))
+    return stack.pop()
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError('The batch evaluation needs NumPy: pip install numpy')
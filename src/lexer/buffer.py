@@ -0,0 +1,130 @@
+from typing import List, Optional
+
+from .lexer import Lexer
+from .token import Token
+
+# Tokens the ring holds before it grows, a power of two.
+INITIAL_CAPACITY: int = 8
+
+
+class TokenBuffer:
+    """
+    Ring buffer of the Tokens of a Lexer, for looking further than the next
+    Token and for going back to a mark. Every Token is lexed once. The ring
+    keeps the Tokens from the oldest mark, or from the next Token when there
+    are no marks, to the furthest Token peeked, so it only grows with the
+    window being speculated on.
+
+    The positions are absolute, the number of Tokens returned before, and
+    position & _mask is the slot of the Token in the ring.
+
+    param: _lexer -> Where the Tokens come from.
+    param: _ring -> The Tokens kept, the capacity is always a power of two.
+    param: _start -> Position of the oldest Token kept.
+    param: _position -> Position of the Token next_token() returns.
+    param: _end -> Position of the Token the Lexer reads next.
+    param: _marks -> The positions of the marks not reset or released yet, in order.
+    """
+
+    def __init__(self, lexer: Lexer) -> None:
+        self._ring: List[Optional[Token]] = [None] * INITIAL_CAPACITY
+        self._mask: int = INITIAL_CAPACITY - 1
+        self._lexer: Lexer = lexer
+        self._start: int = 0
+        self._position: int = 0
+        self._end: int = 0
+        self._marks: List[int] = []
+
+    def __len__(self) -> int:
+        """
+        Tokens kept in the ring.
+        """
+        return self._end - self._start
+
+    @property
+    def capacity(self) -> int:
+        return len(self._ring)
+
+    def mark(self) -> int:
+        """
+        Returns the position of the next Token, next_token() returns it
+        again after reset(mark). The Tokens from the mark on are
+        kept until it is reset or released.
+        """
+        self._marks.append(self._position)
+        return self._position
+
+    def next_token(self) -> Token:
+        position = self._position
+        if position == self._end:
+            token = self._lexer.next_token()
+            if not self._marks:
+                # Nothing can go back to the Token, it does not need a slot.
+                self._start = self._end = self._position = position + 1
+                return token
+            self._push(token)
+        else:
+            token = self._ring[position & self._mask]  # type: ignore
+        self._position = position + 1
+        if not self._marks:
+            self._start = self._position
+        return token
+
+    def peek(self, k: int = 1) -> Token:
+        """
+        The k-th Token after the ones returned, peek(1) is the one next_token() returns.
+        """
+        if k < 1:
+            raise ValueError(f'The lookahead has to be 1 or more, got {k}')
+        position = self._position + k - 1
+        while self._end <= position:
+            self._push(self._lexer.next_token())
+        return self._ring[position & self._mask]  # type: ignore
+
+    def release(self, mark: int) -> None:
+        """
+        Forgets the mark, and the ones taken after it, keeping the current position.
+        """
+        self._pop_marks(mark)
+        self._start = self._marks[0] if self._marks else self._position
+
+    def reset(self, mark: int) -> None:
+        """
+        Goes back to the mark, next_token() returns the Tokens from there again.
+        The mark, and the ones taken after it, are forgotten.
+        """
+        self._pop_marks(mark)
+        self._position = mark
+        self._start = self._marks[0] if self._marks else mark
+
+    def restart(self, lexer: Optional[Lexer] = None) -> None:
+        """
+        Starts reading another Lexer, the ring keeps its capacity.
+        """
+        if lexer is not None:
+            self._lexer = lexer
+        self._start = 0
+        self._position = 0
+        self._end = 0
+        self._marks = []
+
+    def _grow(self) -> None:
+        capacity = len(self._ring)
+        ring: List[Optional[Token]] = [None] * (capacity * 2)
+        mask = len(ring) - 1
+        for position in range(self._start, self._end):
+            ring[position & mask] = self._ring[position & self._mask]
+        self._ring = ring
+        self._mask = mask
+
+    def _pop_marks(self, mark: int) -> None:
+        if mark not in self._marks:
+            raise ValueError(f'The mark {mark} is not active')
+        while self._marks.pop() != mark:
+            pass
+
+    def _push(self, token: Token) -> None:
+        if self._end - self._start == len(self._ring):
+            self._grow()
+        self._ring[self._end & self._mask] = token
+        self._end += 1
@@ -1,7 +1,39 @@
-from re import match
+from string import ascii_letters
+from typing import Dict, FrozenSet
 
+from .position import LineIndex, Position
 from .token import Token, TokenType, lookup_token_type
 
+# The tables of characters are built once, when the module is imported.
+SINGLE_CHARACTER_TOKENS: Dict[str, TokenType] = {
+    '=': TokenType.ASSIGN,
+    '+': TokenType.PLUS,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    ',': TokenType.COMMA,
+    ';': TokenType.SEMICOLON,
+    '<': TokenType.LT,
+    '>': TokenType.GT,
+    '-': TokenType.MINUS,
+    '/': TokenType.DIVISION,
+    '*': TokenType.MULTIPLICATION,
+    '!': TokenType.NEGATION,
+}
+
+# The characters that make a two character token when they are followed by '='.
+TWO_CHARACTER_TOKENS: Dict[str, TokenType] = {
+    '=': TokenType.EQ,
+    '!': TokenType.NOT_EQ,
+}
+
+LETTERS: FrozenSet[str] = frozenset(ascii_letters + '_')
+
+# The ASCII part of the character classes, the rest of Unicode is checked with str methods.
+DIGITS: FrozenSet[str] = frozenset('0123456789')
+WHITESPACE: FrozenSet[str] = frozenset(chr(code) for code in range(128) if chr(code).isspace())
+
 
 class Lexer:
     """
@@ -12,100 +44,84 @@ class Lexer:
     param: _character -> The actual character we are processing.
     param: _read_position -> The next position of the text we are going to read.
     param: _position -> The actual position of the text we are processing.
+    param: _line_index -> Table of the line start offsets, for turning Token offsets into lines and columns.
     """
 
     def __init__(self, source: str) -> None:
-        self._source: str = source
-        self._character: str = ''
-        self._read_position: int = 0
-        self._position: int = 0
+        self.reset(source)
 
-        self._read_character()
+    def location(self, offset: int) -> Position:
+        """
+        Returns the line and column of an offset of the source, for example Token.offset.
+        """
+        return self._line_index.location(offset)
 
     def next_token(self) -> Token:
         """
-        This function reads the token and with regex we make match with one of the defined
-        TokenTypes, if we there is no valid token by default we send a TokenType.ILLEGAL
+        This function reads the token and with the tables of characters we find which of the
+        defined TokenTypes it is, if there is no valid token by default we send a TokenType.ILLEGAL
         """
         self._skip_whitespace()
-        if match(r'^=$', self._character):
-            """
-            Here we check if the token contains the '=' symbol and the calculate if it corresponds
-            to the assign (=) or the equals (==) symbol
+        character = self._character
+        if character in TWO_CHARACTER_TOKENS and self._peek_character() == '=':
             """
-            if self._peek_character() == '=':
-                token = self._make_two_character_token(TokenType.EQ)
-            else:
-                token = Token(TokenType.ASSIGN, self._character)
-        elif match(r'^\+$', self._character):
-            token = Token(TokenType.PLUS, self._character)
-        elif match(r'^$', self._character):
-            token = Token(TokenType.EOF, self._character)
-        elif match(r'^\($', self._character):
-            token = Token(TokenType.LPAREN, self._character)
-        elif match(r'^\)$', self._character):
-            token = Token(TokenType.RPAREN, self._character)
-        elif match(r'^{$', self._character):
-            token = Token(TokenType.LBRACE, self._character)
-        elif match(r'^}$', self._character):
-            token = Token(TokenType.RBRACE, self._character)
-        elif match(r'^,$', self._character):
-            token = Token(TokenType.COMMA, self._character)
-        elif match(r'^;$', self._character):
-            token = Token(TokenType.SEMICOLON, self._character)
-        elif match(r'^<$', self._character):
-            token = Token(TokenType.LT, self._character)
-        elif match(r'^>$', self._character):
-            token = Token(TokenType.GT, self._character)
-        elif match(r'^-$', self._character):
-            token = Token(TokenType.MINUS, self._character)
-        elif match(r'^/$', self._character):
-            token = Token(TokenType.DIVISION, self._character)
-        elif match(r'^\*$', self._character):
-            token = Token(TokenType.MULTIPLICATION, self._character)
-        elif match(r'^!$', self._character):
+            Here we check if the '=' or '!' symbol is followed by '=', which makes the
+            equals (==) or the distinct (!=) symbol instead of the assign (=) or the not (!)
             """
-               Here we check if the token contains the '!' symbol and the calculate if it corresponds
-               to the not (!) or the distinct (!=) symbol
-               """
-            if self._peek_character() == '=':
-                token = self._make_two_character_token(TokenType.NOT_EQ)
-            else:
-                token = Token(TokenType.NEGATION, self._character)
-        elif self._is_letter(self._character):
+            token = self._make_two_character_token(TWO_CHARACTER_TOKENS[character])
+        elif character in SINGLE_CHARACTER_TOKENS:
+            token = Token(SINGLE_CHARACTER_TOKENS[character], character, self._position)
+        elif not character:
+            token = Token(TokenType.EOF, character, min(self._position, len(self._source)))
+        elif self._is_letter(character):
+            offset = self._position
             literal = self._read_identifier()
             token_type = lookup_token_type(literal)
-            return Token(token_type, literal)
-        elif self._is_number(self._character):
+            return Token(token_type, literal, offset)
+        elif self._is_number(character):
+            offset = self._position
             literal = self._read_number()
-            return Token(TokenType.INT, literal)
+            return Token(TokenType.INT, literal, offset)
         else:
-            token = Token(TokenType.ILLEGAL, self._character)
+            token = Token(TokenType.ILLEGAL, character, self._position)
         self._read_character()
         return token
 
+    def reset(self, source: str) -> None:
+        """
+        Starts reading a new source, so the same Lexer can be reused.
+        """
+        self._source: str = source
+        self._character: str = ''
+        self._read_position: int = 0
+        self._position: int = 0
+        self._line_index: LineIndex = LineIndex(source)
+
+        self._read_character()
+
     def _is_letter(self, character: str) -> bool:
         """
-        Function for calculating if a character is a valid letter.
+        Function for calculating if a character is a valid letter, an ASCII letter or '_'.
         """
-        return bool(match(r'^[a-zA-Z_]$', character))
+        return character in LETTERS
 
     def _is_number(self, character: str) -> bool:
         """
-        Function for calculating if a character is a number
+        Function for calculating if a character is a number, any Unicode decimal digit like \\d.
         """
-        return bool(match(r'^\d$', character))
+        return character in DIGITS or (character > '\x7f' and character.isdecimal())
 
     def _make_two_character_token(self, token_type: TokenType) -> Token:
         """
         This function if used for calculating if we can make a two character Token with the actual one
         and the next character.
         """
+        offset = self._position
         prefix = self._character
         self._read_character()
         suffix = self._character
 
-        return Token(token_type, f'{prefix}{suffix}')
+        return Token(token_type, f'{prefix}{suffix}', offset)
 
     def _peek_character(self) -> str:
         """
@@ -152,5 +168,5 @@ class Lexer:
         This function is made for skipping all the whitespaces of the source program,
         because in the syntax is not relevant and we don't want to process empty characters.
         """
-        while match(r'^\s$', self._character):
+        while self._character in WHITESPACE or (self._character > '\x7f' and self._character.isspace()):
             self._read_character()
@@ -0,0 +1,44 @@
+from bisect import bisect_right
+from typing import List, NamedTuple
+
+
+class Position(NamedTuple):
+    """
+    Human readable location of a character of the source, both values start at 1.
+    """
+    line: int
+    column: int
+
+    def __str__(self) -> str:
+        return f'line {self.line}, column {self.column}'
+
+
+class LineIndex:
+    """
+    Table with the offset where every line of the source starts.
+
+    The Tokens only keep their start offset, the line and the column are
+    calculated on demand with a binary search over this table.
+
+    param: _line_starts -> Offsets of the first character of every line.
+    """
+
+    def __init__(self, source: str) -> None:
+        line_starts: List[int] = [0]
+        offset = source.find('\n')
+        while offset != -1:
+            line_starts.append(offset + 1)
+            offset = source.find('\n', offset + 1)
+        self._line_starts = line_starts
+
+    def __len__(self) -> int:
+        return len(self._line_starts)
+
+    def location(self, offset: int) -> Position:
+        """
+        Returns the line and column of the character at the given offset.
+        """
+        if offset < 0:
+            raise ValueError(f'Unknown position for the offset {offset}')
+        line = bisect_right(self._line_starts, offset)
+        return Position(line=line, column=offset - self._line_starts[line - 1] + 1)
@@ -1,19 +1,253 @@
+from sys import stdin, stdout
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, TextIO
+
 from .lexer import Lexer
-from .token import (
-    Token,
-    TokenType,
-)
+from .token import Token, TokenType
+from ..evaluator.evaluator import EvaluationError, Evaluator
+from ..evaluator.objects import inspect
+from ..evaluator.persistent import PersistentEnvironment, PersistentMap
+from ..parser.parser import RECURSION_ERROR, Parser
+
+PROMPT: str = '>> '
+CONTINUATION_PROMPT: str = '.. '
+EXIT_COMMAND: str = 'exit()'
+
+HELP: str = '''Commands:
+  :time            latency of every phase for the last input
+  :tokens          switch between printing the tokens and running the program
+  :format          switch between printing the canonical source and running the program
+  :memo            hits and misses of the memoized pure functions
+  :snapshot [name] save the names defined so far, numbered when no name is given
+  :restore name    go back to the names of a snapshot
+  :help            this message
+  exit()           leave the REPL'''
+
+
+class TimedLexer(Lexer):
+    """
+    Lexer that adds up the time spent reading tokens, so the REPL can tell
+    the lexing time apart from the parsing time.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.seconds: float = 0.0
+        start = perf_counter()
+        super().__init__(source)
+        self.seconds += perf_counter() - start
+
+    def next_token(self) -> Token:
+        start = perf_counter()
+        token = super().next_token()
+        self.seconds += perf_counter() - start
+        return token
+
+
+class Repl:
+    """
+    Read-eval-print loop running the whole pipeline over the inputs.
+
+    The lines are buffered until the braces and the parentheses are balanced,
+    so a function or a block can be written in several lines.
+
+    param: _output -> Where the results are written.
+    param: _buffer -> Lines of the input that is not complete yet.
+    param: _depth -> Open braces and parentheses of the buffered lines.
+    param: _show_tokens -> Print the tokens instead of running the program.
+    param: _show_source -> Print the canonical source instead of running the program.
+    param: _environment -> The names defined by the previous inputs.
+    param: _snapshots -> Versions of the environment saved by :snapshot, by name.
+    param: _snapshot_counter -> Number of the last unnamed snapshot.
+    param: _timings -> Seconds spent in every phase by the last input.
+    param: errors -> How many inputs had errors.
+    """
+
+    def __init__(self, output: TextIO = stdout) -> None:
+        self._output = output
+        self._buffer: List[str] = []
+        self._depth: int = 0
+        self._show_tokens: bool = False
+        self._show_source: bool = False
+        self._environment = PersistentEnvironment()
+        self._snapshots: Dict[str, PersistentMap] = {}
+        self._snapshot_counter: int = 0
+        self._evaluator = Evaluator()
+        self._timings: Dict[str, float] = {}
+        self.errors: int = 0
+
+    @property
+    def pending(self) -> bool:
+        """
+        True while the buffered input waits for more lines.
+        """
+        return bool(self._buffer)
 
-EOF_TOKEN: Token = Token(TokenType.EOF, '')
+    def feed(self, line: str) -> None:
+        """
+        Adds a line to the input and runs it once it is complete.
+        """
+        if not self._buffer and line.strip().startswith(':'):
+            self._command(line.strip())
+            return
+
+        self._buffer.append(line)
+        self._depth += line.count('{') + line.count('(') - line.count('}') - line.count(')')
+        if self._depth <= 0:
+            source = '\n'.join(self._buffer)
+            self._buffer.clear()
+            self._depth = 0
+            if source.strip():
+                self.run(source)
+
+    def flush(self) -> None:
+        """
+        Runs the buffered input even if it is not complete, for the end of the input.
+        """
+        if self._buffer:
+            source = '\n'.join(self._buffer)
+            self._buffer.clear()
+            self._depth = 0
+            self.run(source)
+
+    def run(self, source: str) -> None:
+        start = perf_counter()
+        lexer = TimedLexer(source)
+        if self._show_tokens:
+            self._print_tokens(lexer)
+            return
+
+        parser = Parser(lexer)
+        try:
+            program = parser.parse_program()
+            errors = parser.errors
+        except RecursionError:
+            errors = [RECURSION_ERROR]
+        parse_seconds = perf_counter() - start - lexer.seconds
+
+        if errors:
+            start = perf_counter()
+            self.errors += 1
+            for error in errors:
+                self._output.write(f'Error: {error}\n')
+            self._timings = {'lex': lexer.seconds, 'parse': parse_seconds, 'print': perf_counter() - start}
+            return
+
+        if self._show_source:
+            from ..parser.formatter import Formatter
+            start = perf_counter()
+            Formatter(self._output).format(program)
+            self._timings = {'lex': lexer.seconds, 'parse': parse_seconds, 'print': perf_counter() - start}
+            return
+
+        start = perf_counter()
+        try:
+            result = self._evaluator.evaluate(program, self._environment)
+            text = '' if result is None else f'{inspect(result)}\n'
+        except EvaluationError as error:
+            self.errors += 1
+            text = f'Error: {error.message}'
+            if error.offset >= 0:
+                text += f' at {lexer.location(error.offset)}'
+            text += '\n'
+        eval_seconds = perf_counter() - start
+
+        start = perf_counter()
+        self._output.write(text)
+        self._timings = {'lex': lexer.seconds, 'parse': parse_seconds, 'eval': eval_seconds,
+                         'print': perf_counter() - start}
+
+    def _command(self, command: str) -> None:
+        if command == ':time':
+            if not self._timings:
+                self._output.write('Nothing was run yet\n')
+                return
+            timings = ', '.join(f'{phase} {seconds * 1000:.3f} ms' for phase, seconds in self._timings.items())
+            self._output.write(f'{timings}, total {sum(self._timings.values()) * 1000:.3f} ms\n')
+        elif command == ':tokens':
+            self._show_tokens = not self._show_tokens
+        elif command == ':format':
+            self._show_source = not self._show_source
+        elif command == ':memo':
+            stats = self._evaluator.memo_stats()
+            if not stats:
+                self._output.write('No memoized functions\n')
+            for item in stats:
+                state = '' if item.enabled else ' (disabled)'
+                self._output.write(f'{item.name or "<anonymous>"}: {item.hits} hits, {item.misses} misses, ' +
+                                   f'{item.size}/{item.max_size} cached{state}\n')
+        elif command.split()[0] in (':snapshot', ':restore'):
+            self._snapshot_command(*command.split())
+        elif command == ':help':
+            self._output.write(f'{HELP}\n')
+        else:
+            self._output.write(f'Unknown command {command}, try :help\n')
+
+    def _snapshot_command(self, command: str, *names: str) -> None:
+        """
+        The environment is persistent, saving and restoring a version of it costs the same for any size.
+        """
+        if len(names) > 1 or (command == ':restore' and not names):
+            self._output.write(f'Usage: {command} {"name" if command == ":restore" else "[name]"}\n')
+        elif command == ':snapshot':
+            if names:
+                name = names[0]
+            else:
+                # The numbers taken by the user are skipped, an unnamed snapshot never replaces one.
+                self._snapshot_counter += 1
+                while str(self._snapshot_counter) in self._snapshots:
+                    self._snapshot_counter += 1
+                name = str(self._snapshot_counter)
+            snapshot = self._environment.snapshot()
+            self._snapshots[name] = snapshot
+            self._output.write(f'Snapshot {name}: {len(snapshot)} names\n')
+        elif names[0] not in self._snapshots:
+            self._output.write(f'Unknown snapshot {names[0]}\n')
+        else:
+            self._environment.restore(self._snapshots[names[0]])
+
+    def _print_tokens(self, lexer: TimedLexer) -> None:
+        tokens: List[Token] = []
+        while (token := lexer.next_token()).token_type != TokenType.EOF:
+            tokens.append(token)
+
+        start = perf_counter()
+        for token in tokens:
+            self._output.write(f'{token}\n')
+        self._timings = {'lex': lexer.seconds, 'print': perf_counter() - start}
+
+
+def run_batch(lines: Iterable[str], output: TextIO = stdout) -> int:
+    """
+    Non interactive mode, runs the inputs without prompts and returns how many had errors.
+    """
+    repl = Repl(output)
+    for line in lines:
+        if line.rstrip('\n') == EXIT_COMMAND:
+            break
+        repl.feed(line.rstrip('\n'))
+    repl.flush()
+    output.flush()
+    return repl.errors
 
 
-def start_repl() -> None:
+def start_repl(batch: Optional[bool] = None) -> int:
     """
-    Little version of an interactive REPL.
-    Right know it only processes the characters and shows the TokenType of the written syntax.
+    Interactive REPL, or the batch mode when stdin is not a terminal or batch is True.
     """
-    while (source := input('>> ')) != 'exit()':
-        lexer: Lexer = Lexer(source)
+    if batch is None:
+        batch = not stdin.isatty()
+    if batch:
+        return 1 if run_batch(stdin) else 0
 
-        while (token := lexer.next_token()) != EOF_TOKEN:
-            print(token)
+    print('Welcome to my programming language!!!')
+    print('Write a sentence for starting!!')
+    repl = Repl()
+    while True:
+        try:
+            line = input(CONTINUATION_PROMPT if repl.pending else PROMPT)
+        except EOFError:
+            break
+        if line == EXIT_COMMAND:
+            break
+        repl.feed(line)
+    return 0
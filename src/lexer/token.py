@@ -3,7 +3,7 @@ from enum import (
     Enum,
     unique
 )
-from typing import NamedTuple, Dict
+from typing import Any, NamedTuple, Dict
 
 
 @unique
@@ -24,6 +24,7 @@ class TokenType(Enum):
     IDENT = auto()
     IF = auto()
     ILLEGAL = auto()
+    IMPORT = auto()
     INT = auto()
     LBRACE = auto()
     LPAREN = auto()
@@ -46,27 +47,48 @@ class Token(NamedTuple):
     The Token class represents a TokenType of the program
     param: toke_type -> The type of the token int, bool...
     param: literal -> The value of the token
+    param: offset -> Position of the first character of the token in the source, -1 if unknown.
 
     example: var x;
     Where var is a Token with token_type VAR and the literal 'var',
     x is a Token with token_type IDENT and literal 'x' and
     ; is a Token with token_type SEMICOLON and literal ';'
+
+    The offset is not part of the identity of the Token, two Tokens are equal
+    when they have the same token_type and literal.
     """
     token_type: TokenType
     literal: str
+    offset: int = -1
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+        return self.token_type == other.token_type and self.literal == other.literal
+
+    def __ne__(self, other: Any) -> bool:
+        if not isinstance(other, Token):
+            return NotImplemented
+        return not self == other
+
+    def __hash__(self) -> int:
+        return hash((self.token_type, self.literal))
 
     def __str__(self) -> str:
         return f'Type: {self.token_type}, Literal: {self.literal}'
 
 
+KEYWORDS: Dict[str, TokenType] = {
+    'else': TokenType.ELSE,
+    'false': TokenType.FALSE,
+    'func': TokenType.FUNCTION,
+    'if': TokenType.IF,
+    'import': TokenType.IMPORT,
+    'return': TokenType.RETURN,
+    'true': TokenType.TRUE,
+    'var': TokenType.VAR,
+}
+
+
 def lookup_token_type(literal: str) -> TokenType:
-    keywords: Dict[str, TokenType] = {
-        'else': TokenType.ELSE,
-        'false': TokenType.FALSE,
-        'func': TokenType.FUNCTION,
-        'if': TokenType.IF,
-        'return': TokenType.RETURN,
-        'true': TokenType.TRUE,
-        'var': TokenType.VAR,
-    }
-    return keywords.get(literal, TokenType.IDENT)
+    return KEYWORDS.get(literal, TokenType.IDENT)
@@ -0,0 +1,207 @@
+from itertools import chain
+from typing import Any, Iterator, List, Optional, Union
+
+from .lexer import (
+    DIGITS,
+    LETTERS,
+    SINGLE_CHARACTER_TOKENS,
+    TWO_CHARACTER_TOKENS,
+    WHITESPACE,
+    Lexer,
+)
+from .position import LineIndex, Position
+from .token import KEYWORDS, Token, TokenType
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+# Characters classified at once, the chunks end after a whitespace so no Token is split.
+DEFAULT_CHUNK_SIZE: int = 65536
+
+# The classes of the characters, the letters and the digits are the word characters.
+OTHER: int = 0
+SPACE: int = 1
+DIGIT: int = 2
+LETTER: int = 3
+
+# The kinds of the Tokens found in a chunk, in the order they are sorted by.
+IDENT_KIND: int = 0
+INT_KIND: int = 1
+OTHER_KIND: int = 2
+
+# Bytes, bytearray, memoryview and mmap, or a str that is already decoded.
+Source = Union[bytes, bytearray, memoryview, Any, str]
+
+
+def _build_ascii_classes() -> Any:
+    """
+    Table from the ASCII code to its class, the entry 128 stands for every other code point.
+    """
+    table = np.full(129, OTHER, dtype=np.uint8)
+    for code in range(128):
+        character = chr(code)
+        if character in LETTERS:
+            table[code] = LETTER
+        elif character in DIGITS:
+            table[code] = DIGIT
+        elif character in WHITESPACE:
+            table[code] = SPACE
+    return table
+
+
+def _classify_unicode(character: str) -> int:
+    """
+    Class of a character after ASCII, the same checks Lexer makes.
+    """
+    if character.isdecimal():
+        return DIGIT
+    if character.isspace():
+        return SPACE
+    return OTHER
+
+
+class ByteLexer(Lexer):
+    """
+    Lexer of a whole buffer, bytes, mmap or str, with the same Tokens and offsets as Lexer.
+
+    The characters of a chunk are classified at once with a lookup table, and
+    the boundaries of the identifier and number runs are found with NumPy, so
+    the Python loop only runs once per Token instead of once per character.
+    The offsets are characters, as in Lexer, the bytes are decoded as UTF-8.
+
+    param: _text -> The decoded source, the literals are sliced from it.
+    param: _codes -> The ASCII codes of the source when it has no other character, None otherwise.
+    param: _tokens -> The Tokens not returned yet.
+    param: _chunk_size -> Characters classified at once.
+    param: _line_index -> Table of the line start offsets, built on the first location().
+    """
+
+    def __init__(self, source: Source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        if np is None:
+            raise RuntimeError('ByteLexer needs NumPy')
+        if chunk_size < 1:
+            raise ValueError(f'The chunk size must be positive, got {chunk_size}')
+        self._chunk_size = chunk_size
+        self.reset(source)
+
+    def location(self, offset: int) -> Position:
+        if self._line_index is None:
+            self._line_index = LineIndex(self._text)
+        return self._line_index.location(offset)
+
+    def next_token(self) -> Token:
+        return next(self._tokens, self._eof)
+
+    def reset(self, source: Source) -> None:  # type: ignore[override]
+        if isinstance(source, str):
+            text = source
+            data: Optional[Any] = source.encode('ascii') if source.isascii() else None
+        else:
+            text = str(source, 'utf-8')
+            data = source if text.isascii() else None
+        self._text: str = text
+        self._codes: Optional[Any] = None if data is None else np.frombuffer(data, dtype=np.uint8)
+        self._line_index: Optional[LineIndex] = None  # type: ignore[assignment]
+        self._eof: Token = Token(TokenType.EOF, '', len(text))
+        self._tokens: Iterator[Token] = chain.from_iterable(self._read_chunks())
+
+    def _classify(self, start: int, end: int) -> Any:
+        """
+        Classes of the characters from start to end.
+        """
+        if self._codes is not None:
+            return ASCII_CLASSES[self._codes[start:end]]
+        codes = np.frombuffer(self._text[start:end].encode('utf-32-le'), dtype='<u4')
+        classes = ASCII_CLASSES[np.minimum(codes, 128)]
+        unicode = codes > 127
+        if unicode.any():
+            # Few distinct characters after ASCII, each one is checked once.
+            distinct, inverse = np.unique(codes[unicode], return_inverse=True)
+            distinct_classes = np.array([_classify_unicode(chr(code)) for code in distinct.tolist()],
+                                        dtype=np.uint8)
+            classes[unicode] = distinct_classes[inverse]
+        return classes
+
+    def _read_chunks(self) -> Iterator[List[Token]]:
+        length = len(self._text)
+        start = 0
+        while start < length:
+            size = self._chunk_size
+            while True:
+                end = min(start + size, length)
+                classes = self._classify(start, end)
+                if end == length:
+                    break
+                spaces = np.flatnonzero(classes == SPACE)
+                if spaces.size:
+                    end = start + int(spaces[-1]) + 1
+                    classes = classes[:end - start]
+                    break
+                # No whitespace to cut at, a longer chunk is classified.
+                size *= 2
+            yield self._chunk_tokens(start, classes)
+            start = end
+
+    def _chunk_tokens(self, base: int, classes: Any) -> List[Token]:
+        """
+        The Tokens of the chunk starting at base, which ends at the end of the source or after a whitespace.
+        """
+        text = self._text
+        size = len(classes)
+
+        word = np.zeros(size + 2, dtype=bool)
+        word[1:-1] = classes >= DIGIT
+        edges = np.flatnonzero(word[1:] != word[:-1])
+        run_starts = edges[0::2]
+        run_ends = edges[1::2]
+
+        # A run starting with a digit is a number up to its first letter, and an identifier from it.
+        letters = np.append(np.flatnonzero(classes == LETTER), size)
+        first_letters = letters[np.searchsorted(letters, run_starts)]
+        identifiers = first_letters == run_starts
+        numbers = ~identifiers
+        tails = numbers & (first_letters < run_ends)
+
+        others = np.flatnonzero(classes == OTHER)
+        starts = np.concatenate((run_starts[identifiers], run_starts[numbers], first_letters[tails], others))
+        ends = np.concatenate((run_ends[identifiers],
+                               np.minimum(first_letters[numbers], run_ends[numbers]),
+                               run_ends[tails],
+                               others + 1))
+        kinds = np.concatenate((np.full(int(identifiers.sum()), IDENT_KIND, dtype=np.uint8),
+                                np.full(int(numbers.sum()), INT_KIND, dtype=np.uint8),
+                                np.full(int(tails.sum()), IDENT_KIND, dtype=np.uint8),
+                                np.full(others.size, OTHER_KIND, dtype=np.uint8)))
+        order = np.argsort(starts, kind='stable')
+
+        # Token.__new__ is a Python function, the tuples are made directly.
+        make = tuple.__new__
+        keywords = KEYWORDS
+        ident = TokenType.IDENT
+        integer = TokenType.INT
+        tokens: List[Token] = []
+        append = tokens.append
+        skipped = -1
+        for start, end, kind in zip((starts[order] + base).tolist(),
+                                    (ends[order] + base).tolist(),
+                                    kinds[order].tolist()):
+            if kind == IDENT_KIND:
+                literal = text[start:end]
+                append(make(Token, (keywords.get(literal, ident), literal, start)))
+            elif kind == INT_KIND:
+                append(make(Token, (integer, text[start:end], start)))
+            elif start != skipped:
+                character = text[start]
+                if character in TWO_CHARACTER_TOKENS and text[start + 1:start + 2] == '=':
+                    skipped = start + 1
+                    append(Token(TWO_CHARACTER_TOKENS[character], f'{character}=', start))
+                elif character in SINGLE_CHARACTER_TOKENS:
+                    append(make(Token, (SINGLE_CHARACTER_TOKENS[character], character, start)))
+                else:
+                    append(Token(TokenType.ILLEGAL, character, start))
+        return tokens
+
+
+ASCII_CLASSES: Any = None if np is None else _build_ascii_classes()
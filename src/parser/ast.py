@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from functools import lru_cache
+from typing import ClassVar, List, Optional, Tuple
 
 from ..lexer.token import Token
 
+# Literals up to this size are converted directly by int() and str(), below the max str digits limit of CPython.
+INT_CHUNK_DIGITS: int = 2048
+
 
 class ASTNode(ABC):
     """
@@ -11,7 +15,10 @@ class ASTNode(ABC):
 
     function: toke_literal -> The value of the token
     function: __str__ -> The representation of the class Instance
+
+    param: child_fields -> Names of the attributes holding the child nodes, in source order.
     """
+    child_fields: ClassVar[Tuple[str, ...]] = ()
 
     @abstractmethod
     def token_literal(self) -> str:
@@ -30,6 +37,13 @@ class Statement(ASTNode):
     def __init__(self, token: Token) -> None:
         self.token = token
 
+    @property
+    def offset(self) -> int:
+        """
+        Offset of the token in the source, Lexer.location() turns it into line and column.
+        """
+        return self.token.offset
+
     def token_literal(self) -> str:
         return self.token.literal
 
@@ -40,10 +54,20 @@ class Statement(ASTNode):
 class Expression(ASTNode):
     """
     This class will be used for all the language Expressions integer, bool...
+
+    param: structural_hash -> Hash of the expression tree, cached when the node is interned by a NodeFactory.
     """
 
     def __init__(self, token: Token) -> None:
         self.token = token
+        self.structural_hash: Optional[int] = None
+
+    @property
+    def offset(self) -> int:
+        """
+        Offset of the token in the source, Lexer.location() turns it into line and column.
+        """
+        return self.token.offset
 
     def token_literal(self) -> str:
         return self.token.literal
@@ -58,6 +82,7 @@ class Program(ASTNode):
 
     param: statements -> All the detected commands of the program.
     """
+    child_fields = ('statements',)
 
     def __init__(self, statements: List[Statement]) -> None:
         self.statements = statements
@@ -106,6 +131,7 @@ class VarStatement(Statement):
     x -> name
     10 -> value
     """
+    child_fields = ('name', 'value')
 
     def __init__(self,
                  token: Token,
@@ -130,6 +156,7 @@ class ReturnStatement(Statement):
     return -> token
     10 -> return_value
     """
+    child_fields = ('return_value',)
 
     def __init__(self,
                  token: Token,
@@ -151,6 +178,7 @@ class ExpressionStatement(Statement):
     exampleL: 5;
     5 -> ExpressionStatement.expression
     """
+    child_fields = ('expression',)
 
     def __init__(self,
                  token: Token,
@@ -162,6 +190,29 @@ class ExpressionStatement(Statement):
         return str(self.expression)
 
 
+class ImportStatement(Statement):
+    """
+    Statement for representing the 'import'
+
+    param: token -> The token of the statement.
+    param: module -> The name of the module, the name of its file without the suffix.
+
+    example: import math;
+    import -> token
+    math -> module
+    """
+    child_fields = ('module',)
+
+    def __init__(self,
+                 token: Token,
+                 module: Optional[Identifier] = None) -> None:
+        super().__init__(token)
+        self.module = module
+
+    def __str__(self) -> str:
+        return f'{self.token_literal()} {str(self.module)};'
+
+
 class Integer(Expression):
     """
     Expresion for representing the integer types.
@@ -171,19 +222,39 @@ class Integer(Expression):
 
     example: var x = 5;
     5 -> Token.TokenType == INTEGER, value = 5
+
+    When no value is given the literal of the token is converted to int the
+    first time the value is read, so parsing never pays for the conversion.
     """
 
     def __init__(self,
                  token: Token,
                  value: Optional[int] = None) -> None:
         super().__init__(token)
-        self.value = value
+        self._value = value
+        self._from_literal = value is None
+
+    @property
+    def value(self) -> Optional[int]:
+        if self._value is None and self._from_literal and self.token.literal:
+            self._value = literal_to_int(self.token.literal)
+        return self._value
+
+    @value.setter
+    def value(self, value: Optional[int]) -> None:
+        self._value = value
+        self._from_literal = False
 
     def __str__(self) -> str:
-        return str(self.value)
+        literal = self.token.literal
+        if self._from_literal and literal.isascii() and literal.isdigit():
+            return literal.lstrip('0') or '0'
+        value = self.value
+        return 'None' if value is None else int_to_literal(value)
 
 
 class Prefix(Expression):
+    child_fields = ('right',)
 
     def __init__(self,
                  token: Token,
@@ -198,6 +269,7 @@ class Prefix(Expression):
 
 
 class Infix(Expression):
+    child_fields = ('left', 'right')
 
     def __init__(self,
                  token: Token,
@@ -211,3 +283,153 @@ class Infix(Expression):
 
     def __str__(self) -> str:
         return f'({str(self.left)} {self.operator} {str(self.right)})'
+
+
+class Boolean(Expression):
+    """
+    Expression for representing the literals 'true' and 'false'
+    """
+
+    def __init__(self, token: Token, value: bool) -> None:
+        super().__init__(token)
+        self.value = value
+
+    def __str__(self) -> str:
+        return self.token_literal()
+
+
+class Block(Statement):
+    """
+    Statement for representing the statements between braces '{ ... }'
+
+    param: statements -> The statements of the block.
+    """
+    child_fields = ('statements',)
+
+    def __init__(self, token: Token, statements: List[Statement]) -> None:
+        super().__init__(token)
+        self.statements = statements
+
+    def __str__(self) -> str:
+        if not self.statements:
+            return '{}'
+        return '{ ' + ' '.join(str(statement) for statement in self.statements) + ' }'
+
+
+class If(Expression):
+    """
+    Expression for representing the conditional 'if (x) { ... } else { ... }'
+
+    param: condition -> The expression deciding the branch.
+    param: consequence -> The block run when the condition is truthy.
+    param: alternative -> The optional else block.
+    """
+    child_fields = ('condition', 'consequence', 'alternative')
+
+    def __init__(self,
+                 token: Token,
+                 condition: Optional[Expression] = None,
+                 consequence: Optional[Block] = None,
+                 alternative: Optional[Block] = None) -> None:
+        super().__init__(token)
+        self.condition = condition
+        self.consequence = consequence
+        self.alternative = alternative
+
+    def __str__(self) -> str:
+        condition = str(self.condition)
+        if not isinstance(self.condition, (Infix, Prefix)):
+            condition = f'({condition})'
+        out = f'{self.token_literal()} {condition} {str(self.consequence)}'
+        if self.alternative is not None:
+            out += f' else {str(self.alternative)}'
+        return out
+
+
+class Function(Expression):
+    """
+    Expression for representing the function literal 'func(x, y) { ... }'
+
+    param: parameters -> The names of the arguments.
+    param: body -> The block run by every call.
+    """
+    child_fields = ('parameters', 'body')
+
+    def __init__(self,
+                 token: Token,
+                 parameters: Optional[List[Identifier]] = None,
+                 body: Optional[Block] = None) -> None:
+        super().__init__(token)
+        self.parameters: List[Identifier] = parameters or []
+        self.body = body
+
+    def __str__(self) -> str:
+        parameters = ', '.join(str(parameter) for parameter in self.parameters)
+        return f'{self.token_literal()}({parameters}) {str(self.body)}'
+
+
+class Call(Expression):
+    """
+    Expression for representing the call 'add(1, 2)'
+
+    param: function -> The expression evaluated to the called function.
+    param: arguments -> The expressions passed as arguments.
+    """
+    child_fields = ('function', 'arguments')
+
+    def __init__(self,
+                 token: Token,
+                 function: Expression,
+                 arguments: Optional[List[Expression]] = None) -> None:
+        super().__init__(token)
+        self.function = function
+        self.arguments: List[Expression] = arguments or []
+
+    def __str__(self) -> str:
+        arguments = ', '.join(str(argument) for argument in self.arguments)
+        return f'{str(self.function)}({arguments})'
+
+
+def literal_to_int(literal: str) -> int:
+    """
+    Converts a literal of digits to int. Long literals are split near their
+    middle and joined with big int multiplications, which is subquadratic and
+    avoids the max str digits limit of int().
+    """
+    if len(literal) <= INT_CHUNK_DIGITS:
+        return int(literal)
+    low_digits = _split_exponent(len(literal) - 1)
+    return literal_to_int(literal[:-low_digits]) * _power_of_ten(low_digits) + literal_to_int(literal[-low_digits:])
+
+
+def int_to_literal(value: int) -> str:
+    """
+    The digits of an int, the inverse of literal_to_int. Long values are split
+    near their middle with divmod, so they are printed whatever the max str
+    digits limit of str().
+    """
+    if value < 0:
+        return '-' + int_to_literal(-value)
+    if value < _power_of_ten(INT_CHUNK_DIGITS):
+        return str(value)
+    # bit_length * log10(2) never overestimates the digits, so 10 ** (digits - 1) <= value and high is not zero.
+    low_digits = _split_exponent(int(value.bit_length() * 0.30102999566398) - 1)
+    high, low = divmod(value, _power_of_ten(low_digits))
+    return int_to_literal(high) + int_to_literal(low).zfill(low_digits)
+
+
+def _split_exponent(digits: int) -> int:
+    """
+    The largest INT_CHUNK_DIGITS * 2 ** k up to digits. The numbers are only
+    split at these, so a few powers of ten serve every length.
+    """
+    exponent = INT_CHUNK_DIGITS
+    while exponent * 2 <= digits:
+        exponent *= 2
+    return exponent
+
+
+# Enough for the INT_CHUNK_DIGITS * 2 ** k exponents of any int that fits in memory.
+@lru_cache(maxsize=64)
+def _power_of_ten(exponent: int) -> int:
+    return 10 ** exponent
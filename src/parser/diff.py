@@ -0,0 +1,339 @@
+from bisect import bisect_left
+from collections import Counter
+from hashlib import blake2b
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .ast import ASTNode, Boolean, Identifier, Infix, Integer, Prefix, Program
+from .parser import Parser
+from .visitor import children
+from ..lexer.lexer import Lexer
+from ..lexer.position import LineIndex, Position
+
+DIGEST_SIZE: int = 16
+
+# Digest of the empty child of a node, for example a VarStatement without value.
+EMPTY_DIGEST: bytes = bytes(DIGEST_SIZE)
+
+# Steps the edit script of a window without unique statements can take, its
+# cost is the size of the window times the edits, a window needing more is
+# replaced as a whole.
+EDIT_SCRIPT_BUDGET: int = 2_000_000
+
+MerkleHashes = Dict[int, bytes]
+
+# A replaced region, old_start, old_end, new_start and new_end.
+Region = Tuple[int, int, int, int]
+
+
+class Change(NamedTuple):
+    """
+    One difference between two Programs.
+
+    param: kind -> 'insert', 'delete' or 'change'.
+    param: old -> The node of the old Program, None for insertions.
+    param: new -> The node of the new Program, None for deletions.
+    param: old_position -> Where the old node starts, when the old source is known.
+    param: new_position -> Where the new node starts, when the new source is known.
+    """
+    kind: str
+    old: Optional[ASTNode]
+    new: Optional[ASTNode]
+    old_position: Optional[Position] = None
+    new_position: Optional[Position] = None
+
+    def __str__(self) -> str:
+        old_position = self.old_position or '-'
+        new_position = self.new_position or '-'
+        old = '' if self.old is None else str(self.old)
+        new = '' if self.new is None else str(self.new)
+        return f'{self.kind} [{old_position}] -> [{new_position}]: {old} => {new}'
+
+
+def merkle_hashes(root: ASTNode, hashes: Optional[MerkleHashes] = None) -> MerkleHashes:
+    """
+    Hashes every subtree bottom-up, the digest of a node covers its type, its
+    token literal and the digests of its children. The result is indexed by
+    id() of the nodes, so identical subtrees are recognised with one comparison.
+    """
+    if hashes is None:
+        hashes = {}
+    pending: List[Tuple[ASTNode, bool]] = [(root, False)]
+    while pending:
+        node, children_done = pending.pop()
+        if id(node) in hashes:
+            continue
+        if not children_done:
+            pending.append((node, True))
+            pending.extend((child, False) for child in children(node))
+            continue
+
+        digest = blake2b(_label(node), digest_size=DIGEST_SIZE)
+        for field in node.child_fields:
+            value = getattr(node, field)
+            if value is None:
+                digest.update(EMPTY_DIGEST)
+            elif isinstance(value, list):
+                digest.update(len(value).to_bytes(8, 'little'))
+                for child in value:
+                    digest.update(hashes[id(child)])
+            else:
+                digest.update(hashes[id(value)])
+        hashes[id(node)] = digest.digest()
+    return hashes
+
+
+def diff_programs(old: Program,
+                  new: Program,
+                  old_lines: Optional[LineIndex] = None,
+                  new_lines: Optional[LineIndex] = None) -> List[Change]:
+    """
+    Returns the statements inserted and deleted between both Programs, and for the
+    statements that were modified, the smallest expressions that changed.
+
+    The statements are aligned by their digests (see _align), and identical
+    subtrees are skipped without descending into them, so the cost is close
+    to linear in the number of nodes.
+    """
+    hashes = merkle_hashes(old)
+    merkle_hashes(new, hashes)
+
+    old_statements = old.statements
+    new_statements = new.statements
+    regions = _align([hashes[id(statement)] for statement in old_statements],
+                     [hashes[id(statement)] for statement in new_statements])
+
+    changes: List[Change] = []
+    for old_start, old_end, new_start, new_end in regions:
+        old_block = old_statements[old_start:old_end]
+        new_block = new_statements[new_start:new_end]
+        paired = min(len(old_block), len(new_block))
+        for old_statement, new_statement in zip(old_block, new_block):
+            _diff_nodes(old_statement, new_statement, hashes, changes)
+        for old_statement in old_block[paired:]:
+            changes.append(Change('delete', old_statement, None))
+        for new_statement in new_block[paired:]:
+            changes.append(Change('insert', None, new_statement))
+
+    return [_with_positions(change, old_lines, new_lines) for change in changes]
+
+
+def diff_sources(old_source: str, new_source: str) -> Tuple[List[Change], List[str]]:
+    """
+    Parses both sources and diffs them, returns the changes and the parse errors.
+    """
+    old_lexer = Lexer(old_source)
+    new_lexer = Lexer(new_source)
+    old_parser = Parser(old_lexer)
+    new_parser = Parser(new_lexer)
+    old_program = old_parser.parse_program()
+    new_program = new_parser.parse_program()
+
+    errors = [f'old: {error}' for error in old_parser.errors] + \
+             [f'new: {error}' for error in new_parser.errors]
+    changes = diff_programs(old_program, new_program, LineIndex(old_source), LineIndex(new_source))
+    return changes, errors
+
+
+def _diff_nodes(old: ASTNode, new: ASTNode, hashes: MerkleHashes, changes: List[Change]) -> None:
+    pending: List[Tuple[Optional[ASTNode], Optional[ASTNode]]] = [(old, new)]
+    while pending:
+        old_node, new_node = pending.pop()
+        if old_node is None or new_node is None:
+            if old_node is not new_node:
+                changes.append(Change('change', old_node, new_node))
+            continue
+        if hashes[id(old_node)] == hashes[id(new_node)]:
+            continue
+
+        old_children = _child_slots(old_node)
+        new_children = _child_slots(new_node)
+        if _label(old_node) != _label(new_node) or len(old_children) != len(new_children):
+            changes.append(Change('change', old_node, new_node))
+            continue
+        pending.extend(reversed(list(zip(old_children, new_children))))
+
+
+def _align(old: List[bytes], new: List[bytes]) -> List[Region]:
+    """
+    The regions of statements that differ, in order. Every window is trimmed
+    of its common prefix and suffix and split at the statements whose digest
+    appears once in each side, taking the longest increasing run of them as
+    anchors, like patience diff. Only the windows without anchors get an
+    edit script, and only while it is short.
+    """
+    regions: List[Region] = []
+    pending: List[Region] = [(0, len(old), 0, len(new))]
+    while pending:
+        old_start, old_end, new_start, new_end = pending.pop()
+        while old_start < old_end and new_start < new_end and old[old_start] == new[new_start]:
+            old_start += 1
+            new_start += 1
+        while old_start < old_end and new_start < new_end and old[old_end - 1] == new[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+        if old_start == old_end or new_start == new_end:
+            if old_start != old_end or new_start != new_end:
+                regions.append((old_start, old_end, new_start, new_end))
+            continue
+
+        anchors = _anchors(old, new, old_start, old_end, new_start, new_end)
+        if anchors:
+            previous_old, previous_new = old_start, new_start
+            for old_index, new_index in anchors:
+                pending.append((previous_old, old_index, previous_new, new_index))
+                previous_old, previous_new = old_index + 1, new_index + 1
+            pending.append((previous_old, old_end, previous_new, new_end))
+            continue
+        script = _edit_script(old, new, (old_start, old_end, new_start, new_end))
+        regions.extend(script if script is not None else [(old_start, old_end, new_start, new_end)])
+    regions.sort()
+    return regions
+
+
+def _anchors(old: List[bytes], new: List[bytes],
+             old_start: int, old_end: int, new_start: int, new_end: int) -> List[Tuple[int, int]]:
+    """
+    The longest chain of digests unique in both windows whose positions increase in both.
+    """
+    old_counts = Counter(old[old_start:old_end])
+    new_positions: Dict[bytes, int] = {}
+    new_counts: 'Counter[bytes]' = Counter()
+    for index in range(new_start, new_end):
+        digest = new[index]
+        if old_counts[digest] == 1:
+            new_counts[digest] += 1
+            new_positions[digest] = index
+    candidates = [(index, new_positions[old[index]]) for index in range(old_start, old_end)
+                  if new_counts[old[index]] == 1 and old_counts[old[index]] == 1]
+
+    # Longest increasing subsequence of the new positions, with patience sorting.
+    tails: List[int] = []
+    tail_candidates: List[int] = []
+    previous: List[int] = []
+    for candidate, (_, new_index) in enumerate(candidates):
+        pile = bisect_left(tails, new_index)
+        if pile == len(tails):
+            tails.append(new_index)
+            tail_candidates.append(candidate)
+        else:
+            tails[pile] = new_index
+            tail_candidates[pile] = candidate
+        previous.append(tail_candidates[pile - 1] if pile else -1)
+
+    chain: List[Tuple[int, int]] = []
+    candidate = tail_candidates[-1] if tail_candidates else -1
+    while candidate != -1:
+        chain.append(candidates[candidate])
+        candidate = previous[candidate]
+    chain.reverse()
+    return chain
+
+
+def _edit_script(old: List[bytes], new: List[bytes], window: Region) -> Optional[List[Region]]:
+    """
+    The regions of the shortest edit script of the window, with the greedy
+    algorithm of Myers, O((N + M) D) for D edits. None when D is over the budget.
+    """
+    old_start, old_end, new_start, new_end = window
+    old_length = old_end - old_start
+    new_length = new_end - new_start
+    max_edits = min(old_length + new_length, max(1, EDIT_SCRIPT_BUDGET // max(1, old_length + new_length)))
+    offset = max_edits + 1
+    furthest = [0] * (2 * max_edits + 3)
+    trace: List[List[int]] = []
+    for edits in range(max_edits + 1):
+        trace.append(furthest[:])
+        for diagonal in range(-edits, edits + 1, 2):
+            if diagonal == -edits or (diagonal != edits and
+                                      furthest[offset + diagonal - 1] < furthest[offset + diagonal + 1]):
+                x = furthest[offset + diagonal + 1]
+            else:
+                x = furthest[offset + diagonal - 1] + 1
+            y = x - diagonal
+            while x < old_length and y < new_length and old[old_start + x] == new[new_start + y]:
+                x += 1
+                y += 1
+            furthest[offset + diagonal] = x
+            if x >= old_length and y >= new_length:
+                return _script_regions(trace, offset, old_length, new_length, old_start, new_start)
+    return None
+
+
+def _script_regions(trace: List[List[int]], offset: int,
+                    x: int, y: int, old_start: int, new_start: int) -> List[Region]:
+    """
+    Walks the edit script back from the end and joins the adjacent edits in regions.
+    """
+    edits: List[Tuple[int, int, bool]] = []
+    for count in range(len(trace) - 1, 0, -1):
+        furthest = trace[count]
+        diagonal = x - y
+        if diagonal == -count or (diagonal != count and
+                                  furthest[offset + diagonal - 1] < furthest[offset + diagonal + 1]):
+            previous_diagonal = diagonal + 1
+        else:
+            previous_diagonal = diagonal - 1
+        previous_x = furthest[offset + previous_diagonal]
+        previous_y = previous_x - previous_diagonal
+        # The diagonal moves are equal statements, the last move is the edit.
+        x, y = previous_x, previous_y
+        edits.append((x, y, previous_diagonal == diagonal + 1))
+    edits.reverse()
+
+    regions: List[Region] = []
+    for x, y, insertion in edits:
+        end_x, end_y = (x, y + 1) if insertion else (x + 1, y)
+        if regions and regions[-1][1] == old_start + x and regions[-1][3] == new_start + y:
+            last = regions[-1]
+            regions[-1] = (last[0], old_start + end_x, last[2], new_start + end_y)
+        else:
+            regions.append((old_start + x, old_start + end_x, new_start + y, new_start + end_y))
+    return regions
+
+
+def _child_slots(node: ASTNode) -> List[Optional[ASTNode]]:
+    slots: List[Optional[ASTNode]] = []
+    for field in node.child_fields:
+        value = getattr(node, field)
+        if isinstance(value, list):
+            slots.extend(value)
+        else:
+            slots.append(value)
+    return slots
+
+
+def _label(node: ASTNode) -> bytes:
+    """
+    The type of the node, with the literal of the leaves and the operator of
+    the operations. The token of the other nodes is the first token of a
+    child, which would make a change of the child a change of the parent.
+    """
+    if isinstance(node, (Identifier, Integer, Boolean)):
+        literal = node.token_literal()
+    elif isinstance(node, (Infix, Prefix)):
+        literal = node.operator
+    else:
+        literal = ''
+    return f'{type(node).__name__}\0{literal}'.encode()
+
+
+def _start_offset(node: ASTNode) -> int:
+    while isinstance(node, Infix):
+        node = node.left
+    return getattr(node, 'offset', -1)
+
+
+def _position(node: Optional[ASTNode], lines: Optional[LineIndex]) -> Optional[Position]:
+    if node is None or lines is None:
+        return None
+    offset = _start_offset(node)
+    if offset < 0:
+        return None
+    return lines.location(offset)
+
+
+def _with_positions(change: Change,
+                    old_lines: Optional[LineIndex],
+                    new_lines: Optional[LineIndex]) -> Change:
+    return change._replace(old_position=_position(change.old, old_lines),
+                           new_position=_position(change.new, new_lines))
@@ -0,0 +1,259 @@
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Type,
+    Union,
+)
+
+from .ast import (
+    ASTNode,
+    Block,
+    Boolean,
+    Call,
+    ExpressionStatement,
+    Function,
+    Identifier,
+    If,
+    ImportStatement,
+    Infix,
+    Integer,
+    Prefix,
+    Program,
+    ReturnStatement,
+    VarStatement,
+)
+from .parser import PRECEDENCES, Precedence
+from ..lexer.lexer import SINGLE_CHARACTER_TOKENS, TWO_CHARACTER_TOKENS
+
+# Characters kept in memory before writing them to the stream.
+DEFAULT_BUFFER_SIZE: int = 1 << 16
+
+INDENTATION: str = '    '
+
+# The precedences of the infix operators, by their literal.
+OPERATOR_PRECEDENCES: Dict[str, Precedence] = {
+    **{character: PRECEDENCES[token_type]
+       for character, token_type in SINGLE_CHARACTER_TOKENS.items() if token_type in PRECEDENCES},
+    **{f'{character}=': PRECEDENCES[token_type] for character, token_type in TWO_CHARACTER_TOKENS.items()},
+}
+
+# Precedence of the expressions that are not operations, they are never parenthesized.
+ATOM_PRECEDENCE: int = Precedence.CALL + 1
+
+
+class _Layout:
+    """
+    Piece that breaks the line, after changing the indentation by step levels.
+    """
+
+    def __init__(self, step: int) -> None:
+        self.step = step
+
+
+NEWLINE = _Layout(0)
+INDENT = _Layout(1)
+DEDENT = _Layout(-1)
+
+Piece = Union[str, ASTNode, _Layout, None]
+PiecesFn = Callable[[ASTNode], Sequence[Piece]]
+
+
+class Formatter:
+    """
+    Writes the canonical source of a Program to a text stream.
+
+    Every node is expanded into the pieces of text and child nodes it is made
+    of, and the pieces are consumed from an explicit stack, so the whole tree
+    is printed in one iterative traversal in linear time, and without
+    building the text of every subtree like str() does.
+
+    The expressions only have the parentheses their precedence needs, so a
+    chain of left associative operators stays flat and is parsed again
+    without nesting, unlike the fully parenthesized str(). The statements go
+    one per line, with the expression statements ending in ';', and the
+    statements of the blocks go in their own lines too, indented.
+
+    param: _stream -> Where the source is written.
+    param: _buffer_size -> Characters kept in memory before writing them to the stream.
+    """
+
+    def __init__(self, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self._stream = stream
+        self._buffer_size = buffer_size
+
+    def format(self, node: ASTNode) -> None:
+        buffer: List[str] = []
+        buffered = 0
+        depth = 0
+        pieces_fns = PIECES_FNS
+        pending: List[Piece] = [node]
+        while pending:
+            piece = pending.pop()
+            if isinstance(piece, str):
+                buffer.append(piece)
+                buffered += len(piece)
+                if buffered >= self._buffer_size:
+                    self._stream.write(''.join(buffer))
+                    buffer.clear()
+                    buffered = 0
+            elif piece is None:
+                raise ValueError('Cannot format an incomplete program')
+            elif isinstance(piece, _Layout):
+                depth += piece.step
+                pending.append('\n' + INDENTATION * depth)
+            else:
+                try:
+                    pieces_fn = pieces_fns[type(piece)]
+                except KeyError:
+                    pending.append(str(piece))
+                    continue
+                pending.extend(reversed(pieces_fn(piece)))
+
+        if buffer:
+            self._stream.write(''.join(buffer))
+
+
+def format_program(program: ASTNode, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+    Formatter(stream, buffer_size).format(program)
+
+
+def _program_pieces(program: ASTNode) -> Sequence[Piece]:
+    assert isinstance(program, Program)
+    pieces: List[Piece] = []
+    for statement in program.statements:
+        pieces.append(statement)
+        pieces.append(NEWLINE)
+    return pieces
+
+
+def _block_pieces(block: ASTNode) -> Sequence[Piece]:
+    assert isinstance(block, Block)
+    if not block.statements:
+        return ('{}',)
+    pieces: List[Piece] = ['{', INDENT]
+    for index, statement in enumerate(block.statements):
+        if index:
+            pieces.append(NEWLINE)
+        pieces.append(statement)
+    pieces.extend((DEDENT, '}'))
+    return pieces
+
+
+def _var_pieces(statement: ASTNode) -> Sequence[Piece]:
+    assert isinstance(statement, VarStatement)
+    return (f'{statement.token_literal()} ', statement.name, ' = ', statement.value, ';')
+
+
+def _return_pieces(statement: ASTNode) -> Sequence[Piece]:
+    assert isinstance(statement, ReturnStatement)
+    return (f'{statement.token_literal()} ', statement.return_value, ';')
+
+
+def _import_pieces(statement: ASTNode) -> Sequence[Piece]:
+    assert isinstance(statement, ImportStatement)
+    return (f'{statement.token_literal()} ', statement.module, ';')
+
+
+def _expression_statement_pieces(statement: ASTNode) -> Sequence[Piece]:
+    assert isinstance(statement, ExpressionStatement)
+    return (statement.expression, ';')
+
+
+def _identifier_pieces(identifier: ASTNode) -> Sequence[Piece]:
+    assert isinstance(identifier, Identifier)
+    return (identifier.value,)
+
+
+def _integer_pieces(integer: ASTNode) -> Sequence[Piece]:
+    return (str(integer),)
+
+
+def _precedence(expression: Optional[ASTNode]) -> int:
+    """
+    How tightly the expression binds, the operand of an operator binding tighter is not parenthesized.
+    """
+    expression_type = type(expression)
+    if expression_type is Infix:
+        return OPERATOR_PRECEDENCES.get(expression.operator, Precedence.LOWEST)  # type: ignore
+    if expression_type is Prefix:
+        return Precedence.PREFIX
+    if expression_type is Call:
+        return Precedence.CALL
+    if expression_type is Integer and expression.value < 0:  # type: ignore
+        # A folded negative literal is written as a prefix minus.
+        return Precedence.PREFIX
+    return ATOM_PRECEDENCE
+
+
+def _operand(expression: Optional[ASTNode], parenthesized: bool) -> Sequence[Piece]:
+    return ('(', expression, ')') if parenthesized else (expression,)
+
+
+def _prefix_pieces(prefix: ASTNode) -> Sequence[Piece]:
+    assert isinstance(prefix, Prefix)
+    return (prefix.operator, *_operand(prefix.right, _precedence(prefix.right) < Precedence.PREFIX))
+
+
+def _infix_pieces(infix: ASTNode) -> Sequence[Piece]:
+    assert isinstance(infix, Infix)
+    precedence = _precedence(infix)
+    # The operators are left associative, the right operand of the same precedence is grouped.
+    return (*_operand(infix.left, _precedence(infix.left) < precedence),
+            f' {infix.operator} ',
+            *_operand(infix.right, _precedence(infix.right) <= precedence))
+
+
+def _boolean_pieces(boolean: ASTNode) -> Sequence[Piece]:
+    return (boolean.token_literal(),)
+
+
+def _if_pieces(if_expression: ASTNode) -> Sequence[Piece]:
+    assert isinstance(if_expression, If)
+    pieces: List[Piece] = ['if (', if_expression.condition, ') ', if_expression.consequence]
+    if if_expression.alternative is not None:
+        pieces.extend((' else ', if_expression.alternative))
+    return pieces
+
+
+def _function_pieces(function: ASTNode) -> Sequence[Piece]:
+    assert isinstance(function, Function)
+    pieces: List[Piece] = [f'{function.token_literal()}(']
+    for index, parameter in enumerate(function.parameters):
+        if index:
+            pieces.append(', ')
+        pieces.append(parameter)
+    pieces.extend((') ', function.body))
+    return pieces
+
+
+def _call_pieces(call: ASTNode) -> Sequence[Piece]:
+    assert isinstance(call, Call)
+    pieces: List[Piece] = [*_operand(call.function, _precedence(call.function) < Precedence.CALL), '(']
+    for index, argument in enumerate(call.arguments):
+        if index:
+            pieces.append(', ')
+        pieces.append(argument)
+    pieces.append(')')
+    return pieces
+
+
+PIECES_FNS: Dict[Type[ASTNode], PiecesFn] = {
+    Program: _program_pieces,
+    VarStatement: _var_pieces,
+    ReturnStatement: _return_pieces,
+    ExpressionStatement: _expression_statement_pieces,
+    ImportStatement: _import_pieces,
+    Identifier: _identifier_pieces,
+    Integer: _integer_pieces,
+    Prefix: _prefix_pieces,
+    Infix: _infix_pieces,
+    Block: _block_pieces,
+    Boolean: _boolean_pieces,
+    If: _if_pieces,
+    Function: _function_pieces,
+    Call: _call_pieces,
+}
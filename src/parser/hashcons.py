@@ -0,0 +1,131 @@
+from sys import getsizeof
+from typing import Any, Dict, NamedTuple, Optional, Tuple, TypeVar, cast
+
+from .ast import (
+    Expression,
+    Identifier,
+    Infix,
+    Integer,
+    Prefix,
+)
+
+E = TypeVar('E', bound=Expression)
+
+StructuralKey = Tuple[Any, ...]
+
+
+class InternStats(NamedTuple):
+    """
+    Summary of the work done by a NodeFactory.
+
+    param: requested -> How many nodes were handed to the factory.
+    param: unique -> How many distinct nodes the factory keeps.
+    param: dedup_ratio -> Fraction of the requested nodes that were reused (0.0 - 1.0).
+    param: bytes_saved -> Approximate memory released by dropping the duplicated nodes.
+    """
+    requested: int
+    unique: int
+    dedup_ratio: float
+    bytes_saved: int
+
+
+class NodeFactory:
+    """
+    Hash-consing factory for the immutable expressions of the AST.
+
+    Every Identifier, Integer, Prefix and Infix passed through intern() is
+    replaced by the first structurally identical node the factory has seen, so
+    repeated subexpressions like 'x * 2' are stored only once. Children are
+    interned before their parents, which means two interned nodes are
+    structurally equal if and only if they are the same object.
+
+    The interned nodes are shared, so they must not be mutated afterwards, and
+    their offset is the one of the first occurrence.
+
+    param: _table -> The interned nodes indexed by their structural key.
+    param: _requested -> How many nodes were handed to the factory.
+    param: _bytes_saved -> Approximate size of the nodes that were discarded.
+    """
+
+    def __init__(self) -> None:
+        self._table: Dict[StructuralKey, Expression] = {}
+        self._requested: int = 0
+        self._bytes_saved: int = 0
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def intern(self, node: E) -> E:
+        """
+        Returns the shared node structurally identical to the given one.
+        Nodes of other types are returned untouched.
+        """
+        key = self._structural_key(node)
+        if key is None:
+            return node
+
+        self._requested += 1
+        try:
+            shared = self._table[key]
+        except KeyError:
+            node.structural_hash = hash(self._content_key(node))
+            self._table[key] = node
+            return node
+
+        self._bytes_saved += self._node_size(node)
+        return cast(E, shared)
+
+    def stats(self) -> InternStats:
+        unique = len(self._table)
+        dedup_ratio = 1 - unique / self._requested if self._requested else 0.0
+        return InternStats(requested=self._requested,
+                           unique=unique,
+                           dedup_ratio=dedup_ratio,
+                           bytes_saved=self._bytes_saved)
+
+    @staticmethod
+    def structurally_equal(left: Expression, right: Expression) -> bool:
+        """
+        Constant time structural equality for nodes interned by the same factory.
+        """
+        return left is right
+
+    def _content_key(self, node: Expression) -> StructuralKey:
+        """
+        Key built from the content of the node and the cached hashes of its children,
+        so the structural hash does not depend on where the nodes live in memory.
+        """
+        if isinstance(node, Infix):
+            return ('Infix', node.operator, self._child_hash(node.left), self._child_hash(node.right))
+        elif isinstance(node, Prefix):
+            return ('Prefix', node.operator, self._child_hash(node.right))
+        elif isinstance(node, Integer):
+            return ('Integer', node.token.literal or node.value)
+        assert isinstance(node, Identifier)
+        return ('Identifier', node.value)
+
+    @staticmethod
+    def _child_hash(child: Optional[Expression]) -> Optional[int]:
+        if child is None:
+            return None
+        return child.structural_hash
+
+    @staticmethod
+    def _node_size(node: Expression) -> int:
+        return getsizeof(node) + getsizeof(node.__dict__) + getsizeof(node.token)
+
+    @staticmethod
+    def _structural_key(node: Expression) -> Optional[StructuralKey]:
+        """
+        The children are already interned, so their identity is enough to
+        tell them apart.
+        """
+        if isinstance(node, Infix):
+            return (Infix, node.operator, id(node.left), id(node.right))
+        elif isinstance(node, Prefix):
+            return (Prefix, node.operator, id(node.right))
+        elif isinstance(node, Integer):
+            return (Integer, node.token.literal or node.value)
+        elif isinstance(node, Identifier):
+            return (Identifier, node.value)
+        return None
@@ -1,10 +1,16 @@
 from enum import IntEnum
-from typing import Optional, List, Callable, Dict
+from typing import TYPE_CHECKING, Any, Optional, List, Callable, ClassVar, Dict, Iterable, Iterator, Tuple, TypeVar, Union
 
 from .ast import (
+    Block,
+    Boolean,
+    Call,
     Expression,
     ExpressionStatement,
+    Function,
     Identifier,
+    If,
+    ImportStatement,
     Infix,
     Integer,
     Prefix,
@@ -13,14 +19,21 @@ from .ast import (
     Statement,
     VarStatement,
 )
+from ..lexer.buffer import TokenBuffer
 from ..lexer.lexer import Lexer
+from ..lexer.position import Position
 from ..lexer.token import Token, TokenType
 
-PrefixParseFn = Callable[[], Optional[Expression]]
-InfixParseFn = Callable[[Expression], Optional[Expression]]
+if TYPE_CHECKING:
+    from .hashcons import NodeFactory
+
+PrefixParseFn = Callable[['Parser'], Optional[Expression]]
+InfixParseFn = Callable[['Parser', Expression], Optional[Expression]]
 PrefixParseFns = Dict[TokenType, PrefixParseFn]
 InfixParseFns = Dict[TokenType, InfixParseFn]
 
+E = TypeVar('E', bound=Expression)
+
 
 class Precedence(IntEnum):
     LOWEST = 1
@@ -32,6 +45,9 @@ class Precedence(IntEnum):
     CALL = 7
 
 
+# The error of a source nested deeper than the parser can recurse, parse_program() raises RecursionError.
+RECURSION_ERROR: str = 'Maximum recursion depth exceeded while parsing'
+
 PRECEDENCES: Dict[TokenType, Precedence] = {
     TokenType.EQ: Precedence.EQUALS,
     TokenType.NOT_EQ: Precedence.EQUALS,
@@ -41,41 +57,91 @@ PRECEDENCES: Dict[TokenType, Precedence] = {
     TokenType.MINUS: Precedence.SUM,
     TokenType.DIVISION: Precedence.PRODUCT,
     TokenType.MULTIPLICATION: Precedence.PRODUCT,
+    TokenType.LPAREN: Precedence.CALL,
 }
 
 
 class Parser:
+    """
+    Pratt parser that builds the Program of the Tokens read from the Lexer.
+
+    The prefix and infix dispatch tables hold the parse functions of the class
+    and are built once per class, the first time it is instantiated. reset()
+    prepares the same instance for parsing another source.
+
+    The import statements have to come before the other statements of the
+    Program, so the imports of a module are known by lexing its first lines
+    (see tools/build.py).
+
+    The Tokens are read through a TokenBuffer, which can look further than
+    the peek token and go back to a mark without lexing again.
+
+    param: _lexer -> The lexer that provides the Tokens.
+    param: _tokens -> The buffer of the Tokens of the lexer.
+    param: _node_factory -> Optional NodeFactory used for sharing the identical expressions.
+    param: _max_integer_digits -> Longest integer literal accepted, None for no limit.
+    """
+    _prefix_parse_fns: ClassVar[PrefixParseFns]
+    _infix_parse_fns: ClassVar[InfixParseFns]
+
+    def __init__(self,
+                 lexer: Lexer,
+                 node_factory: Optional['NodeFactory'] = None,
+                 max_integer_digits: Optional[int] = None) -> None:
+        if '_prefix_parse_fns' not in type(self).__dict__:
+            type(self)._build_dispatch_tables()
+
+        self._node_factory = node_factory
+        self._max_integer_digits = max_integer_digits
+        self._lexer: Lexer = lexer
+        self._tokens = TokenBuffer(lexer)
+        self.reset(lexer)
 
-    def __init__(self, lexer: Lexer) -> None:
-        self._lexer = lexer
+    @property
+    def errors(self) -> List[str]:
+        return self._errors
+
+    def reset(self, lexer_or_source: Union[Lexer, str]) -> None:
+        """
+        Starts parsing a new source, a string is read with the current Lexer after resetting it.
+        """
+        if isinstance(lexer_or_source, str):
+            self._lexer.reset(lexer_or_source)
+            self._tokens.restart()
+        else:
+            self._lexer = lexer_or_source
+            self._tokens.restart(lexer_or_source)
         self._current_token: Optional[Token] = None
         self._peek_token: Optional[Token] = None
         self._errors: List[str] = []
 
-        self._prefix_parse_fns: PrefixParseFns = self._register_prefix_fns()
-        self._infix_parse_fns: InfixParseFns = self._register_infix_fns()
-
         self._advance_tokens()
         self._advance_tokens()
 
-    @property
-    def errors(self) -> List[str]:
-        return self._errors
-
     def parse_program(self) -> Program:
         program: Program = Program(statements=[])
 
         assert self._current_token
+        imports_allowed = True
         while self._current_token.token_type != TokenType.EOF:
             statement = self._parse_statement()
-            if statement:
+            if isinstance(statement, ImportStatement) and not imports_allowed:
+                self._errors.append(f'The imports have to come before the other statements '
+                                    f'at {self._location(statement.token)}')
+            elif statement:
+                imports_allowed = imports_allowed and isinstance(statement, ImportStatement)
                 program.statements.append(statement)
             self._advance_tokens()
         return program
 
     def _advance_tokens(self) -> None:
         self._current_token = self._peek_token
-        self._peek_token = self._lexer.next_token()
+        self._peek_token = self._tokens.next_token()
+
+    @classmethod
+    def _build_dispatch_tables(cls) -> None:
+        cls._prefix_parse_fns = cls._register_prefix_fns()
+        cls._infix_parse_fns = cls._register_infix_fns()
 
     def _current_precedence(self) -> Precedence:
         assert self._current_token
@@ -95,18 +161,63 @@ class Parser:
     def _expected_token_error(self, token_type: TokenType) -> None:
         assert self._peek_token
         error = f'The expected token was {token_type} ' + \
-                f'but got {self._peek_token.token_type}'
+                f'but got {self._peek_token.token_type} at {self._location(self._peek_token)}'
         self._errors.append(error)
 
+    def _intern(self, expression: E) -> E:
+        if self._node_factory is None:
+            return expression
+        return self._node_factory.intern(expression)
+
+    def _location(self, token: Token) -> Position:
+        return self._lexer.location(token.offset)
+
+    def _parse_block(self) -> Block:
+        assert self._current_token
+        block = Block(token=self._current_token, statements=[])
+        self._advance_tokens()
+
+        while self._current_token.token_type not in (TokenType.RBRACE, TokenType.EOF):
+            statement = self._parse_statement()
+            if isinstance(statement, ImportStatement):
+                self._errors.append(f'The imports have to be at the top level at {self._location(statement.token)}')
+            elif statement:
+                block.statements.append(statement)
+            self._advance_tokens()
+
+        if self._current_token.token_type != TokenType.RBRACE:
+            self._errors.append(f'The block opened at {self._location(block.token)} is not closed')
+        return block
+
+    def _parse_boolean(self) -> Boolean:
+        assert self._current_token
+        return Boolean(token=self._current_token, value=self._current_token.token_type == TokenType.TRUE)
+
+    def _parse_call(self, function: Expression) -> Optional[Call]:
+        assert self._current_token
+        call = Call(token=self._current_token, function=function)
+        arguments = self._parse_list(TokenType.RPAREN, self._parse_call_argument)
+        if arguments is None:
+            return None
+        call.arguments = arguments
+        return call
+
+    def _parse_call_argument(self) -> Optional[Expression]:
+        return self._parse_expression(Precedence.LOWEST)
+
     def _parse_expression(self, precedence: Precedence) -> Optional[Expression]:
         assert self._current_token
         try:
             prefix_parse_fn = self._prefix_parse_fns[self._current_token.token_type]
         except KeyError:
-            self.errors.append(f'Could not find any function for parsing {self._current_token.literal}')
+            self.errors.append(f'Could not find any function for parsing {self._current_token.literal} ' +
+                               f'at {self._location(self._current_token)}')
             return None
 
-        left_expression = prefix_parse_fn()
+        left_expression = prefix_parse_fn(self)
+        if left_expression is None:
+            # The prefix function recorded the error, an operator after it has no left operand.
+            return None
 
         assert self._peek_token
         while (
@@ -117,10 +228,11 @@ class Parser:
                 infix_parse_fn = self._infix_parse_fns[self._peek_token.token_type]
                 self._advance_tokens()
 
-                assert left_expression
-                left_expression = infix_parse_fn(left_expression)
+                left_expression = infix_parse_fn(self, left_expression)
             except KeyError:
                 return left_expression
+            if left_expression is None:
+                return None
 
         return left_expression
 
@@ -135,9 +247,70 @@ class Parser:
             self._advance_tokens()
         return expression_statement
 
+    def _parse_function(self) -> Optional[Function]:
+        assert self._current_token
+        function = Function(token=self._current_token)
+
+        if not self._expected_token(TokenType.LPAREN):
+            return None
+        parameters = self._parse_list(TokenType.RPAREN, self._parse_parameter)
+        if parameters is None:
+            return None
+        function.parameters = parameters
+
+        if not self._expected_token(TokenType.LBRACE):
+            return None
+        function.body = self._parse_block()
+        return function
+
+    def _parse_grouped_expression(self) -> Optional[Expression]:
+        self._advance_tokens()
+
+        expression = self._parse_expression(Precedence.LOWEST)
+
+        if not self._expected_token(TokenType.RPAREN):
+            return None
+        return expression
+
     def _parse_identifier(self) -> Identifier:
         assert self._current_token
-        return Identifier(token=self._current_token, value=self._current_token.literal)
+        return self._intern(Identifier(token=self._current_token, value=self._current_token.literal))
+
+    def _parse_if(self) -> Optional[If]:
+        assert self._current_token
+        if_expression = If(token=self._current_token)
+
+        if not self._expected_token(TokenType.LPAREN):
+            return None
+        self._advance_tokens()
+        if_expression.condition = self._parse_expression(Precedence.LOWEST)
+        if not self._expected_token(TokenType.RPAREN):
+            return None
+
+        if not self._expected_token(TokenType.LBRACE):
+            return None
+        if_expression.consequence = self._parse_block()
+
+        assert self._peek_token
+        if self._peek_token.token_type == TokenType.ELSE:
+            self._advance_tokens()
+            if not self._expected_token(TokenType.LBRACE):
+                return None
+            if_expression.alternative = self._parse_block()
+        return if_expression
+
+    def _parse_import_statement(self) -> Optional[ImportStatement]:
+        assert self._current_token
+        import_statement = ImportStatement(token=self._current_token)
+
+        if not self._expected_token(TokenType.IDENT):
+            return None
+        import_statement.module = self._parse_identifier()
+
+        assert self._peek_token
+        if self._peek_token.token_type == TokenType.SEMICOLON:
+            self._advance_tokens()
+        return import_statement
 
     def _parse_infix_expression(self, left: Expression) -> Infix:
         assert self._current_token
@@ -149,18 +322,53 @@ class Parser:
         self._advance_tokens()
 
         infix.right = self._parse_expression(precedence)
-        return infix
+        return self._intern(infix)
 
     def _parse_integer(self) -> Optional[Integer]:
         assert self._current_token
-        integer = Integer(token=self._current_token)
+        literal = self._current_token.literal
+        if not literal.isdigit():
+            self._errors.append(f'Error parsing {self._current_token} as integer ' +
+                                f'at {self._location(self._current_token)}')
+            return None
+        if self._max_integer_digits is not None and len(literal) > self._max_integer_digits:
+            self._errors.append(f'The integer literal has {len(literal)} digits ' +
+                                f'but the maximum is {self._max_integer_digits} ' +
+                                f'at {self._location(self._current_token)}')
+            return None
+        return self._intern(Integer(token=self._current_token))
 
-        try:
-            integer.value = int(self._current_token.literal)
-        except ValueError:
-            self._errors.append(f'Error parsing {self._current_token} as integer')
+    def _parse_list(self, end: TokenType, parse_item: Callable[[], Optional[E]]) -> Optional[List[E]]:
+        """
+        Parses the items separated by commas until the end token, the current token is the opening one.
+        """
+        items: List[E] = []
+        assert self._peek_token
+        if self._peek_token.token_type == end:
+            self._advance_tokens()
+            return items
+
+        while True:
+            self._advance_tokens()
+            item = parse_item()
+            if item is None:
+                return None
+            items.append(item)
+            if self._peek_token.token_type != TokenType.COMMA:
+                break
+            self._advance_tokens()
+
+        if not self._expected_token(end):
+            return None
+        return items
+
+    def _parse_parameter(self) -> Optional[Identifier]:
+        assert self._current_token
+        if self._current_token.token_type != TokenType.IDENT:
+            self._errors.append(f'The expected parameter name was {TokenType.IDENT} ' +
+                                f'but got {self._current_token.token_type} at {self._location(self._current_token)}')
             return None
-        return integer
+        return self._parse_identifier()
 
     def _parse_var_statement(self) -> Optional[VarStatement]:
         assert self._current_token
@@ -173,8 +381,11 @@ class Parser:
         if not self._expected_token(TokenType.ASSIGN):
             return None
 
-        # TODO finish when learned how to parse expressions
-        while self._current_token.token_type != TokenType.SEMICOLON:
+        self._advance_tokens()
+        var_statement.value = self._parse_expression(Precedence.LOWEST)
+
+        assert self._peek_token
+        if self._peek_token.token_type == TokenType.SEMICOLON:
             self._advance_tokens()
 
         return var_statement
@@ -185,15 +396,17 @@ class Parser:
                                    operator=self._current_token.literal)
         self._advance_tokens()
         prefix_expression.right = self._parse_expression(Precedence.PREFIX)
-        return prefix_expression
+        return self._intern(prefix_expression)
 
     def _parse_return_statement(self) -> Optional[ReturnStatement]:
         assert self._current_token
         return_statement = ReturnStatement(token=self._current_token)
         self._advance_tokens()
 
-        # TODO finish when learned how to parse expressions
-        while self._current_token.token_type != TokenType.SEMICOLON:
+        return_statement.return_value = self._parse_expression(Precedence.LOWEST)
+
+        assert self._peek_token
+        if self._peek_token.token_type == TokenType.SEMICOLON:
             self._advance_tokens()
         return return_statement
 
@@ -203,6 +416,8 @@ class Parser:
             return self._parse_var_statement()
         elif self._current_token.token_type == TokenType.RETURN:
             return self._parse_return_statement()
+        elif self._current_token.token_type == TokenType.IMPORT:
+            return self._parse_import_statement()
         return self._parse_expression_statement()
 
     def _peek_precedence(self) -> Precedence:
@@ -212,22 +427,45 @@ class Parser:
         except KeyError:
             return Precedence.LOWEST
 
-    def _register_infix_fns(self) -> InfixParseFns:
+    @classmethod
+    def _register_infix_fns(cls) -> InfixParseFns:
         return {
-            TokenType.PLUS: self._parse_infix_expression,
-            TokenType.MINUS: self._parse_infix_expression,
-            TokenType.DIVISION: self._parse_infix_expression,
-            TokenType.MULTIPLICATION: self._parse_infix_expression,
-            TokenType.EQ: self._parse_infix_expression,
-            TokenType.NOT_EQ: self._parse_infix_expression,
-            TokenType.LT: self._parse_infix_expression,
-            TokenType.GT: self._parse_infix_expression,
+            TokenType.PLUS: cls._parse_infix_expression,
+            TokenType.MINUS: cls._parse_infix_expression,
+            TokenType.DIVISION: cls._parse_infix_expression,
+            TokenType.MULTIPLICATION: cls._parse_infix_expression,
+            TokenType.EQ: cls._parse_infix_expression,
+            TokenType.NOT_EQ: cls._parse_infix_expression,
+            TokenType.LT: cls._parse_infix_expression,
+            TokenType.GT: cls._parse_infix_expression,
+            TokenType.LPAREN: cls._parse_call,
         }
 
-    def _register_prefix_fns(self) -> PrefixParseFns:
+    @classmethod
+    def _register_prefix_fns(cls) -> PrefixParseFns:
         return {
-            TokenType.IDENT: self._parse_identifier,
-            TokenType.INT: self._parse_integer,
-            TokenType.MINUS: self._parse_prefix_expression,
-            TokenType.NEGATION: self._parse_prefix_expression,
+            TokenType.FALSE: cls._parse_boolean,
+            TokenType.FUNCTION: cls._parse_function,
+            TokenType.IDENT: cls._parse_identifier,
+            TokenType.IF: cls._parse_if,
+            TokenType.INT: cls._parse_integer,
+            TokenType.LPAREN: cls._parse_grouped_expression,
+            TokenType.MINUS: cls._parse_prefix_expression,
+            TokenType.NEGATION: cls._parse_prefix_expression,
+            TokenType.TRUE: cls._parse_boolean,
         }
+
+
+def parse_many(sources: Iterable[str], **options: Any) -> Iterator[Tuple[Program, List[str]]]:
+    """
+    Parses every source with the same Lexer and Parser and yields the Program
+    and the errors of each one. The options are passed to the Parser.
+    """
+    parser: Optional[Parser] = None
+    for source in sources:
+        if parser is None:
+            parser = Parser(Lexer(source), **options)
+        else:
+            parser.reset(source)
+        program = parser.parse_program()
+        yield program, parser.errors
@@ -0,0 +1,168 @@
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from .ast import ASTNode
+
+VisitFn = Callable[[Any, ASTNode], Any]
+# The visit function and the child fields in reverse order, ready for pushing on the stack.
+DispatchEntry = Tuple[VisitFn, Tuple[str, ...]]
+
+
+class _Skip:
+
+    def __repr__(self) -> str:
+        return 'SKIP'
+
+
+# Returned by a NodeVisitor method for not visiting the children of the node.
+SKIP = _Skip()
+
+
+class NodeVisitor:
+    """
+    Base class for walking the AST.
+
+    Subclasses define visit_<ClassName> methods, for example visit_Infix. The
+    method of the closest base class is used when a node type has no method of
+    its own (visit_Expression receives every expression) and generic_visit()
+    receives the rest. The method for every node type is looked up once per
+    visitor class and cached in _dispatch_table.
+
+    The nodes are visited in source order before their children, with an
+    explicit stack, so deep trees do not hit the recursion limit. Returning
+    SKIP from a visit method skips the children of that node.
+    """
+    _dispatch_table: ClassVar[Dict[Type[ASTNode], DispatchEntry]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._dispatch_table = {}
+
+    def generic_visit(self, node: ASTNode) -> Any:
+        return None
+
+    def visit(self, node: ASTNode) -> None:
+        dispatch_table = self._dispatch_table
+        pending: List[ASTNode] = [node]
+        pop = pending.pop
+        push = pending.append
+        while pending:
+            node = pop()
+            entry = dispatch_table.get(type(node))
+            if entry is None:
+                entry = self._resolve(type(node))
+            visit_fn, reversed_fields = entry
+
+            if visit_fn(self, node) is SKIP:
+                continue
+            for field in reversed_fields:
+                value = getattr(node, field)
+                if value is None:
+                    continue
+                if type(value) is list:
+                    pending.extend(reversed(value))
+                else:
+                    push(value)
+
+    @classmethod
+    def _resolve(cls, node_type: Type[ASTNode]) -> DispatchEntry:
+        visit_fn: VisitFn = cls.generic_visit
+        for base in node_type.__mro__:
+            method = getattr(cls, f'visit_{base.__name__}', None)
+            if method is not None:
+                visit_fn = method
+                break
+        entry = (visit_fn, tuple(reversed(node_type.child_fields)))
+        cls._dispatch_table[node_type] = entry
+        return entry
+
+
+class NodeTransformer(NodeVisitor):
+    """
+    Base class for rewriting the AST in place.
+
+    The visit_<ClassName> methods are called after the children of the node
+    were transformed, and the value they return replaces the node in its
+    parent. Returning None removes the node from a list (Program.statements)
+    or leaves the attribute empty. generic_visit() keeps the node.
+
+    skip(node) returning True keeps the node and its subtree untouched.
+    """
+
+    def generic_visit(self, node: ASTNode) -> Any:
+        return node
+
+    def skip(self, node: ASTNode) -> bool:
+        return False
+
+    def transform(self, node: ASTNode) -> Optional[ASTNode]:
+        dispatch_table = self._dispatch_table
+        results: List[Optional[ASTNode]] = []
+        pending: List[Tuple[ASTNode, bool]] = [(node, False)]
+        while pending:
+            node, children_done = pending.pop()
+            if not children_done:
+                if self.skip(node):
+                    results.append(node)
+                    continue
+                pending.append((node, True))
+                pending.extend((child, False) for child in reversed(children(node)))
+                continue
+
+            self._replace_children(node, results)
+            entry = dispatch_table.get(type(node))
+            if entry is None:
+                entry = self._resolve(type(node))
+            results.append(entry[0](self, node))
+
+        return results.pop()
+
+    @staticmethod
+    def _replace_children(node: ASTNode, results: List[Optional[ASTNode]]) -> None:
+        """
+        Takes the transformed children of the node from the end of results and
+        stores them back in the node, in the same order children() returned them.
+        """
+        fields: List[Tuple[str, Any]] = [(field, getattr(node, field)) for field in node.child_fields]
+        count = sum(len(value) if isinstance(value, list) else 1
+                    for _, value in fields if value is not None)
+        if not count:
+            return
+
+        transformed = results[-count:]
+        del results[-count:]
+        position = 0
+        for field, value in fields:
+            if value is None:
+                continue
+            if isinstance(value, list):
+                end = position + len(value)
+                value[:] = [child for child in transformed[position:end] if child is not None]
+                position = end
+            else:
+                setattr(node, field, transformed[position])
+                position += 1
+
+
+def children(node: ASTNode) -> List[ASTNode]:
+    """
+    Returns the child nodes of the node in source order.
+    """
+    nodes: List[ASTNode] = []
+    for field in node.child_fields:
+        value = getattr(node, field)
+        if value is None:
+            continue
+        if isinstance(value, list):
+            nodes.extend(value)
+        else:
+            nodes.append(value)
+    return nodes
@@ -0,0 +1,512 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from hashlib import blake2b
+from heapq import heappop, heappush
+from json import dump, load
+from os import replace, stat, walk
+from os.path import abspath, basename, dirname, isfile, join
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from ..lexer.lexer import Lexer
+from ..lexer.token import TokenType
+from ..parser.ast import ASTNode, Function, Identifier, ImportStatement, Program, VarStatement
+from ..parser.parser import Parser
+from ..parser.visitor import SKIP, NodeVisitor
+
+DEFAULT_STATE: str = '.language-build.json'
+DEFAULT_SUFFIX: str = '.lang'
+
+# Layout of the state file, the state of another version is ignored and everything is built again.
+STATE_VERSION: int = 1
+
+# The names of a module, for its importers, or of the modules it imports.
+Names = Tuple[str, ...]
+
+
+class BuildError(Exception):
+    """
+    The modules can not be built, like two files with the same module name.
+    """
+
+
+class Module(NamedTuple):
+    """
+    A source file, the module is named after the file without the suffix.
+
+    param: imports -> The modules imported, in the order of the import statements.
+    param: mtime_ns -> Modification time when the content was hashed.
+    """
+    name: str
+    path: str
+    content_hash: str
+    imports: Names
+    mtime_ns: int
+    size: int
+
+
+class ModuleResult(NamedTuple):
+    """
+    param: key -> Hash of the content and of the exports of the imports, the
+           module is checked again when it changes. Empty when it was not checked.
+    param: exports -> The names an import of the module defines, its own and the ones it imports.
+    param: errors -> Parse errors, unknown identifiers and unknown modules.
+    param: parse_seconds -> Time lexing and parsing the module the last time it was checked.
+    param: check_seconds -> Time resolving its names the last time it was checked.
+    param: cached -> True when the result is the one of the last build.
+    """
+    name: str
+    path: str
+    key: str
+    exports: Names
+    errors: Names
+    parse_seconds: float
+    check_seconds: float
+    cached: bool = False
+
+    @property
+    def seconds(self) -> float:
+        """
+        Time the module took in this build, 0 when it was cached.
+        """
+        return 0.0 if self.cached else self.parse_seconds + self.check_seconds
+
+
+class BuildReport(NamedTuple):
+    """
+    param: results -> The results of the modules in the order they were finished.
+    param: critical_path -> The chain of imports that took the longest, the
+           shortest time the build could take with enough workers.
+    param: critical_seconds -> Time of the modules of the critical path.
+    param: wall_seconds -> Time of the whole build.
+    """
+    results: List[ModuleResult]
+    critical_path: List[str]
+    critical_seconds: float
+    wall_seconds: float
+
+    @property
+    def rebuilt(self) -> List[str]:
+        """
+        The modules parsed and checked in this build.
+        """
+        return [result.name for result in self.results if result.key and not result.cached]
+
+    def errors(self) -> List[str]:
+        """
+        The errors of every module, starting with its path.
+        """
+        return [f'{result.path}: {error}' for result in self.results for error in result.errors]
+
+    def __str__(self) -> str:
+        lines = []
+        for result in self.results:
+            if result.cached:
+                lines.append(f'{result.name}: cached')
+            elif not result.key:
+                lines.append(f'{result.name}: not checked')
+            else:
+                lines.append(f'{result.name}: parse {result.parse_seconds * 1000:.1f} ms, '
+                             f'check {result.check_seconds * 1000:.1f} ms')
+        lines.append(f'critical path: {" -> ".join(self.critical_path) or "-"} '
+                     f'({self.critical_seconds * 1000:.1f} ms)')
+        lines.append(f'{len(self.results)} modules, {len(self.rebuilt)} checked in {self.wall_seconds * 1000:.1f} ms')
+        return '\n'.join(lines)
+
+
+class _Definitions(NodeVisitor):
+    """
+    The names of the var statements of a scope, the functions are scopes of their own.
+    """
+
+    def __init__(self) -> None:
+        self.names: Set[str] = set()
+
+    def visit_Function(self, node: Function) -> object:
+        return SKIP
+
+    def visit_VarStatement(self, node: VarStatement) -> None:
+        if node.name is not None:
+            self.names.add(node.name.value)
+
+
+class NameChecker(NodeVisitor):
+    """
+    Reports the identifiers that no scope defines. The names of a scope are
+    its var statements, wherever they are in it, and for a function its
+    parameters, and the global scope has the names of the imports too.
+
+    param: errors -> One per unknown identifier, with its line and column.
+    param: _names -> The names visible from the scope being visited.
+    """
+
+    def __init__(self, names: Iterable[str], lexer: Lexer) -> None:
+        self.errors: List[str] = []
+        self._names: Set[str] = set(names)
+        self._lexer = lexer
+
+    def visit_Function(self, node: Function) -> object:
+        if node.body is None:
+            return SKIP
+        names = self._names
+        self._names = names | {parameter.value for parameter in node.parameters} | _definitions(node.body)
+        self.visit(node.body)
+        self._names = names
+        return SKIP
+
+    def visit_Identifier(self, node: Identifier) -> None:
+        if node.value not in self._names:
+            self.errors.append(f'Unknown identifier {node.value} at {self._lexer.location(node.offset)}')
+
+    def visit_ImportStatement(self, node: ImportStatement) -> object:
+        return SKIP
+
+    def visit_VarStatement(self, node: VarStatement) -> object:
+        if node.value is not None:
+            self.visit(node.value)
+        return SKIP
+
+
+class Build:
+    """
+    Incremental and parallel check of the modules of the source files under
+    some paths.
+
+    The imports of a module are read by lexing the import statements at its
+    start, so the dependency graph is built without parsing. A module is
+    parsed and checked again only when its key changes, the hash of its
+    content and of the exports of the modules it imports. A module whose
+    exports did not change stops the rebuild there, its importers keep their
+    results. The state of the last build is a JSON file, and the modification
+    time and size of the files avoid reading the ones that did not change.
+
+    The modules are checked in a pool of worker processes, in topological
+    order: a module is submitted once the modules it imports are finished,
+    the ones with the longest chain of importers first.
+
+    param: _state_path -> The JSON file of the last build.
+    param: _workers -> Processes of the pool, None for one per CPU.
+    param: _suffix -> Extension of the source files.
+    """
+
+    def __init__(self,
+                 state_path: str = DEFAULT_STATE,
+                 workers: Optional[int] = None,
+                 suffix: str = DEFAULT_SUFFIX) -> None:
+        self._state_path = state_path
+        self._workers = workers
+        self._suffix = suffix
+
+    def run(self, roots: Iterable[str]) -> BuildReport:
+        start = perf_counter()
+        state = self._load_state()
+        modules = {name: _scan_module(name, path, state.get(name))
+                   for name, path in find_modules(roots, self._suffix).items()}
+
+        with ProcessPoolExecutor(self._workers) as executor:
+            results = self._schedule(modules, state, executor)
+        blocked = [name for name in modules if name not in results]
+        for name in blocked:
+            results[name] = self._blocked(name, modules, blocked)
+
+        critical_path, critical_seconds = _critical_path(modules, results)
+        self._save_state(modules, results)
+        return BuildReport(results=list(results.values()),
+                           critical_path=critical_path,
+                           critical_seconds=critical_seconds,
+                           wall_seconds=perf_counter() - start)
+
+    @staticmethod
+    def _blocked(name: str, modules: Dict[str, Module], blocked: List[str]) -> ModuleResult:
+        """
+        The result of a module that was never ready, because of an import
+        cycle. The cycle is found following its blocked imports.
+        """
+        path = [name]
+        while path.count(path[-1]) == 1:
+            path.append(next(imported for imported in modules[path[-1]].imports
+                             if imported in blocked))
+        cycle = path[path.index(path[-1]):]
+        module = modules[name]
+        return ModuleResult(name=name, path=module.path, key='', exports=(),
+                            errors=(f'The imports make the cycle {" -> ".join(cycle)}',),
+                            parse_seconds=0.0, check_seconds=0.0)
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._state_path, encoding='utf-8') as state_file:
+                state = load(state_file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+            return {}
+        return state['modules']
+
+    def _save_state(self, modules: Dict[str, Module], results: Dict[str, ModuleResult]) -> None:
+        state: Dict[str, Any] = {'version': STATE_VERSION, 'modules': {}}
+        for name, module in modules.items():
+            result = results[name]
+            if result.key:
+                state['modules'][name] = {
+                    'path': module.path,
+                    'mtime_ns': module.mtime_ns,
+                    'size': module.size,
+                    'content_hash': module.content_hash,
+                    'imports': module.imports,
+                    'key': result.key,
+                    'exports': result.exports,
+                    'errors': result.errors,
+                    'parse_seconds': result.parse_seconds,
+                    'check_seconds': result.check_seconds,
+                }
+        # Written next to the state and then renamed, so an interrupted build never leaves half a file.
+        with NamedTemporaryFile('w', encoding='utf-8', dir=dirname(abspath(self._state_path)),
+                                delete=False) as state_file:
+            dump(state, state_file)
+        replace(state_file.name, self._state_path)
+
+    @staticmethod
+    def _schedule(modules: Dict[str, Module],
+                  state: Dict[str, Dict[str, Any]],
+                  executor: ProcessPoolExecutor) -> Dict[str, ModuleResult]:
+        """
+        The results of the modules not blocked by an import cycle, in the order they were finished.
+        """
+        importers: Dict[str, List[str]] = {name: [] for name in modules}
+        waiting: Dict[str, int] = {}
+        for name, module in modules.items():
+            imports = [imported for imported in module.imports if imported in modules]
+            for imported in imports:
+                importers[imported].append(name)
+            waiting[name] = len(imports)
+        heights = _heights(modules, importers, state)
+
+        ready: List[Tuple[float, str]] = [(-heights[name], name) for name, count in waiting.items() if not count]
+        running: Dict['Future[ModuleResult]', str] = {}
+        results: Dict[str, ModuleResult] = {}
+        while ready or running:
+            finished: List[ModuleResult] = []
+            while ready:
+                module = modules[heappop(ready)[1]]
+                exports = {name: results[name].exports for name in module.imports if name in results}
+                key = _module_key(module, exports)
+                cached = state.get(module.name)
+                if cached is not None and cached['key'] == key:
+                    finished.append(ModuleResult(name=module.name, path=module.path, key=key,
+                                                 exports=tuple(cached['exports']), errors=tuple(cached['errors']),
+                                                 parse_seconds=cached['parse_seconds'],
+                                                 check_seconds=cached['check_seconds'], cached=True))
+                else:
+                    running[executor.submit(check_module, module, key, exports)] = module.name
+
+            if not finished:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                finished = [future.result() for future in done]
+                for future in done:
+                    del running[future]
+
+            for result in finished:
+                results[result.name] = result
+                for importer in importers[result.name]:
+                    waiting[importer] -= 1
+                    if not waiting[importer]:
+                        heappush(ready, (-heights[importer], importer))
+        return results
+
+
+def check_module(module: Module, key: str, imported: Mapping[str, Names]) -> ModuleResult:
+    """
+    Parses the module and reports the identifiers and the modules that are
+    unknown, given the exports of the modules it imports. Run in the workers.
+    """
+    start = perf_counter()
+    with open(module.path, 'rb') as source_file:
+        source = source_file.read().decode('utf-8', errors='replace')
+    lexer = Lexer(source)
+    parser = Parser(lexer)
+    program = parser.parse_program()
+    parsed = perf_counter()
+
+    errors = list(parser.errors)
+    names = _definitions(program)
+    for statement in program.statements:
+        if not isinstance(statement, ImportStatement) or statement.module is None:
+            continue
+        exports = imported.get(statement.module.value)
+        if exports is None:
+            errors.append(f'Unknown module {statement.module.value} at {lexer.location(statement.offset)}')
+        else:
+            names.update(exports)
+    if not parser.errors:
+        checker = NameChecker(names, lexer)
+        checker.visit(program)
+        errors.extend(checker.errors)
+
+    return ModuleResult(name=module.name, path=module.path, key=key, exports=tuple(sorted(names)),
+                        errors=tuple(errors), parse_seconds=parsed - start, check_seconds=perf_counter() - parsed)
+
+
+def find_modules(roots: Iterable[str], suffix: str = DEFAULT_SUFFIX) -> Dict[str, str]:
+    """
+    The paths of the source files under the roots by module name, raises
+    BuildError when two files have the same name.
+    """
+    paths: Dict[str, str] = {}
+    for root in roots:
+        root = abspath(root)
+        if isfile(root):
+            found = [root]
+        else:
+            found = [join(directory, name) for directory, _, names in walk(root)
+                     for name in sorted(names) if name.endswith(suffix)]
+        for path in found:
+            name = basename(path)[:-len(suffix)] if path.endswith(suffix) else basename(path)
+            if paths.get(name, path) != path:
+                raise BuildError(f'The module {name} is both {paths[name]} and {path}')
+            paths[name] = path
+    return paths
+
+
+def load_modules(program: Program,
+                 roots: Iterable[str],
+                 suffix: str = DEFAULT_SUFFIX) -> Tuple[Dict[str, Program], List[str]]:
+    """
+    Parses the modules the Program imports, directly or through other
+    modules, for the modules option of the Evaluator. Returns them by name
+    and the parse errors, starting with the path of their module.
+    """
+    paths = find_modules(roots, suffix)
+    modules: Dict[str, Program] = {}
+    errors: List[str] = []
+    pending = _imports(program)
+    while pending:
+        name = pending.pop()
+        if name in modules or name not in paths:
+            continue
+        with open(paths[name], encoding='utf-8') as source_file:
+            parser = Parser(Lexer(source_file.read()))
+        modules[name] = parser.parse_program()
+        errors.extend(f'{paths[name]}: {error}' for error in parser.errors)
+        pending.extend(_imports(modules[name]))
+    return modules, errors
+
+
+def scan_imports(source: str) -> Names:
+    """
+    The modules imported by the import statements at the start of the
+    source, lexing only them. The parser reports the malformed ones.
+    """
+    lexer = Lexer(source)
+    imports: Dict[str, None] = {}
+    token = lexer.next_token()
+    while token.token_type == TokenType.IMPORT:
+        token = lexer.next_token()
+        if token.token_type != TokenType.IDENT:
+            break
+        imports[token.literal] = None
+        token = lexer.next_token()
+        if token.token_type == TokenType.SEMICOLON:
+            token = lexer.next_token()
+    return tuple(imports)
+
+
+def _critical_path(modules: Dict[str, Module], results: Dict[str, ModuleResult]) -> Tuple[List[str], float]:
+    """
+    The chain of imports with the longest time in this build, the results are in topological order.
+    """
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for name, result in results.items():
+        imports = [imported for imported in modules[name].imports if imported in finish]
+        slowest = max(imports, key=finish.__getitem__, default=None)
+        previous[name] = slowest
+        finish[name] = result.seconds + (finish[slowest] if slowest is not None else 0.0)
+
+    last = max(finish, key=finish.__getitem__, default=None)
+    if last is None or not finish[last]:
+        return [], 0.0
+    seconds = finish[last]
+    path: List[str] = []
+    node: Optional[str] = last
+    while node is not None and results[node].seconds:
+        path.append(node)
+        node = previous[node]
+    return path[::-1], seconds
+
+
+def _definitions(node: ASTNode) -> Set[str]:
+    definitions = _Definitions()
+    definitions.visit(node)
+    return definitions.names
+
+
+def _heights(modules: Dict[str, Module],
+             importers: Dict[str, List[str]],
+             state: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+    """
+    The time of the longest chain of importers of every module, measured in
+    the last build, one millisecond for the modules it did not have.
+    """
+    order: List[str] = []
+    pending = [name for name, module in modules.items() if not any(imported in modules for imported in module.imports)]
+    waiting = {name: len([imported for imported in module.imports if imported in modules])
+               for name, module in modules.items()}
+    while pending:
+        name = pending.pop()
+        order.append(name)
+        for importer in importers[name]:
+            waiting[importer] -= 1
+            if not waiting[importer]:
+                pending.append(importer)
+
+    heights: Dict[str, float] = {name: 0.0 for name in modules}
+    for name in reversed(order):
+        cached = state.get(name)
+        seconds = cached['parse_seconds'] + cached['check_seconds'] if cached else 0.001
+        heights[name] = seconds + max((heights[importer] for importer in importers[name]), default=0.0)
+    return heights
+
+
+def _imports(program: Program) -> List[str]:
+    return [statement.module.value for statement in program.statements
+            if isinstance(statement, ImportStatement) and statement.module is not None]
+
+
+def _module_key(module: Module, imported: Mapping[str, Names]) -> str:
+    digest = blake2b(module.content_hash.encode(), digest_size=16)
+    for name in module.imports:
+        exports = imported.get(name)
+        digest.update(b'\0' + name.encode() + b'\0')
+        # An unknown module is not the module without exports.
+        digest.update(b'\1' if exports is None else '\0'.join(exports).encode())
+    return digest.hexdigest()
+
+
+def _scan_module(name: str, path: str, cached: Optional[Dict[str, Any]]) -> Module:
+    """
+    The Module of a file, reading it only when its modification time or size
+    changed and lexing its imports only when its content changed.
+    """
+    status = stat(path)
+    if cached is not None and cached['path'] == path and \
+            (cached['mtime_ns'], cached['size']) == (status.st_mtime_ns, status.st_size):
+        return Module(name, path, cached['content_hash'], tuple(cached['imports']), status.st_mtime_ns, status.st_size)
+
+    with open(path, 'rb') as source_file:
+        content = source_file.read()
+    content_hash = blake2b(content, digest_size=16).hexdigest()
+    if cached is not None and cached['content_hash'] == content_hash:
+        imports: Names = tuple(cached['imports'])
+    else:
+        imports = scan_imports(content.decode('utf-8', errors='replace'))
+    return Module(name, path, content_hash, imports, status.st_mtime_ns, status.st_size)
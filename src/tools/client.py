@@ -0,0 +1,126 @@
+from collections import deque
+from io import StringIO
+from json import dumps, loads
+from os import environ, getuid
+from os.path import join
+from socket import AF_UNIX, SOCK_STREAM, socket
+from tempfile import gettempdir
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+from ..lexer.lexer import Lexer
+from ..parser.ast import Program
+from ..parser.formatter import format_program
+from ..parser.parser import RECURSION_ERROR, Parser
+
+METHODS: Tuple[str, ...] = ('parse', 'check', 'format')
+
+# Requests of one connection being executed or waiting for their response to be written.
+DEFAULT_MAX_IN_FLIGHT: int = 64
+
+
+def default_socket_path() -> str:
+    return environ.get('LANGUAGE_DAEMON_SOCKET', join(gettempdir(), f'language-{getuid()}.sock'))
+
+
+def execute(method: str, source: str) -> Dict[str, Any]:
+    """
+    The work behind every request, run in the workers of the daemon or in the
+    process of the client when there is no daemon.
+
+    parse -> the errors and the program printed with str(), None when it is nested too deep.
+    check -> the errors.
+    format -> the errors and the canonical source, None when there are errors.
+    """
+    if method not in METHODS:
+        raise ValueError(f'Unknown method {method}')
+
+    parser = Parser(Lexer(source))
+    try:
+        program: Optional[Program] = parser.parse_program()
+        errors = parser.errors
+    except RecursionError:
+        program, errors = None, [RECURSION_ERROR]
+    result: Dict[str, Any] = {'errors': errors}
+    if method == 'parse':
+        result['program'] = None if program is None else str(program)
+        result['statements'] = 0 if program is None else len(program.statements)
+    elif method == 'format':
+        formatted = None
+        if program is not None and not errors:
+            stream = StringIO()
+            format_program(program, stream)
+            formatted = stream.getvalue()
+        result['source'] = formatted
+    return result
+
+
+class Client:
+    """
+    Sends requests to the Daemon, or executes them in this process when no daemon is running.
+
+    param: _socket_path -> Socket of the daemon.
+    param: _window -> Requests sent by call_many() before reading their responses.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, window: int = DEFAULT_MAX_IN_FLIGHT) -> None:
+        self._socket_path = socket_path or default_socket_path()
+        self._window = window
+
+    def call(self, method: str, source: str) -> Dict[str, Any]:
+        for result in self.call_many([(method, source)]):
+            return result
+        raise RuntimeError('The daemon closed the connection')
+
+    def call_many(self, requests: Iterable[Tuple[str, str]]) -> Iterator[Dict[str, Any]]:
+        """
+        Pipelines the requests over one connection and yields the results in order.
+        Raises RuntimeError with the message of the daemon when a request fails.
+        """
+        connection = self._connect()
+        if connection is None:
+            for method, source in requests:
+                yield execute(method, source)
+            return
+
+        with connection, connection.makefile('rb') as responses:
+            waiting: Deque[int] = deque()
+            request_iterator = iter(enumerate(requests))
+            exhausted = False
+            while not exhausted or waiting:
+                while not exhausted and len(waiting) < self._window:
+                    try:
+                        request_id, (method, source) = next(request_iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    message = {'id': request_id, 'method': method, 'source': source}
+                    connection.sendall(dumps(message).encode() + b'\n')
+                    waiting.append(request_id)
+                if not waiting:
+                    break
+
+                line = responses.readline()
+                if not line:
+                    raise RuntimeError('The daemon closed the connection')
+                response = loads(line)
+                waiting.popleft()
+                if 'error' in response:
+                    raise RuntimeError(response['error'])
+                yield response['result']
+
+    def _connect(self) -> Optional[socket]:
+        connection = socket(AF_UNIX, SOCK_STREAM)
+        try:
+            connection.connect(self._socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            connection.close()
+            return None
+        return connection
@@ -0,0 +1,170 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from json import dumps, loads
+from os import unlink
+from os.path import exists
+from signal import SIGINT, SIGTERM
+from socket import AF_UNIX, SOCK_STREAM, socket
+from threading import current_thread, main_thread
+from typing import Any, Dict, Optional, Set
+
+# The Client lives in its own module so the commands that only send requests do not import asyncio.
+from .client import (  # noqa: F401
+    DEFAULT_MAX_IN_FLIGHT,
+    METHODS,
+    Client,
+    default_socket_path,
+    execute,
+)
+
+# Longest request line accepted, the sources travel inside the requests.
+MAX_LINE_SIZE: int = 64 * 1024 * 1024
+
+Response = Dict[str, Any]
+
+
+class Daemon:
+    """
+    Long running server of newline delimited JSON requests over a Unix socket.
+
+    request: {"id": 1, "method": "check", "source": "var x = 5;"}
+    response: {"id": 1, "result": {"errors": []}} or {"id": 1, "error": "..."}
+
+    The parsing runs in a pool of worker processes. The requests of one
+    connection are executed concurrently and the responses are written in the
+    order of the requests. Once max_in_flight requests of a connection are
+    pending the daemon stops reading from it, so a fast client is slowed down
+    instead of filling the memory. stop() or SIGINT/SIGTERM stop accepting
+    connections, finish the pending requests and remove the socket.
+
+    param: _socket_path -> Where the Unix socket is created.
+    param: _workers -> Processes of the pool, None for one per CPU.
+    param: _max_in_flight -> Pending requests allowed per connection.
+    """
+
+    def __init__(self,
+                 socket_path: Optional[str] = None,
+                 workers: Optional[int] = None,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> None:
+        self._socket_path = socket_path or default_socket_path()
+        self._workers = workers
+        self._max_in_flight = max_in_flight
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._connections: Set['asyncio.Task[None]'] = set()
+        self._streams: Dict[asyncio.StreamReader, asyncio.StreamWriter] = {}
+
+    def run(self) -> None:
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        """
+        Serves until stop(), raises RuntimeError when another daemon is serving the socket path.
+        """
+        self._remove_stale_socket()
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        if current_thread() is main_thread():
+            for signal_number in (SIGINT, SIGTERM):
+                self._loop.add_signal_handler(signal_number, self._stopping.set)
+
+        self._executor = ProcessPoolExecutor(self._workers)
+        server = await asyncio.start_unix_server(self._accept, path=self._socket_path, limit=MAX_LINE_SIZE)
+        try:
+            await self._stopping.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            for reader, writer in self._streams.items():
+                writer.transport.pause_reading()  # type: ignore
+                reader.feed_eof()
+            if self._connections:
+                await asyncio.gather(*self._connections, return_exceptions=True)
+            self._executor.shutdown(wait=True)
+            if exists(self._socket_path):
+                unlink(self._socket_path)
+
+    def stop(self) -> None:
+        """
+        Thread safe request for a graceful shutdown.
+        """
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task
+        self._connections.add(task)
+        self._streams[reader] = writer
+        try:
+            await self._serve_connection(reader, writer)
+        finally:
+            self._connections.discard(task)
+            del self._streams[reader]
+
+    async def _dispatch(self, line: bytes) -> Response:
+        request_id = None
+        try:
+            request = loads(line)
+            request_id = request.get('id')
+            method = request['method']
+            source = request['source']
+            if method not in METHODS:
+                raise ValueError(f'Unknown method {method}')
+            if not isinstance(source, str):
+                raise ValueError('The source must be a string')
+            assert self._loop
+            result = await self._loop.run_in_executor(self._executor, execute, method, source)
+        except Exception as error:
+            return {'id': request_id, 'error': f'{type(error).__name__}: {error}'}
+        return {'id': request_id, 'result': result}
+
+    def _remove_stale_socket(self) -> None:
+        """
+        Removes the socket left by a daemon that did not stop cleanly, a socket that accepts connections is kept.
+        """
+        if not exists(self._socket_path):
+            return
+        with socket(AF_UNIX, SOCK_STREAM) as probe:
+            try:
+                probe.connect(self._socket_path)
+            except ConnectionRefusedError:
+                unlink(self._socket_path)
+                return
+        raise RuntimeError(f'A daemon is already serving {self._socket_path}')
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        pending: 'asyncio.Queue[Optional[asyncio.Task[Response]]]' = asyncio.Queue(self._max_in_flight)
+        writer_task = asyncio.ensure_future(self._write_responses(pending, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put(asyncio.ensure_future(self._dispatch(line)))
+        finally:
+            await pending.put(None)
+            await writer_task
+            writer.close()
+
+    @staticmethod
+    async def _write_responses(pending: 'asyncio.Queue[Optional[asyncio.Task[Response]]]',
+                               writer: asyncio.StreamWriter) -> None:
+        broken = False
+        while True:
+            task = await pending.get()
+            if task is None:
+                return
+            response = await task
+            if broken:
+                continue
+            try:
+                writer.write(dumps(response).encode() + b'\n')
+                await writer.drain()
+            except ConnectionError:
+                broken = True
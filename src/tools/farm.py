@@ -0,0 +1,393 @@
+from collections import Counter
+from multiprocessing import get_context
+from multiprocessing.connection import Connection, wait
+from os import getpid
+from signal import ITIMER_REAL, SIGALRM, setitimer, signal
+from threading import current_thread, main_thread
+from time import perf_counter
+from types import FrameType, TracebackType
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+try:
+    import resource
+except ImportError:  # Windows, the memory cap is not enforced there.
+    resource = None  # type: ignore
+
+from ..evaluator.evaluator import EvaluationError
+from ..evaluator.limits import LimitedEvaluator, StepLimitExceeded
+from ..evaluator.objects import inspect
+from ..lexer.lexer import Lexer
+from ..parser.parser import RECURSION_ERROR, Parser
+
+OK: str = 'ok'
+PARSE_ERROR: str = 'parse_error'
+ERROR: str = 'error'
+STEPS: str = 'steps'
+TIMEOUT: str = 'timeout'
+MEMORY: str = 'memory'
+CRASH: str = 'crash'
+
+# The worker is replaced after a job ends like this, its memory or its state may be damaged.
+RECYCLED: FrozenSet[str] = frozenset((STEPS, TIMEOUT, MEMORY, CRASH))
+
+DEFAULT_MAX_STEPS: int = 100_000
+DEFAULT_TIMEOUT: float = 5.0
+DEFAULT_MEMORY: int = 256 * 1024 * 1024
+
+# Seconds the farm waits after the timeout of a job before killing its worker.
+KILL_GRACE: float = 0.5
+
+# The programs of the load test when no files are given, one of every kind of result.
+LOAD_TEST_PROGRAMS: Dict[str, str] = {
+    'fib': 'var fib = func(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }; fib(15);',
+    'countdown': 'var count = func(n) { if (n == 0) { return 0; } return count(n - 1); }; count(5000);',
+    'arithmetic': 'var x = 5 * (3 + 4); var y = x / 2 - 1; x * y == 560;',
+    'parse error': 'var x 5;',
+    'type error': '1 + true;',
+    'endless': 'var loop = func() { loop(); }; loop();',
+}
+
+Job = Tuple[Hashable, str]
+
+
+class JobLimits(NamedTuple):
+    """
+    param: max_steps -> Statements a job can execute, see LimitedEvaluator.
+    param: timeout -> Seconds of wall time a job can take.
+    param: memory -> Bytes of address space a worker can add to the one it started with, None for no cap.
+    """
+    max_steps: int = DEFAULT_MAX_STEPS
+    timeout: float = DEFAULT_TIMEOUT
+    memory: Optional[int] = DEFAULT_MEMORY
+
+
+class JobResult(NamedTuple):
+    """
+    param: job_id -> The id the job was submitted with.
+    param: status -> OK, PARSE_ERROR, ERROR, STEPS, TIMEOUT, MEMORY or CRASH.
+    param: value -> The value of the program as printed by the REPL, None unless OK.
+    param: message -> The errors when the status is not OK.
+    param: steps -> Statements executed.
+    param: parse_seconds -> Time spent lexing and parsing.
+    param: eval_seconds -> Time spent evaluating.
+    param: latency_seconds -> Time from sending the job to a worker to receiving its result.
+    param: worker -> Process id of the worker.
+    """
+    job_id: Hashable
+    status: str
+    value: Optional[str]
+    message: Optional[str]
+    steps: int
+    parse_seconds: float
+    eval_seconds: float
+    latency_seconds: float
+    worker: int
+
+
+class LoadReport(NamedTuple):
+    """
+    param: jobs -> Jobs run.
+    param: seconds -> Wall time of the run.
+    param: latencies -> Seconds of every job, sorted.
+    param: statuses -> Jobs of every status.
+    param: recycled -> Workers replaced during the run.
+    """
+    jobs: int
+    seconds: float
+    latencies: List[float]
+    statuses: 'Counter[str]'
+    recycled: int
+
+    @property
+    def throughput(self) -> float:
+        return self.jobs / self.seconds if self.seconds else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """
+        Nearest rank percentile of the latencies.
+        """
+        if not self.latencies:
+            return 0.0
+        rank = max(int(len(self.latencies) * percent / 100 + 0.5), 1)
+        return self.latencies[min(rank, len(self.latencies)) - 1]
+
+    def __str__(self) -> str:
+        statuses = ', '.join(f'{count} {status}' for status, count in sorted(self.statuses.items()))
+        latencies = ', '.join(f'p{percent} {self.percentile(percent) * 1000:.1f} ms' for percent in (50, 90, 99))
+        return (f'{self.jobs} jobs in {self.seconds:.2f} s, {self.throughput:.0f} jobs/s ({statuses})\n'
+                f'latency: {latencies}, max {self.percentile(100) * 1000:.1f} ms\n'
+                f'{self.recycled} workers recycled')
+
+
+class _Timeout(Exception):
+    pass
+
+
+def run_job(job_id: Hashable, source: str, limits: JobLimits = JobLimits()) -> JobResult:
+    """
+    Parses and evaluates one program within the step budget and the timeout.
+    The timeout uses SIGALRM in the main thread, elsewhere only the farm
+    enforces it by killing the worker. The memory cap is the one of the process.
+    """
+    steps = 0
+    parse_seconds = eval_seconds = 0.0
+    value: Optional[str] = None
+    message: Optional[str] = None
+    timing = current_thread() is main_thread()
+    if timing:
+        previous_handler = signal(SIGALRM, _raise_timeout)
+        setitimer(ITIMER_REAL, limits.timeout)
+    start = perf_counter()
+    try:
+        parser = Parser(Lexer(source))
+        program = parser.parse_program()
+        parse_seconds = perf_counter() - start
+        if parser.errors:
+            status, message = PARSE_ERROR, '\n'.join(parser.errors)
+        else:
+            evaluator = LimitedEvaluator(limits.max_steps)
+            start = perf_counter()
+            try:
+                value = inspect(evaluator.evaluate(program))
+                status = OK
+            finally:
+                eval_seconds = perf_counter() - start
+                steps = evaluator.steps
+    except StepLimitExceeded as error:
+        status, message = STEPS, error.message
+    except EvaluationError as error:
+        status, message = ERROR, error.message
+    except _Timeout:
+        status, message = TIMEOUT, f'Timeout of {limits.timeout} s exceeded'
+    except MemoryError:
+        status, message = MEMORY, 'Memory limit exceeded'
+    except RecursionError:
+        status, message = PARSE_ERROR, RECURSION_ERROR
+    except Exception as error:
+        status, message = CRASH, f'{type(error).__name__}: {error}'
+    finally:
+        if timing:
+            setitimer(ITIMER_REAL, 0)
+            signal(SIGALRM, previous_handler)
+    if not parse_seconds:
+        parse_seconds = perf_counter() - start
+    return JobResult(job_id, status, value, message, steps, parse_seconds, eval_seconds, 0.0, 0)
+
+
+class _Worker:
+    """
+    A process of the farm and the job it is running.
+    """
+    __slots__ = ('process', 'connection', 'job_id', 'started', 'deadline')
+
+    def __init__(self, process: Any, connection: Connection) -> None:
+        self.process = process
+        self.connection = connection
+        self.job_id: Optional[Hashable] = None
+        self.started: float = 0.0
+        self.deadline: float = 0.0
+
+
+class Farm:
+    """
+    Runs independent programs in a pool of worker processes, every job with
+    the budget of steps, the timeout and the memory cap of the limits.
+
+    Unlike the Daemon, which uses a ProcessPoolExecutor, the farm owns its
+    processes: a worker that ran out of steps, time or memory, or that died,
+    is killed and replaced, so a job never runs in a damaged process. A worker
+    stuck past its timeout, in a computation the alarm cannot interrupt like
+    the product of huge integers, is killed KILL_GRACE seconds later.
+
+    param: _workers -> Processes of the pool.
+    param: _limits -> The limits of every job.
+    param: recycled -> Workers replaced so far.
+    """
+
+    def __init__(self, workers: Optional[int] = None, limits: JobLimits = JobLimits()) -> None:
+        self._context = get_context()
+        self._size = workers or self._context.cpu_count()
+        self._limits = limits
+        self._workers: List[_Worker] = []
+        self.recycled: int = 0
+
+    def __enter__(self) -> 'Farm':
+        return self
+
+    def __exit__(self,
+                 exception_type: Optional[Type[BaseException]],
+                 exception: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for worker in self._workers:
+            try:
+                worker.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.process.join(1.0)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.connection.close()
+        self._workers = []
+
+    def run(self, jobs: Iterable[Job]) -> Iterator[JobResult]:
+        """
+        Yields the results of the (job_id, source) pairs as they finish, not in order.
+        A job is only read from jobs when a worker is free for it.
+        """
+        while len(self._workers) < self._size:
+            self._workers.append(self._spawn())
+        pending = iter(jobs)
+        busy: Dict[Connection, _Worker] = {}
+        try:
+            yield from self._run(pending, busy)
+        finally:
+            # The consumer stopped early, the jobs still running are abandoned with their workers.
+            for worker in busy.values():
+                self._replace(worker)
+
+    def _run(self, pending: Iterator[Job], busy: Dict[Connection, '_Worker']) -> Iterator[JobResult]:
+        exhausted = False
+        while True:
+            for worker in self._workers:
+                if exhausted or worker.connection in busy:
+                    continue
+                job = next(pending, None)
+                if job is None:
+                    exhausted = True
+                    break
+                self._send(worker, job)
+                busy[worker.connection] = worker
+            if not busy:
+                return
+
+            timeout = max(min(worker.deadline for worker in busy.values()) - perf_counter(), 0.0)
+            ready = wait(list(busy) + [worker.process.sentinel for worker in busy.values()], timeout)
+            now = perf_counter()
+            for worker in list(busy.values()):
+                result = self._collect(worker, ready, now)
+                if result is None:
+                    continue
+                del busy[worker.connection]
+                if result.status in RECYCLED:
+                    self._replace(worker)
+                yield result
+
+    def _collect(self, worker: _Worker, ready: List[Any], now: float) -> Optional[JobResult]:
+        """
+        The result of the job of the worker, None while it is running.
+        """
+        latency = now - worker.started
+        if worker.connection in ready:
+            try:
+                result: JobResult = worker.connection.recv()
+                return result._replace(latency_seconds=latency)
+            except (EOFError, OSError):
+                pass
+        elif worker.process.sentinel not in ready and now < worker.deadline:
+            return None
+
+        if worker.process.is_alive():
+            status, message = TIMEOUT, f'Timeout of {self._limits.timeout} s exceeded'
+        else:
+            worker.process.join()
+            status, message = CRASH, f'The worker exited with code {worker.process.exitcode}'
+            if worker.process.exitcode in (-9, 137) and self._limits.memory is not None:
+                status, message = MEMORY, 'The worker was killed, probably out of memory'
+        return JobResult(worker.job_id, status, None, message, 0, 0.0, 0.0, latency, worker.process.pid)
+
+    def _replace(self, worker: _Worker) -> None:
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join()
+        worker.connection.close()
+        self._workers[self._workers.index(worker)] = self._spawn()
+        self.recycled += 1
+
+    def _send(self, worker: _Worker, job: Job) -> None:
+        worker.job_id = job[0]
+        worker.started = perf_counter()
+        worker.deadline = worker.started + self._limits.timeout + KILL_GRACE
+        worker.connection.send(job)
+
+    def _spawn(self) -> _Worker:
+        connection, worker_connection = self._context.Pipe()
+        process = self._context.Process(target=_work, args=(worker_connection, self._limits), daemon=True)
+        process.start()
+        worker_connection.close()
+        return _Worker(process, connection)
+
+
+def load_test(farm: Farm, sources: List[str], jobs: int) -> LoadReport:
+    """
+    Runs the sources round robin until jobs of them ran, as fast as the farm takes them.
+    """
+    recycled = farm.recycled
+    start = perf_counter()
+    latencies: List[float] = []
+    statuses: 'Counter[str]' = Counter()
+    for result in farm.run((number, sources[number % len(sources)]) for number in range(jobs)):
+        latencies.append(result.latency_seconds)
+        statuses[result.status] += 1
+    seconds = perf_counter() - start
+    latencies.sort()
+    return LoadReport(jobs, seconds, latencies, statuses, farm.recycled - recycled)
+
+
+def _address_space() -> int:
+    """
+    Bytes of address space of this process, a forked worker starts with the
+    one of its parent. 0 where /proc is not available.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return 0
+    return pages * resource.getpagesize()
+
+
+def _raise_timeout(signal_number: int, frame: Optional[FrameType]) -> None:
+    raise _Timeout()
+
+
+def _work(connection: Connection, limits: JobLimits) -> None:
+    """
+    The loop of a worker process, it ends after a job that damages it.
+    """
+    if resource is not None and limits.memory is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        soft = _address_space() + limits.memory
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    while True:
+        try:
+            job = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+        job_id, source = job
+        result = run_job(job_id, source, limits)._replace(worker=getpid())
+        connection.send(result)
+        if result.status in RECYCLED:
+            return
+
+
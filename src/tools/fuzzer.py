@@ -0,0 +1,379 @@
+from argparse import ArgumentParser
+from math import log
+from os import makedirs
+from os.path import join
+from random import Random
+from sys import gettrace, settrace
+from time import perf_counter
+from types import FrameType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from ..lexer.lexer import Lexer
+from ..lexer.token import TokenType
+from ..parser.parser import Parser
+
+SEEDS: Tuple[str, ...] = (
+    'var x = 5;',
+    'var add = func(a, b) { a + b; }; add(1, 2);',
+    'if (x < 10) { return true; } else { return false; }',
+    '-(1 + 2) * 3 / !y == z != w;',
+    'var fib = func(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); };',
+    'f(g(h(1)), (2), func() {});',
+)
+
+# Pieces the mutations insert, the tokens of the language and some characters it does not know.
+FRAGMENTS: Tuple[str, ...] = (
+    '=', '==', '!', '!=', '+', '-', '*', '/', '<', '>', '(', ')', '{', '}', ',', ';',
+    'var', 'func', 'if', 'else', 'return', 'true', 'false', 'x', '_', '0', '9', '12345',
+    ' ', '\n', '\t', ' ', '٣', 'é', '@', '"', '\x00',
+)
+
+# Sizes in bytes the cost per byte is compared at, the unit is repeated to reach them.
+SMALL_SIZE: int = 1024
+LARGE_SIZE: int = 4096
+
+# Largest size of the complexity curves of the findings.
+CURVE_SIZE: int = 65536
+
+MAX_UNIT_SIZE: int = 256
+DEFAULT_CORPUS_SIZE: int = 32
+DEFAULT_SECONDS: float = 30.0
+
+# Part of the time given to main() spent searching, the rest minimizes the findings.
+SEARCH_SHARE: float = 0.75
+
+# Source files whose lines count as coverage.
+TRACED_FILES: Tuple[str, ...] = ('lexer/lexer.py', 'lexer/buffer.py', 'parser/parser.py')
+
+
+class Cost(NamedTuple):
+    """
+    Seconds spent on a source, the fastest of several runs.
+
+    param: size -> Bytes of the source, UTF-8 encoded.
+    param: lex_seconds -> Reading every Token with the Lexer.
+    param: parse_seconds -> Parser.parse_program(), the lexing included.
+    param: error -> The exception raised, like RecursionError, None when it finished.
+    """
+    size: int
+    lex_seconds: float
+    parse_seconds: float
+    error: Optional[str]
+
+    @property
+    def per_byte(self) -> float:
+        return max(self.lex_seconds, self.parse_seconds) / max(self.size, 1)
+
+
+class Finding(NamedTuple):
+    """
+    An input that got slower per byte when it got longer, or that crashed.
+
+    param: unit -> The minimized reproducer, the source is the unit repeated.
+    param: growth -> Cost per byte at LARGE_SIZE divided by the one at SMALL_SIZE, 1 for linear inputs.
+    param: exponent -> Fitted k of the cost growing like size ** k, in the curve.
+    param: curve -> The costs of the unit repeated to sizes doubling up to CURVE_SIZE.
+    param: error -> The exception of the largest size that raised one.
+    """
+    unit: str
+    growth: float
+    exponent: float
+    curve: List[Cost]
+    error: Optional[str]
+
+
+class Entry(NamedTuple):
+    """
+    A unit of the corpus, or a crash, with the growth of its cost per byte.
+    """
+    unit: str
+    growth: float
+    error: Optional[str]
+
+
+def exponent(curve: Iterable[Cost]) -> float:
+    """
+    The slope of the least squares line of log(seconds) against log(size).
+    """
+    points = [(log(cost.size), log(max(cost.lex_seconds, cost.parse_seconds)))
+              for cost in curve if cost.size and max(cost.lex_seconds, cost.parse_seconds) > 0]
+    if len(points) < 2:
+        return 1.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return 1.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def measure(source: str, repeats: int = 3) -> Cost:
+    """
+    The cost of lexing and of parsing the source, the fastest of the repeats.
+    """
+    lex_seconds = parse_seconds = float('inf')
+    error: Optional[str] = None
+    for _ in range(repeats):
+        start = perf_counter()
+        lexer = Lexer(source)
+        try:
+            while lexer.next_token().token_type is not TokenType.EOF:
+                pass
+        except Exception as exception:
+            error = f'lexer: {type(exception).__name__}: {exception}'
+        lex_seconds = min(lex_seconds, perf_counter() - start)
+
+        start = perf_counter()
+        try:
+            Parser(Lexer(source)).parse_program()
+        except Exception as exception:
+            error = error or f'parser: {type(exception).__name__}: {exception}'
+        parse_seconds = min(parse_seconds, perf_counter() - start)
+    return Cost(_size(source), lex_seconds, parse_seconds, error)
+
+
+def minimize(unit: str, keep: Callable[[str], bool], deadline: Optional[float] = None) -> str:
+    """
+    Removes chunks of the unit, halving them down to single characters,
+    while keep() still holds for what is left.
+
+    param: deadline -> perf_counter() time when the unit found so far is returned.
+    """
+    chunk = max(len(unit) // 2, 1)
+    while chunk >= 1:
+        start = 0
+        while start < len(unit) and len(unit) > 1:
+            if deadline is not None and perf_counter() > deadline:
+                return unit
+            candidate = unit[:start] + unit[start + chunk:]
+            if candidate and keep(candidate):
+                unit = candidate
+            else:
+                start += chunk
+        chunk //= 2
+    return unit
+
+
+def repeat(unit: str, size: int) -> str:
+    """
+    The unit repeated up to size bytes, at least once.
+    """
+    return unit * max(size // max(_size(unit), 1), 1)
+
+
+class Fuzzer:
+    """
+    Mutates the units of a corpus, starting from the seeds, looking for the
+    ones whose cost per byte grows the most when they are repeated to a
+    longer source. A mutated unit joins the corpus when it grows more than
+    the entries kept, or when it runs lines of the lexer and the parser no
+    entry ran. The crashes are kept as well.
+
+    param: _random -> The source of the mutations, seeded for reproducible runs.
+    param: _corpus -> The units kept, at most corpus_size of them.
+    param: _coverage -> The lines of TRACED_FILES run by the corpus.
+    param: _crashes -> The first unit seen for every kind of error.
+    param: executions -> Units measured.
+    """
+
+    def __init__(self,
+                 seeds: Iterable[str] = SEEDS,
+                 seed: Optional[int] = None,
+                 corpus_size: int = DEFAULT_CORPUS_SIZE) -> None:
+        self._random = Random(seed)
+        self._corpus_size = corpus_size
+        self._corpus: List[Entry] = []
+        self._coverage: Set[Tuple[str, int]] = set()
+        self._crashes: Dict[str, Entry] = {}
+        self.executions: int = 0
+        for unit in seeds:
+            self._consider(unit)
+
+    @property
+    def corpus(self) -> List[Entry]:
+        return list(self._corpus)
+
+    def findings(self,
+                 count: int = 5,
+                 curve_size: int = CURVE_SIZE,
+                 deadline: Optional[float] = None) -> List[Finding]:
+        """
+        The crashes and the entries that grow the most, minimized until the
+        deadline and with their complexity curves.
+        """
+        findings: List[Finding] = []
+        entries = list(self._crashes.values()) + self._corpus[:count]
+        for entry in entries:
+            if entry.error is not None:
+                kind = _error_kind(entry.error)
+                unit = minimize(entry.unit, lambda candidate: _error_kind(self._growth(candidate)[1]) == kind, deadline)
+            else:
+                threshold = 1 + (entry.growth - 1) * 0.8
+                unit = minimize(entry.unit, lambda candidate: self._growth(candidate)[0] >= threshold, deadline)
+            growth, error = self._growth(unit)
+            curve = self.curve(unit, curve_size)
+            findings.append(Finding(unit, growth, exponent(curve), curve, error))
+        return findings
+
+    @staticmethod
+    def curve(unit: str, max_size: int = CURVE_SIZE) -> List[Cost]:
+        curve: List[Cost] = []
+        size = max(_size(unit), 64)
+        while size <= max_size:
+            curve.append(measure(repeat(unit, size)))
+            size *= 2
+        return curve
+
+    def run(self, seconds: float = DEFAULT_SECONDS, max_executions: Optional[int] = None) -> None:
+        """
+        Mutates and measures units until the time is over.
+        """
+        deadline = perf_counter() + seconds
+        while self._corpus and perf_counter() < deadline and (max_executions is None or self.executions < max_executions):
+            parent = self._random.choice(self._corpus).unit
+            self._consider(self._mutate(parent))
+
+    def _consider(self, unit: str) -> None:
+        if not unit or len(unit) > MAX_UNIT_SIZE:
+            return
+        self.executions += 1
+        growth, error = self._growth(unit)
+        entry = Entry(unit, growth, error)
+        if error is not None:
+            kind = _error_kind(error)
+            assert kind is not None
+            if kind not in self._crashes or len(unit) < len(self._crashes[kind].unit):
+                self._crashes[kind] = entry
+            return
+
+        new_lines = self._trace(unit) - self._coverage
+        slowest = self._corpus[-1].growth if len(self._corpus) >= self._corpus_size else 0.0
+        if not new_lines and growth <= slowest:
+            return
+        self._coverage |= new_lines
+        self._corpus.append(entry)
+        self._corpus.sort(key=lambda kept: -kept.growth)
+        del self._corpus[self._corpus_size:]
+
+    def _growth(self, unit: str) -> Tuple[float, Optional[str]]:
+        small = measure(repeat(unit, SMALL_SIZE))
+        large = measure(repeat(unit, LARGE_SIZE))
+        error = large.error or small.error
+        if small.per_byte == 0:
+            return 1.0, error
+        return large.per_byte / small.per_byte, error
+
+    def _mutate(self, unit: str) -> str:
+        random = self._random
+        start = random.randrange(len(unit) + 1)
+        end = min(len(unit), start + random.randint(1, 8))
+        mutation = random.randrange(6)
+        if mutation == 0:
+            return unit[:start] + random.choice(FRAGMENTS) + unit[start:]
+        if mutation == 1:
+            return unit[:start] + unit[end:]
+        if mutation == 2:
+            return unit[:start] + random.choice(FRAGMENTS) + unit[end:]
+        if mutation == 3:
+            return unit[:start] + unit[start:end] * random.randint(2, 16) + unit[end:]
+        if mutation == 4:
+            other = random.choice(self._corpus).unit
+            return unit[:start] + other[random.randrange(len(other)):]
+        return unit[:start] + chr(random.randrange(0x20, 0x3000)) + unit[start:]
+
+    @staticmethod
+    def _trace(unit: str) -> FrozenSet[Tuple[str, int]]:
+        lines: Set[Tuple[str, int]] = set()
+
+        def trace(frame: FrameType, event: str, argument: Any) -> Optional[Callable[..., Any]]:
+            filename = frame.f_code.co_filename
+            if not filename.endswith(TRACED_FILES):
+                return None
+            lines.add((filename, frame.f_lineno))
+            return trace
+
+        previous = gettrace()
+        settrace(trace)
+        try:
+            Parser(Lexer(unit)).parse_program()
+        except Exception:
+            pass
+        finally:
+            settrace(previous)
+        return frozenset(lines)
+
+
+def format_findings(findings: List[Finding]) -> str:
+    out: List[str] = []
+    for number, finding in enumerate(findings, 1):
+        status = f'crash, {finding.error}' if finding.error else f'growth {finding.growth:.2f}x'
+        out.append(f'#{number} unit {finding.unit!r}: {status}, cost ~ size ** {finding.exponent:.2f}')
+        out.append(f'  {"bytes":>8} {"lex us/B":>9} {"parse us/B":>10}')
+        for cost in finding.curve:
+            out.append(f'  {cost.size:>8} {cost.lex_seconds * 1e6 / cost.size:>9.3f} '
+                       f'{cost.parse_seconds * 1e6 / cost.size:>10.3f}'
+                       + (f'  {cost.error}' if cost.error else ''))
+    return '\n'.join(out)
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """
+    Fuzzes the Lexer and the Parser and prints the minimized findings. The
+    search takes most of the seconds given and the minimization the rest,
+    the curves are measured after.
+
+    python -m src.tools.fuzzer --seconds 60 --seed 1 --corpus fuzz-corpus
+    """
+    parser = ArgumentParser(prog='python -m src.tools.fuzzer')
+    parser.add_argument('seeds', nargs='*', help='Files with seed programs, the built in ones by default.')
+    parser.add_argument('--seconds', type=float, default=DEFAULT_SECONDS)
+    parser.add_argument('--seed', type=int, default=None, help='Seed of the mutations.')
+    parser.add_argument('--findings', type=int, default=5, help='Slowest entries reported, besides the crashes.')
+    parser.add_argument('--corpus', default=None, help='Directory where the minimized findings are written.')
+    parser.add_argument('--curve-size', type=int, default=CURVE_SIZE, help='Largest size of the curves.')
+    options = parser.parse_args(arguments)
+
+    seeds: List[str] = []
+    for path in options.seeds:
+        with open(path, encoding='utf-8') as seed_file:
+            seeds.append(seed_file.read()[:MAX_UNIT_SIZE])
+
+    deadline = perf_counter() + options.seconds
+    fuzzer = Fuzzer(seeds or SEEDS, options.seed)
+    fuzzer.run(options.seconds * SEARCH_SHARE)
+    findings = fuzzer.findings(options.findings, options.curve_size, deadline)
+    print(f'{fuzzer.executions} units measured, {len(fuzzer.corpus)} in the corpus')
+    print(format_findings(findings))
+
+    if options.corpus:
+        makedirs(options.corpus, exist_ok=True)
+        for number, finding in enumerate(findings, 1):
+            with open(join(options.corpus, f'finding-{number}.lang'), 'w', encoding='utf-8') as finding_file:
+                finding_file.write(finding.unit)
+    return 0
+
+
+def _error_kind(error: Optional[str]) -> Optional[str]:
+    """
+    'parser: RecursionError' of 'parser: RecursionError: maximum recursion depth exceeded'.
+    """
+    return None if error is None else ':'.join(error.split(':')[:2])
+
+
+def _size(source: str) -> int:
+    return len(source.encode('utf-8', 'surrogatepass'))
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+from argparse import ArgumentParser
+from json import dump, load
+from os.path import abspath, dirname
+from subprocess import PIPE, run
+from sys import executable, stderr
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+DEFAULT_BUDGET: str = 'importtime-budget.json'
+DEFAULT_RUNS: int = 7
+
+# The budget written by --update is the measured time times this.
+HEADROOM: float = 2.0
+
+
+class ImportTime(NamedTuple):
+    """
+    One line of python -X importtime, in microseconds.
+
+    param: self_us -> Time spent running the module itself.
+    param: cumulative_us -> Time spent running the module and the modules it imported first.
+    """
+    self_us: int
+    cumulative_us: int
+
+
+class Startup(NamedTuple):
+    """
+    The imports of one statement, in the fastest of several runs.
+
+    param: statement -> The code run by python -c.
+    param: total_us -> Time spent importing, the sum of the times of the modules.
+    param: modules -> Every module imported by the statement.
+    """
+    statement: str
+    total_us: int
+    modules: Dict[str, ImportTime]
+
+
+def parse_importtime(output: str) -> Dict[str, ImportTime]:
+    """
+    The modules of the standard error of python -X importtime imported after
+    site, that is by the statement, with their own time and the cumulative one.
+    The order is the order of the lines, the nested imports first.
+    """
+    modules: Dict[str, ImportTime] = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        if fields[2] == ' site':
+            modules.clear()
+            continue
+        modules[name] = ImportTime(int(fields[0]), int(fields[1]))
+    return modules
+
+
+def measure(statement: str, runs: int = DEFAULT_RUNS, directory: Optional[str] = None) -> Startup:
+    """
+    Runs the statement in new interpreters and keeps the fastest run, the
+    other runs only add the noise of the machine.
+
+    param: directory -> Where the interpreters run, the modules are imported from there.
+    """
+    best: Optional[Startup] = None
+    for _ in range(runs):
+        process = run([executable, '-X', 'importtime', '-c', statement],
+                      cwd=directory, stdout=PIPE, stderr=PIPE, universal_newlines=True, check=True)
+        modules = parse_importtime(process.stderr)
+        total = sum(time.self_us for time in modules.values())
+        if best is None or total < best.total_us:
+            best = Startup(statement, total, modules)
+    assert best is not None
+    return best
+
+
+def check(budget: Dict[str, Dict[str, Any]], startups: Dict[str, Startup]) -> List[str]:
+    """
+    The violations of the budget: startups slower than their max_us, and
+    forbidden modules imported.
+    """
+    problems: List[str] = []
+    for name, entry in budget.items():
+        startup = startups[name]
+        if startup.total_us > entry['max_us']:
+            problems.append(f'{name}: {startup.statement!r} takes {startup.total_us} us, '
+                            f'the budget is {entry["max_us"]} us')
+        for module in forbidden_imports(startup, entry.get('forbidden', ())):
+            problems.append(f'{name}: {startup.statement!r} imports {module}')
+    return problems
+
+
+def forbidden_imports(startup: Startup, forbidden: Iterable[str]) -> List[str]:
+    """
+    The forbidden modules, or their submodules, imported by the statement.
+    """
+    found: List[str] = []
+    for module in forbidden:
+        if any(name == module or name.startswith(module + '.') for name in startup.modules):
+            found.append(module)
+    return found
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """
+    Checks the committed budget of the startup, or updates it.
+
+    python -m src.tools.importtime [--update]
+    """
+    parser = ArgumentParser(prog='python -m src.tools.importtime')
+    parser.add_argument('--budget', default=DEFAULT_BUDGET)
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    parser.add_argument('--update', action='store_true',
+                        help=f'Write the measured times times {HEADROOM} as the new budget.')
+    options = parser.parse_args(arguments)
+
+    with open(options.budget) as budget_file:
+        budget: Dict[str, Dict[str, Any]] = load(budget_file)
+
+    startups: Dict[str, Startup] = {}
+    for name, entry in budget.items():
+        startup = startups[name] = measure(entry['statement'], options.runs, dirname(abspath(options.budget)))
+        slowest = sorted(startup.modules.items(), key=lambda item: -item[1].self_us)[:5]
+        print(f'{name:<8} {startup.total_us / 1000:>7.1f} ms  budget {entry["max_us"] / 1000:>7.1f} ms  '
+              f'{startup.statement}')
+        print('         slowest: ' + ', '.join(f'{module} {time.self_us / 1000:.1f} ms' for module, time in slowest))
+        if options.update:
+            entry['max_us'] = int(startup.total_us * HEADROOM)
+
+    if options.update:
+        with open(options.budget, 'w') as budget_file:
+            dump(budget, budget_file, indent=4)
+            budget_file.write('\n')
+        return 0
+
+    problems = check(budget, startups)
+    for problem in problems:
+        print(problem, file=stderr)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,226 @@
+from hashlib import blake2b
+from os import stat, walk
+from os.path import abspath, isfile, join
+from sqlite3 import Connection, connect
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from ..lexer.lexer import Lexer
+from ..parser.ast import Function, Identifier, VarStatement
+from ..parser.parser import Parser
+from ..parser.visitor import SKIP, NodeVisitor
+
+DEFAULT_DATABASE: str = '.language-index.sqlite'
+DEFAULT_SUFFIX: str = '.lang'
+
+DEFINITION: str = 'definition'
+USE: str = 'use'
+
+SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_by_name ON symbols (name, kind);
+CREATE INDEX IF NOT EXISTS symbols_by_file ON symbols (file_id);
+'''
+
+# (name, kind, offset)
+RawSymbol = Tuple[str, str, int]
+
+
+class Symbol(NamedTuple):
+    """
+    A definition (var x = ...) or a use of an identifier.
+    """
+    path: str
+    name: str
+    kind: str
+    offset: int
+    line: int
+    column: int
+
+    def __str__(self) -> str:
+        return f'{self.path}:{self.line}:{self.column}: {self.kind} of {self.name}'
+
+
+class UpdateStats(NamedTuple):
+    """
+    param: scanned -> Files found under the indexed paths.
+    param: parsed -> Files parsed again because their content changed.
+    param: removed -> Files dropped from the index because they do not exist anymore.
+    """
+    scanned: int
+    parsed: int
+    removed: int
+
+
+class SymbolCollector(NodeVisitor):
+    """
+    Collects the names defined by VarStatements and by the parameters of the
+    functions, and every other Identifier as a use.
+    """
+
+    def __init__(self) -> None:
+        self.symbols: List[RawSymbol] = []
+
+    def visit_VarStatement(self, node: VarStatement) -> object:
+        if node.name is not None:
+            self.symbols.append((node.name.value, DEFINITION, node.name.offset))
+        if node.value is not None:
+            self.visit(node.value)
+        return SKIP
+
+    def visit_Function(self, node: Function) -> object:
+        for parameter in node.parameters:
+            self.symbols.append((parameter.value, DEFINITION, parameter.offset))
+        if node.body is not None:
+            self.visit(node.body)
+        return SKIP
+
+    def visit_Identifier(self, node: Identifier) -> None:
+        self.symbols.append((node.value, USE, node.offset))
+
+
+class SymbolIndex:
+    """
+    On-disk index of where every identifier is defined and used, stored in SQLite.
+
+    update() only parses the files whose modification time or size changed and
+    whose content hash is different from the indexed one, so keeping the index
+    fresh over a large tree costs one stat() per file. The queries read the
+    index and never parse.
+
+    param: _connection -> The SQLite database.
+    """
+
+    def __init__(self, database: str = DEFAULT_DATABASE) -> None:
+        self._connection: Connection = connect(database)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'SymbolIndex':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def definitions(self, name: str) -> List[Symbol]:
+        return self._query(name, DEFINITION)
+
+    def uses(self, name: str) -> List[Symbol]:
+        return self._query(name, USE)
+
+    def update(self, paths: Iterable[str], suffix: str = DEFAULT_SUFFIX) -> UpdateStats:
+        """
+        Brings the index up to date with the files under the given paths, files
+        indexed before under other paths are kept.
+        """
+        roots = [abspath(path) for path in paths]
+        indexed: Dict[str, Tuple[int, int, int, str]] = {
+            path: (file_id, mtime_ns, size, content_hash)
+            for file_id, path, mtime_ns, size, content_hash
+            in self._connection.execute('SELECT id, path, mtime_ns, size, content_hash FROM files')
+        }
+
+        scanned = 0
+        parsed = 0
+        seen = set()
+        with self._connection:
+            for path in _source_files(roots, suffix):
+                scanned += 1
+                seen.add(path)
+                if self._update_file(path, indexed.get(path)):
+                    parsed += 1
+
+            removed = [path for path in indexed
+                       if path not in seen and any(_is_inside(path, root) for root in roots)]
+            self._connection.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in removed])
+
+        return UpdateStats(scanned=scanned, parsed=parsed, removed=len(removed))
+
+    def _query(self, name: str, kind: str) -> List[Symbol]:
+        rows = self._connection.execute(
+            'SELECT files.path, symbols.offset, symbols.line, symbols.column FROM symbols '
+            'JOIN files ON files.id = symbols.file_id '
+            'WHERE symbols.name = ? AND symbols.kind = ? '
+            'ORDER BY files.path, symbols.offset',
+            (name, kind),
+        )
+        return [Symbol(path=path, name=name, kind=kind, offset=offset, line=line, column=column)
+                for path, offset, line, column in rows]
+
+    def _update_file(self, path: str, indexed: Optional[Tuple[int, int, int, str]]) -> bool:
+        """
+        Returns True when the file had to be parsed.
+        """
+        status = stat(path)
+        if indexed is not None and indexed[1:3] == (status.st_mtime_ns, status.st_size):
+            return False
+
+        with open(path, 'rb') as source_file:
+            content = source_file.read()
+        new_hash = blake2b(content, digest_size=16).hexdigest()
+
+        if indexed is not None and indexed[3] == new_hash:
+            self._connection.execute('UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?',
+                                     (status.st_mtime_ns, status.st_size, indexed[0]))
+            return False
+
+        if indexed is not None:
+            self._connection.execute('DELETE FROM files WHERE id = ?', (indexed[0],))
+        cursor = self._connection.execute(
+            'INSERT INTO files (path, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?)',
+            (path, status.st_mtime_ns, status.st_size, new_hash),
+        )
+        file_id = cursor.lastrowid
+
+        source = content.decode('utf-8', errors='replace')
+        lexer = Lexer(source)
+        collector = SymbolCollector()
+        collector.visit(Parser(lexer).parse_program())
+        rows = []
+        for name, kind, offset in collector.symbols:
+            line, column = lexer.location(offset)
+            rows.append((file_id, name, kind, offset, line, column))
+        self._connection.executemany(
+            'INSERT INTO symbols (file_id, name, kind, offset, line, column) VALUES (?, ?, ?, ?, ?, ?)',
+            rows,
+        )
+        return True
+
+
+def _is_inside(path: str, root: str) -> bool:
+    return path == root or path.startswith(join(root, ''))
+
+
+def _source_files(roots: List[str], suffix: str) -> Iterator[str]:
+    for root in roots:
+        if isfile(root):
+            yield root
+            continue
+        for directory, _, names in walk(root):
+            for name in sorted(names):
+                if name.endswith(suffix):
+                    yield join(directory, name)
@@ -1,7 +1,16 @@
 from unittest import TestCase
 
 from src.lexer.token import Token, TokenType
-from src.parser.ast import Program, VarStatement, Identifier, ReturnStatement
+from src.parser.ast import (
+    Identifier,
+    Integer,
+    Program,
+    ReturnStatement,
+    VarStatement,
+    _power_of_ten,
+    int_to_literal,
+    literal_to_int,
+)
 
 
 class ASTTest(TestCase):
@@ -42,3 +51,38 @@ class ASTTest(TestCase):
         program_str = str(program)
 
         self.assertEqual(program_str, 'return x;')
+
+    def test_lazy_integer(self) -> None:
+        integer: Integer = Integer(token=Token(TokenType.INT, '007'))
+
+        self.assertEqual(str(integer), '7')
+        self.assertEqual(integer.value, 7)
+
+        integer.value = 8
+        self.assertEqual(str(integer), '8')
+
+    def test_long_integer_literal(self) -> None:
+        literal: str = '1234567890' * 1000
+        integer: Integer = Integer(token=Token(TokenType.INT, literal))
+
+        expected = sum(1234567890 * 10 ** (10 * position) for position in range(1000))
+
+        self.assertEqual(integer.value, expected)
+        self.assertEqual(literal_to_int(literal[:5]), 12345)
+        self.assertEqual(str(integer), literal)
+
+    def test_long_integer_to_literal(self) -> None:
+        for value in (0, -7, 10 ** 4300, 10 ** 5000 - 1, -(7 ** 9000), 123 * 10 ** 6000 + 45):
+            literal = int_to_literal(value)
+            self.assertEqual(literal_to_int(literal.lstrip('-')) * (-1 if value < 0 else 1), value)
+        integer: Integer = Integer(token=Token(TokenType.INT, '1'))
+        integer.value = 10 ** 5000
+        self.assertEqual(str(integer), '1' + '0' * 5000)
+
+    def test_powers_of_ten_shared(self) -> None:
+        _power_of_ten.cache_clear()
+        for digits in range(3000, 40000, 997):
+            self.assertEqual(literal_to_int(int_to_literal(7 * 10 ** digits + 3)), 7 * 10 ** digits + 3)
+
+        # Every length is split at INT_CHUNK_DIGITS * 2 ** k digits.
+        self.assertLessEqual(_power_of_ten.cache_info().currsize, 6)
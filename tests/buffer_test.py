@@ -0,0 +1,109 @@
+from typing import List
+from unittest import TestCase
+
+from src.lexer.buffer import INITIAL_CAPACITY, TokenBuffer
+from src.lexer.lexer import Lexer
+from src.lexer.token import Token, TokenType
+
+
+class CountingLexer(Lexer):
+
+    def __init__(self, source: str) -> None:
+        self.count: int = 0
+        super().__init__(source)
+
+    def next_token(self) -> Token:
+        self.count += 1
+        return super().next_token()
+
+
+class TokenBufferTest(TestCase):
+
+    def test_next_token(self) -> None:
+        source: str = 'var x = add(1, 2);'
+        buffer = TokenBuffer(Lexer(source))
+
+        self.assertEqual(self._read(buffer, 11), self._read(Lexer(source), 11))
+
+    def test_peek(self) -> None:
+        lexer = CountingLexer('a + b * c;')
+        buffer = TokenBuffer(lexer)
+
+        self.assertEqual(buffer.peek(3).literal, 'b')
+        self.assertEqual(buffer.peek(1).literal, 'a')
+        self.assertEqual(lexer.count, 3)
+        self.assertEqual(buffer.next_token().literal, 'a')
+        self.assertEqual(buffer.peek(2).literal, 'b')
+        self.assertEqual(buffer.peek(10).token_type, TokenType.EOF)
+        with self.assertRaises(ValueError):
+            buffer.peek(0)
+
+    def test_mark_and_reset(self) -> None:
+        lexer = CountingLexer('a b c d e f')
+        buffer = TokenBuffer(lexer)
+        buffer.next_token()
+
+        outer = buffer.mark()
+        self.assertEqual(self._literals(buffer, 2), ['b', 'c'])
+        inner = buffer.mark()
+        self.assertEqual(self._literals(buffer, 2), ['d', 'e'])
+        buffer.reset(inner)
+        self.assertEqual(self._literals(buffer, 1), ['d'])
+        buffer.reset(outer)
+        self.assertEqual(self._literals(buffer, 5), ['b', 'c', 'd', 'e', 'f'])
+
+        self.assertEqual(lexer.count, 6)
+        with self.assertRaises(ValueError):
+            buffer.reset(inner)
+
+    def test_release(self) -> None:
+        buffer = TokenBuffer(Lexer('a b c d'))
+
+        mark = buffer.mark()
+        self._read(buffer, 2)
+        self.assertEqual(len(buffer), 2)
+        buffer.release(mark)
+
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(self._literals(buffer, 2), ['c', 'd'])
+
+    def test_memory_bounded_by_window(self) -> None:
+        buffer = TokenBuffer(Lexer('x ' * 10000))
+
+        for _ in range(1000):
+            mark = buffer.mark()
+            buffer.peek(5)
+            self._read(buffer, 3)
+            buffer.reset(mark)
+            self._read(buffer, 10)
+
+        self.assertEqual(buffer.capacity, INITIAL_CAPACITY)
+        self.assertLessEqual(len(buffer), 5)
+
+    def test_grows_with_window(self) -> None:
+        buffer = TokenBuffer(Lexer(' '.join(str(number) for number in range(100))))
+        buffer.next_token()
+
+        mark = buffer.mark()
+        self._read(buffer, 50)
+        buffer.reset(mark)
+
+        self.assertEqual(self._literals(buffer, 50), [str(number) for number in range(1, 51)])
+        self.assertEqual(buffer.capacity, 64)
+
+    def test_restart(self) -> None:
+        buffer = TokenBuffer(Lexer('a b'))
+        buffer.mark()
+        buffer.peek(2)
+
+        buffer.restart(Lexer('c'))
+
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(self._literals(buffer, 1), ['c'])
+
+    def _literals(self, buffer: TokenBuffer, count: int) -> List[str]:
+        return [token.literal for token in self._read(buffer, count)]
+
+    @staticmethod
+    def _read(source: object, count: int) -> List[Token]:
+        return [source.next_token() for _ in range(count)]  # type: ignore
@@ -0,0 +1,101 @@
+from os import mkdir
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from src.evaluator.evaluator import evaluate
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser
+from src.tools.build import Build, BuildError, find_modules, load_modules, scan_imports
+
+
+def write(path: str, source: str) -> None:
+    with open(path, 'w', encoding='utf-8') as source_file:
+        source_file.write(source)
+
+
+class BuildTest(TestCase):
+
+    def setUp(self) -> None:
+        self._directory = TemporaryDirectory()
+        self.root: str = self._directory.name
+        self.sources: str = join(self.root, 'src')
+        mkdir(self.sources)
+        self.build: Build = Build(join(self.root, 'build.json'), workers=2)
+        write(join(self.sources, 'numbers.lang'), 'var two = 2;\nvar double = func(x) { x * two };')
+        write(join(self.sources, 'shapes.lang'), 'import numbers;\nvar side = double(3);')
+        write(join(self.sources, 'main.lang'), 'import shapes;\nimport numbers;\nside * two + size;')
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_build(self) -> None:
+        report = self.build.run([self.sources])
+
+        results = {result.name: result for result in report.results}
+        self.assertEqual([result.name for result in report.results], ['numbers', 'shapes', 'main'])
+        self.assertEqual(report.rebuilt, ['numbers', 'shapes', 'main'])
+        self.assertEqual(results['shapes'].exports, ('double', 'side', 'two'))
+        self.assertEqual(report.errors(), [f'{join(self.sources, "main.lang")}: '
+                                           f'Unknown identifier size at line 3, column 14'])
+        self.assertEqual(report.critical_path, ['numbers', 'shapes', 'main'])
+        self.assertAlmostEqual(report.critical_seconds, sum(result.seconds for result in report.results))
+        self.assertIn('critical path: numbers -> shapes -> main', str(report))
+
+    def test_incremental(self) -> None:
+        self.build.run([self.sources])
+
+        report = self.build.run([self.sources])
+        self.assertEqual(report.rebuilt, [])
+        self.assertEqual(len(report.errors()), 1)
+        self.assertEqual(report.critical_path, [])
+
+        # The same exports, the importers keep their results.
+        write(join(self.sources, 'numbers.lang'), 'var two = 2;\nvar double = func(y) { y + y };')
+        report = self.build.run([self.sources])
+        self.assertEqual(report.rebuilt, ['numbers'])
+        self.assertEqual(report.critical_path, ['numbers'])
+
+        write(join(self.sources, 'numbers.lang'), 'var two = 2;\nvar size = 1;\nvar double = func(y) { y + y };')
+        report = self.build.run([self.sources])
+        self.assertEqual(report.rebuilt, ['numbers', 'shapes', 'main'])
+        self.assertEqual(report.errors(), [])
+
+    def test_unknown_modules_and_cycles(self) -> None:
+        write(join(self.sources, 'main.lang'), 'import shapes;\nimport missing;\nside;')
+        write(join(self.sources, 'left.lang'), 'import right;')
+        write(join(self.sources, 'right.lang'), 'import left;')
+        write(join(self.sources, 'user.lang'), 'import left;')
+
+        report = self.build.run([self.sources])
+
+        errors = {result.name: result.errors for result in report.results}
+        self.assertEqual(errors['main'], ('Unknown module missing at line 2, column 1',))
+        self.assertEqual(errors['left'], ('The imports make the cycle left -> right -> left',))
+        self.assertEqual(errors['user'], ('The imports make the cycle left -> right -> left',))
+        self.assertEqual(sorted(report.rebuilt), ['main', 'numbers', 'shapes'])
+
+        write(join(self.sources, 'missing.lang'), '')
+        self.assertEqual(self.build.run([self.sources]).rebuilt, ['missing', 'main'])
+
+    def test_find_modules(self) -> None:
+        mkdir(join(self.sources, 'other'))
+        write(join(self.sources, 'other', 'shapes.lang'), '')
+
+        with self.assertRaises(BuildError):
+            find_modules([self.sources])
+        self.assertEqual(sorted(find_modules([join(self.sources, 'other')])), ['shapes'])
+
+    def test_scan_imports(self) -> None:
+        self.assertEqual(scan_imports('import a; import b\nimport a;\nvar x = 1; import c;'), ('a', 'b'))
+        self.assertEqual(scan_imports('import 5; import a;'), ())
+        self.assertEqual(scan_imports(''), ())
+
+    def test_load_modules(self) -> None:
+        program = Parser(Lexer('import shapes; side * two;')).parse_program()
+
+        modules, errors = load_modules(program, [self.sources])
+
+        self.assertEqual(sorted(modules), ['numbers', 'shapes'])
+        self.assertEqual(errors, [])
+        self.assertEqual(evaluate(program, modules=modules), 12)
@@ -0,0 +1,82 @@
+from mmap import ACCESS_READ, mmap
+from tempfile import TemporaryFile
+from typing import List, Tuple
+from unittest import TestCase, skipIf
+
+from src.lexer.lexer import Lexer
+from src.lexer.token import TokenType
+from src.lexer.vectorized import ByteLexer, np
+from src.parser.parser import Parser
+
+SOURCE: str = '''
+var add = func(x1, y_2) {
+    return x1 + y_2 * 12ab;
+};
+if (add(5, 10) == 15 != !true) { 99 >= 7 } else { a=b;c!=d; }
+\t@ ¿ é 3٣x \x1c　 ===
+'''
+
+
+def read_all(lexer: Lexer) -> List[Tuple[TokenType, str, int]]:
+    tokens = []
+    while True:
+        token = lexer.next_token()
+        tokens.append((token.token_type, token.literal, token.offset))
+        if token.token_type == TokenType.EOF:
+            return tokens
+
+
+@skipIf(np is None, 'NumPy is not installed')
+class ByteLexerTest(TestCase):
+
+    def test_matches_lexer(self) -> None:
+        expected = read_all(Lexer(SOURCE))
+
+        self.assertEqual(read_all(ByteLexer(SOURCE.encode())), expected)
+        self.assertEqual(read_all(ByteLexer(SOURCE)), expected)
+
+    def test_matches_lexer_ascii(self) -> None:
+        source = SOURCE.encode('ascii', 'ignore').decode()
+
+        self.assertEqual(read_all(ByteLexer(source.encode())), read_all(Lexer(source)))
+
+    def test_chunks(self) -> None:
+        expected = read_all(Lexer(SOURCE))
+
+        for chunk_size in (1, 2, 3, 7, 64):
+            self.assertEqual(read_all(ByteLexer(SOURCE.encode(), chunk_size=chunk_size)), expected)
+
+    def test_chunk_without_whitespace(self) -> None:
+        source = 'abc' * 50 + '==!' + '1' * 40
+
+        self.assertEqual(read_all(ByteLexer(source.encode(), chunk_size=4)), read_all(Lexer(source)))
+
+    def test_eof(self) -> None:
+        lexer = ByteLexer(b'')
+
+        self.assertEqual(read_all(lexer), [(TokenType.EOF, '', 0)])
+        self.assertEqual(lexer.next_token().token_type, TokenType.EOF)
+
+    def test_mmap(self) -> None:
+        with TemporaryFile() as file:
+            file.write(SOURCE.encode())
+            file.flush()
+            with mmap(file.fileno(), 0, access=ACCESS_READ) as mapped:
+                self.assertEqual(read_all(ByteLexer(mapped)), read_all(Lexer(SOURCE)))
+
+    def test_location_and_reset(self) -> None:
+        lexer = ByteLexer(b'a\n  b')
+
+        self.assertEqual(lexer.location(4), (2, 3))
+
+        lexer.reset(b'\nc')
+
+        self.assertEqual(read_all(lexer), [(TokenType.IDENT, 'c', 1), (TokenType.EOF, '', 2)])
+        self.assertEqual(lexer.location(1), (2, 1))
+
+    def test_parser(self) -> None:
+        source = 'var x = 5; var y = x + 10 * 2;'
+
+        program = Parser(ByteLexer(source.encode())).parse_program()
+
+        self.assertEqual(str(program), str(Parser(Lexer(source)).parse_program()))
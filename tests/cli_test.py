@@ -0,0 +1,55 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from os.path import join
+from tempfile import TemporaryDirectory
+from typing import Tuple
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.cli import _formats_back, run
+
+
+class CliTest(TestCase):
+
+    def setUp(self) -> None:
+        self._directory = TemporaryDirectory()
+        self.path: str = join(self._directory.name, 'program.lang')
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_format_in_place_long_chain(self) -> None:
+        self._write('1+' * 1200 + '1;')
+
+        self.assertEqual(self._run('format', '-i', self.path), (0, '', ''))
+        with open(self.path, encoding='utf-8') as source_file:
+            formatted = source_file.read()
+        self.assertEqual(formatted, '1 + ' * 1200 + '1;\n')
+        self.assertTrue(_formats_back(formatted))
+
+    def test_deep_nesting(self) -> None:
+        self._write('(' * 3000 + '1' + ')' * 3000 + ';')
+        message = f'{self.path}: Maximum recursion depth exceeded while parsing\n'
+        socket_path = join(self._directory.name, 'daemon.sock')
+
+        self.assertEqual(self._run('run', self.path), (1, '', message))
+        self.assertEqual(self._run('check', '--socket', socket_path, self.path), (1, '', message))
+        self.assertEqual(self._run('format', self.path), (1, '', message))
+
+    def test_formats_back(self) -> None:
+        self.assertTrue(_formats_back('x + 1;\n'))
+        self.assertFalse(_formats_back('(x + 1);\n'))
+        self.assertFalse(_formats_back('var x 1;\n'))
+        self.assertFalse(_formats_back('(' * 3000 + '1' + ')' * 3000 + ';\n'))
+
+    def _run(self, *arguments: str) -> Tuple[int, str, str]:
+        output = StringIO()
+        errors = StringIO()
+        # The commands print to the sys streams bound when src.cli was imported, and with print().
+        with redirect_stdout(output), patch('src.cli.stdout', output), patch('src.cli.stderr', errors):
+            status = run(list(arguments))
+        return status, output.getvalue(), errors.getvalue()
+
+    def _write(self, source: str) -> None:
+        with open(self.path, 'w', encoding='utf-8') as source_file:
+            source_file.write(source)
@@ -0,0 +1,106 @@
+from typing import List
+from unittest import TestCase
+
+from src.evaluator.compiler import (
+    CONST,
+    END,
+    JUMP,
+    JUMP_IF_FALSE,
+    POP,
+    Compiler,
+    CompilingEvaluator,
+)
+from src.evaluator.evaluator import EvaluationError, Evaluator
+from src.evaluator.objects import Environment, inspect
+from tests.helpers import parse
+
+SOURCES: List[str] = [
+    '5; true; -5 + 10 * 2; (5 + 10) / 4 - -7 / 2; !!true; 1 < 2 == true;',
+    'var a = 5; var b = a * 2; a + b;',
+    'if (true) { 10 }',
+    'if (false) { 10 }',
+    'if (0) { 10 } else { 20 }',
+    'var x = 3; if (x > 2) { 10 } else { 20 }',
+    'var x = 3; if (x < 2) { 10 }',
+    'var x = 1; if (x) {}',
+    '9; return 2 * 5; 9;',
+    'if (true) { if (true) { return 10; } return 1; }',
+    'var f = func(x) { var y = if (x) { return 7; }; 3 }; f(1) * 10 + f(0);',
+    'var f = func(x) { 1 + if (x) { return 7; } else { 2 } }; f(1) * 10 + f(0);',
+    'var add = func(x, y) { return x + y }; add(1, add(2, 3));',
+    'func(x) { x }(5);',
+    'func(x, y) { x + y };',
+    'var adder = func(x) { func(y) { x + y } }; var add_two = adder(2); add_two(3);',
+    'var fib = func(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }; fib(15);',
+    'var count = func(n, acc) { if (n == 0) { acc } else { count(n - 1, acc + 1) } }; count(10000, 0);',
+    'var even = func(n) { if (n == 0) { return true; } return odd(n - 1); };'
+    'var odd = func(n) { if (n == 0) { return false; } return even(n - 1); }; even(10001);',
+    'var f = func(n) { return if (n > 0) { f(n - 1) } else { 42 }; }; f(5000);',
+    'var sign = func(n) { if (n < 0) { -1 } else { if (n == 0) { 0 } else { 1 } } }; sign(-4) + sign(0) * 10 + sign(8);',
+    'if (1 + 1 == 2) { 1 } else { 1 / 0 }',
+    'if (!(2 * 3 > 7)) { return 5; } 6;',
+    'var x = 2; x * (3 + 4) - 10 / 2;',
+]
+
+ERRORS: List[str] = [
+    '5 + true;',
+    '-true;',
+    'foo;',
+    '1 / 0;',
+    'if (1 > 0) { 1 / 0 }',
+    '5(1);',
+    'func(x) { x }();',
+    'var x = 1;\nx + y;',
+    'var sum = func(n) { if (n == 0) { return 0; } return n + sum(n - 1); }; sum(100000);',
+]
+
+
+class CompilingEvaluatorTest(TestCase):
+
+    def test_same_values(self) -> None:
+        for source in SOURCES:
+            expected = inspect(Evaluator().evaluate(parse(source)))
+            self.assertEqual(inspect(CompilingEvaluator().evaluate(parse(source))), expected, source)
+
+    def test_same_errors(self) -> None:
+        for source in ERRORS:
+            with self.assertRaises(EvaluationError) as expected:
+                Evaluator().evaluate(parse(source))
+            with self.assertRaises(EvaluationError) as context:
+                CompilingEvaluator().evaluate(parse(source))
+            self.assertEqual(context.exception.message, expected.exception.message, source)
+            self.assertEqual(context.exception.offset, expected.exception.offset, source)
+
+    def test_environment(self) -> None:
+        evaluator = CompilingEvaluator()
+        environment = Environment()
+
+        evaluator.evaluate(parse('var x = 2;'), environment)
+
+        self.assertEqual(evaluator.evaluate(parse('x * 21;'), environment), 42)
+
+    def test_jumps(self) -> None:
+        code = Compiler(Evaluator()).compile(parse('if (x) { 1 } else { 2 }').statements, False)
+
+        self.assertEqual([instruction.opcode for instruction in code.instructions][1:],
+                         [JUMP_IF_FALSE, CONST, JUMP, CONST, END])
+        self.assertEqual(code.instructions[1].argument, 4)
+        self.assertEqual(code.instructions[3].argument, 5)
+        self.assertEqual(code.eliminated, 0)
+
+    def test_constant_branches(self) -> None:
+        source = 'if (2 * 3 > 5) { 1 } else { f(1) }; if (!true) { g(2) }; if (1 / 0) { 3 }'
+
+        code = Compiler(Evaluator()).compile(parse(source).statements, False)
+
+        self.assertEqual(code.eliminated, 2)
+        self.assertEqual([tuple(instruction) for instruction in code.instructions[:4]],
+                         [(CONST, 1), (POP, None), (CONST, None), (POP, None)])
+
+    def test_eliminated_in_functions(self) -> None:
+        evaluator = CompilingEvaluator()
+
+        value = evaluator.evaluate(parse('var f = func(x) { if (false) { x } else { x + 1 } }; f(1) + f(2);'))
+
+        self.assertEqual(value, 5)
+        self.assertEqual(evaluator.eliminated_branches, 1)
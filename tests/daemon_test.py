@@ -0,0 +1,92 @@
+import asyncio
+from os.path import exists, join
+from socket import AF_UNIX, SOCK_STREAM, socket
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import sleep
+from unittest import TestCase
+
+from src.tools.daemon import Client, Daemon, execute
+
+
+class ExecuteTest(TestCase):
+
+    def test_methods(self) -> None:
+        self.assertEqual(execute('check', 'var x = 5;'), {'errors': []})
+        self.assertEqual(execute('parse', '1 + 2;'), {'errors': [], 'program': '(1 + 2)', 'statements': 1})
+        self.assertEqual(execute('format', 'x+1'), {'errors': [], 'source': 'x + 1;\n'})
+        self.assertIsNone(execute('format', 'var x 1;')['source'])
+        with self.assertRaises(ValueError):
+            execute('run', '')
+
+
+class DaemonTest(TestCase):
+
+    def setUp(self) -> None:
+        self._directory = TemporaryDirectory()
+        self.socket_path: str = join(self._directory.name, 'daemon.sock')
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_fallback_without_daemon(self) -> None:
+        client = Client(self.socket_path)
+
+        self.assertEqual(client.call('check', 'var x 5;')['errors'][0][:22], 'The expected token was')
+
+    def test_requests(self) -> None:
+        daemon = Daemon(self.socket_path, workers=2, max_in_flight=4)
+        thread = Thread(target=daemon.run)
+        thread.start()
+        try:
+            for _ in range(500):
+                if exists(self.socket_path):
+                    break
+                sleep(0.01)
+            client = Client(self.socket_path, window=8)
+
+            self.assertEqual(client.call('parse', '-a * b;')['program'], '((-a) * b)')
+
+            sources = [f'var x{index} = {index} + y;' for index in range(50)]
+            results = list(client.call_many(('format', source) for source in sources))
+            self.assertEqual([result['source'] for result in results],
+                             [f'var x{index} = {index} + y;\n' for index in range(50)])
+
+            with self.assertRaises(RuntimeError):
+                client.call('run', 'x;')
+        finally:
+            daemon.stop()
+            thread.join(timeout=30)
+
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(exists(self.socket_path))
+
+    def test_stale_socket(self) -> None:
+        # A socket whose daemon is gone refuses the connections and is replaced.
+        with socket(AF_UNIX, SOCK_STREAM) as stale:
+            stale.bind(self.socket_path)
+        daemon = Daemon(self.socket_path, workers=1)
+        thread = Thread(target=daemon.run)
+        thread.start()
+        try:
+            for _ in range(500):
+                with socket(AF_UNIX, SOCK_STREAM) as probe:
+                    if probe.connect_ex(self.socket_path) == 0:
+                        break
+                sleep(0.01)
+            else:
+                self.fail('The daemon did not replace the stale socket')
+        finally:
+            daemon.stop()
+            thread.join(timeout=30)
+
+        self.assertFalse(exists(self.socket_path))
+
+    def test_live_socket(self) -> None:
+        with socket(AF_UNIX, SOCK_STREAM) as live:
+            live.bind(self.socket_path)
+            live.listen()
+
+            with self.assertRaises(RuntimeError):
+                asyncio.run(Daemon(self.socket_path, workers=1).serve())
+            self.assertTrue(exists(self.socket_path))
@@ -0,0 +1,73 @@
+from typing import List
+from unittest import TestCase
+
+from src.lexer.lexer import Lexer
+from src.parser.diff import diff_programs, diff_sources, merkle_hashes
+from src.parser.hashcons import NodeFactory
+from src.parser.parser import Parser
+from tests.helpers import parse
+
+
+class DiffTest(TestCase):
+
+    def test_identical_programs(self) -> None:
+        source: str = 'var x = 1 + 2; return x * 3;'
+
+        self.assertEqual(diff_programs(parse(source), parse(source)), [])
+
+    def test_merkle_hashes(self) -> None:
+        program = parse('a + 1; a + 1; a + 2;')
+        hashes = merkle_hashes(program)
+        first, second, third = program.statements
+
+        self.assertEqual(hashes[id(first)], hashes[id(second)])
+        self.assertNotEqual(hashes[id(first)], hashes[id(third)])
+
+    def test_changed_expression(self) -> None:
+        changes, errors = diff_sources('var x = 1;\nvar y = a * (b + 1);\nz;',
+                                       'var x = 1;\nvar y = a * (b + 2);\nz;')
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(changes), 1)
+        change = changes[0]
+        self.assertEqual(change.kind, 'change')
+        self.assertEqual((str(change.old), str(change.new)), ('1', '2'))
+        self.assertEqual(change.old_position, (2, 18))
+        self.assertEqual(change.new_position, (2, 18))
+
+    def test_changed_operator(self) -> None:
+        changes = diff_programs(parse('a + b * c;'), parse('a + b - c;'))
+
+        self.assertEqual([(change.kind, str(change.old), str(change.new)) for change in changes],
+                         [('change', '(a + (b * c))', '((a + b) - c)')])
+
+    def test_changed_left_operand(self) -> None:
+        changes = diff_programs(parse('var x = a + b; a + b;'), parse('var x = c + b; c + b;'))
+
+        self.assertEqual([(str(change.old), str(change.new)) for change in changes], [('a', 'c'), ('a', 'c')])
+
+    def test_repeated_statements(self) -> None:
+        old = parse('x;\ny;\n' * 5000 + 'z;')
+        new = parse('x;\ny;\n' * 2500 + 'w;\n' + 'x;\ny;\n' * 2499 + 'y;\nz;')
+
+        changes = diff_programs(old, new)
+
+        self.assertEqual(sorted(f'{change.kind} {change.old} {change.new}' for change in changes),
+                         ['delete x None', 'insert None w'])
+
+    def test_inserted_and_deleted_statements(self) -> None:
+        changes, _ = diff_sources('a;\nb;\nc;\nd;', 'a;\nc;\nnew;\nd;')
+
+        summary: List[str] = [f'{change.kind} {change.old} {change.new}' for change in changes]
+        self.assertEqual(summary, ['delete b None', 'insert None new'])
+        self.assertEqual(changes[0].old_position, (2, 1))
+        self.assertIsNone(changes[0].new_position)
+        self.assertEqual(changes[1].new_position, (3, 1))
+
+    def test_shared_nodes(self) -> None:
+        parser: Parser = Parser(Lexer('x * 2; x * 2;'), node_factory=NodeFactory())
+        old = parser.parse_program()
+
+        changes = diff_programs(old, parse('x * 2; x * 3;'))
+
+        self.assertEqual([(str(change.old), str(change.new)) for change in changes], [('2', '3')])
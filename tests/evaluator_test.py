@@ -0,0 +1,150 @@
+from typing import Any, List, Tuple
+from unittest import TestCase
+
+from src.evaluator.evaluator import EvaluationError, Evaluator, evaluate
+from src.evaluator.objects import Closure, Environment, Value, inspect
+from tests.helpers import parse
+
+
+def run(source: str) -> Value:
+    return evaluate(parse(source))
+
+
+class EvaluatorTest(TestCase):
+
+    def test_expressions(self) -> None:
+        tests: List[Tuple[str, Any]] = [
+            ('5;', 5),
+            ('-5 + 10 * 2;', 15),
+            ('(5 + 10) / 4 - -7 / 2;', 7),
+            ('true;', True),
+            ('1 < 2 == true;', True),
+            ('!0;', True),
+            ('!5;', False),
+            ('!!true;', True),
+            ('true != false;', True),
+        ]
+        for source, expected in tests:
+            self.assertEqual(run(source), expected, source)
+
+    def test_var_statements(self) -> None:
+        self.assertEqual(run('var a = 5; var b = a * 2; a + b;'), 15)
+
+    def test_if_expressions(self) -> None:
+        tests: List[Tuple[str, Any]] = [
+            ('if (true) { 10 }', 10),
+            ('if (false) { 10 }', None),
+            ('if (0) { 10 } else { 20 }', 20),
+            ('if (1 < 2) { 10 } else { 20 }', 10),
+        ]
+        for source, expected in tests:
+            self.assertEqual(run(source), expected, source)
+
+    def test_return_statements(self) -> None:
+        self.assertEqual(run('9; return 2 * 5; 9;'), 10)
+        self.assertEqual(run('if (true) { if (true) { return 10; } return 1; }'), 10)
+        self.assertEqual(run('var f = func(x) { var y = if (x) { return 7; }; 3 }; f(1) * 10 + f(0);'), 73)
+
+    def test_functions(self) -> None:
+        self.assertEqual(run('var add = func(x, y) { return x + y }; add(1, add(2, 3));'), 6)
+        self.assertEqual(run('var double = func(x) { x * 2 }; double(4);'), 8)
+        self.assertEqual(run('func(x) { x }(5);'), 5)
+        self.assertIsInstance(run('func(x) { x };'), Closure)
+
+    def test_closures(self) -> None:
+        source = '''
+        var adder = func(x) { func(y) { x + y } };
+        var add_two = adder(2);
+        add_two(3);
+        '''
+
+        self.assertEqual(run(source), 5)
+
+    def test_recursion(self) -> None:
+        source = 'var fib = func(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }; fib(15);'
+
+        self.assertEqual(run(source), 610)
+
+    def test_deep_tail_recursion(self) -> None:
+        sources = [
+            'var count = func(n, acc) { if (n == 0) { return acc; } return count(n - 1, acc + 1); };',
+            'var count = func(n, acc) { if (n == 0) { acc } else { count(n - 1, acc + 1) } };',
+        ]
+        for source in sources:
+            self.assertEqual(run(source + 'count(100000, 0);'), 100000)
+
+    def test_deep_mutual_tail_recursion(self) -> None:
+        source = '''
+        var even = func(n) { if (n == 0) { return true; } return odd(n - 1); };
+        var odd = func(n) { if (n == 0) { return false; } return even(n - 1); };
+        even(100001);
+        '''
+
+        self.assertEqual(run(source), False)
+
+    def test_deep_recursion_error(self) -> None:
+        source = 'var sum = func(n) { if (n == 0) { return 0; } return n + sum(n - 1); }; sum(100000);'
+
+        with self.assertRaises(EvaluationError) as context:
+            run(source)
+        self.assertIn('recursion', context.exception.message)
+
+    def test_errors(self) -> None:
+        tests: List[Tuple[str, str]] = [
+            ('5 + true;', 'Type mismatch: integer + boolean'),
+            ('-true;', 'Type mismatch: -boolean'),
+            ('1 == true;', 'Type mismatch: integer == boolean'),
+            ('foo;', 'Unknown identifier foo'),
+            ('1 / 0;', 'Division by zero'),
+            ('5(1);', '5 is not a function'),
+            ('func(x) { x }();', 'The function takes 1 arguments but got 0'),
+        ]
+        for source, expected in tests:
+            with self.assertRaises(EvaluationError) as context:
+                run(source)
+            self.assertEqual(context.exception.message, expected)
+
+    def test_error_offset(self) -> None:
+        with self.assertRaises(EvaluationError) as context:
+            run('var x = 1;\nx + y;')
+
+        self.assertEqual(context.exception.offset, 15)
+
+    def test_environment(self) -> None:
+        environment = Environment()
+
+        evaluate(parse('var x = 2;'), environment)
+
+        self.assertEqual(evaluate(parse('x * 21;'), environment), 42)
+
+    def test_imports(self) -> None:
+        modules = {
+            'numbers': parse('var two = 2; var double = func(x) { x * two };'),
+            'shapes': parse('import numbers; var side = double(3);'),
+            'loop': parse('import loop;'),
+            'ring': parse('import round;'),
+            'round': parse('import ring;'),
+            'broken': parse('1 / 0;'),
+        }
+
+        self.assertEqual(evaluate(parse('import shapes; side * two;'), modules=modules), 12)
+        # The modules run once per evaluator, their names are defined again by every import.
+        evaluator = Evaluator(modules=modules)
+        environment = Environment()
+        evaluator.evaluate(parse('import numbers; var two = 5;'), environment)
+        self.assertEqual(evaluator.evaluate(parse('import numbers; double(two);'), environment), 4)
+        tests: List[Tuple[str, str]] = [
+            ('import missing;', 'Unknown module missing'),
+            ('import loop;', 'The imports of the module loop make a cycle'),
+            ('import ring;', 'The imports of the module ring make a cycle in the module round'),
+            ('import broken;', 'Division by zero in the module broken'),
+        ]
+        for source, expected in tests:
+            with self.assertRaises(EvaluationError) as context:
+                evaluate(parse(source), modules=modules)
+            self.assertEqual(context.exception.message, expected)
+            self.assertEqual(context.exception.offset, 0)
+
+    def test_inspect(self) -> None:
+        self.assertEqual([inspect(value) for value in (1, True, False, None)], ['1', 'true', 'false', 'null'])
+        self.assertEqual(inspect(run('func(x, y) { x + y };')), 'func(x, y) { (x + y) }')
@@ -0,0 +1,97 @@
+from typing import Dict, List
+from unittest import TestCase
+
+from src.evaluator.limits import LimitedEvaluator, StepLimitExceeded
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser
+from src.tools.farm import (
+    ERROR,
+    LOAD_TEST_PROGRAMS,
+    OK,
+    PARSE_ERROR,
+    STEPS,
+    TIMEOUT,
+    Farm,
+    JobLimits,
+    JobResult,
+    load_test,
+    run_job,
+)
+
+ENDLESS: str = 'var loop = func() { loop(); }; loop();'
+SQUARES: str = 'var f = func(x) { f(x * x); }; f(3);'
+
+
+class LimitedEvaluatorTest(TestCase):
+
+    def test_steps(self) -> None:
+        evaluator = LimitedEvaluator(100)
+        program = Parser(Lexer('var count = func(n) { if (n == 0) { 0 } else { count(n - 1) } }; count(9);'))
+
+        self.assertEqual(evaluator.evaluate(program.parse_program()), 0)
+        self.assertEqual(evaluator.steps, 22)
+
+    def test_step_limit(self) -> None:
+        evaluator = LimitedEvaluator(1000)
+
+        with self.assertRaises(StepLimitExceeded):
+            evaluator.evaluate(Parser(Lexer(ENDLESS)).parse_program())
+        self.assertEqual(evaluator.steps, 1001)
+
+
+class RunJobTest(TestCase):
+
+    def test_statuses(self) -> None:
+        limits = JobLimits(max_steps=1000, timeout=5.0)
+        tests: Dict[str, str] = {
+            '1 + 2;': OK,
+            'var x 5;': PARSE_ERROR,
+            '1 + true;': ERROR,
+            ENDLESS: STEPS,
+            '(' * 10000: PARSE_ERROR,
+        }
+        for source, status in tests.items():
+            self.assertEqual(run_job(source[:10], source, limits).status, status, source[:10])
+
+        result = run_job('sum', '1 + 2;')
+        self.assertEqual((result.value, result.message, result.steps), ('3', None, 1))
+
+    def test_timeout(self) -> None:
+        result = run_job('squares', SQUARES, JobLimits(max_steps=10 ** 9, timeout=0.2))
+
+        self.assertEqual(result.status, TIMEOUT)
+        self.assertLess(result.eval_seconds, 2.0)
+
+
+class FarmTest(TestCase):
+
+    def test_run(self) -> None:
+        jobs = [(name, source) for name, source in LOAD_TEST_PROGRAMS.items()]
+        with Farm(2, JobLimits(max_steps=20000, timeout=5.0)) as farm:
+            results: Dict[object, JobResult] = {result.job_id: result for result in farm.run(jobs)}
+
+            self.assertEqual(farm.recycled, 1)
+        self.assertEqual(sorted(results), sorted(LOAD_TEST_PROGRAMS))
+        self.assertEqual(results['fib'].value, '610')
+        self.assertEqual(results['arithmetic'].value, 'true')
+        self.assertEqual(results['parse error'].status, PARSE_ERROR)
+        self.assertEqual(results['type error'].status, ERROR)
+        self.assertEqual(results['endless'].status, STEPS)
+
+    def test_recycles_stuck_workers(self) -> None:
+        with Farm(1, JobLimits(timeout=0.2)) as farm:
+            results: List[JobResult] = list(farm.run([('squares', SQUARES), ('after', '2 * 21;')]))
+
+            self.assertEqual(farm.recycled, 1)
+        self.assertEqual([result.status for result in results], [TIMEOUT, OK])
+        self.assertNotEqual(results[0].worker, results[1].worker)
+
+    def test_load_test(self) -> None:
+        with Farm(2) as farm:
+            report = load_test(farm, ['1 + 1;', ENDLESS], 10)
+
+        self.assertEqual(report.jobs, 10)
+        self.assertEqual(dict(report.statuses), {OK: 5, STEPS: 5})
+        self.assertEqual(report.recycled, 5)
+        self.assertLessEqual(report.percentile(50), report.percentile(99))
+        self.assertIn('10 jobs in', str(report))
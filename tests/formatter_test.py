@@ -0,0 +1,85 @@
+from io import StringIO
+from unittest import TestCase
+
+from src.lexer.token import Token, TokenType
+from src.parser.ast import Program, VarStatement
+from src.parser.formatter import format_program
+from tests.helpers import parse
+
+
+def format_source(program: Program, buffer_size: int = 1 << 16) -> str:
+    stream = StringIO()
+    format_program(program, stream, buffer_size)
+    return stream.getvalue()
+
+
+class FormatterTest(TestCase):
+
+    def test_format(self) -> None:
+        program = parse('import  math\nvar x = (1+2)*-y;return x\n!x != 007;')
+
+        self.assertEqual(format_source(program),
+                         'import math;\nvar x = (1 + 2) * -y;\nreturn x;\n!x != 7;\n')
+
+    def test_long_integers(self) -> None:
+        program = parse('1' + '0' * 5000 + ';')
+        integer = program.statements[0].expression  # type: ignore
+        integer.value = 7 * 10 ** 5000
+
+        self.assertTrue(format_source(program).startswith('7' + '0' * 5000 + ';'))
+
+    def test_parentheses(self) -> None:
+        program = parse('(a - (b - c)) - d; a * (b + c); -(a + b); (-f)(x); (a + b)(c); !(a == b) == (c < d);')
+
+        self.assertEqual(format_source(program), '\n'.join([
+            'a - (b - c) - d;',
+            'a * (b + c);',
+            '-(a + b);',
+            '(-f)(x);',
+            '(a + b)(c);',
+            '!(a == b) == c < d;',
+            '',
+        ]))
+        self.assertEqual(str(parse(format_source(program))), str(program))
+
+    def test_output_parses_again(self) -> None:
+        formatted = format_source(parse('var x = (1 + 2) * 3; x < 4 == 5 > x; -(-x);'))
+
+        self.assertEqual(format_source(parse(formatted)), formatted)
+
+    def test_blocks(self) -> None:
+        program = parse('var f = func(x, y) { if (x < y) { return x; } else { y } }; f(1, 2)(3); if (true) {}')
+
+        self.assertEqual(format_source(program), '\n'.join([
+            'var f = func(x, y) {',
+            '    if (x < y) {',
+            '        return x;',
+            '    } else {',
+            '        y;',
+            '    };',
+            '};',
+            'f(1, 2)(3);',
+            'if (true) {};',
+            '',
+        ]))
+        self.assertEqual(format_source(parse(format_source(program))), format_source(program))
+
+    def test_small_buffer(self) -> None:
+        program = parse('a + b * c; var d = 1;')
+
+        self.assertEqual(format_source(program, buffer_size=1), format_source(program))
+
+    def test_deep_expression(self) -> None:
+        source = ' + '.join(['x'] * 10000) + ';\n'
+
+        formatted = format_source(parse(source))
+
+        # The chain stays flat, so the parser reads it back without nesting.
+        self.assertEqual(formatted, source)
+        self.assertEqual(format_source(parse(formatted)), formatted)
+
+    def test_incomplete_program(self) -> None:
+        program = Program(statements=[VarStatement(token=Token(TokenType.VAR, 'var'))])
+
+        with self.assertRaises(ValueError):
+            format_source(program)
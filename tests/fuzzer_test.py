@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from src.tools.fuzzer import Cost, Fuzzer, exponent, measure, minimize, repeat
+
+
+class FuzzerTest(TestCase):
+
+    def test_exponent(self) -> None:
+        linear = [Cost(size, size * 1e-6, size * 2e-6, None) for size in (100, 200, 400, 800)]
+        quadratic = [Cost(size, size ** 2 * 1e-9, 0.0, None) for size in (100, 200, 400, 800)]
+
+        self.assertAlmostEqual(exponent(linear), 1.0)
+        self.assertAlmostEqual(exponent(quadratic), 2.0)
+
+    def test_minimize(self) -> None:
+        self.assertEqual(minimize('var x = (1 + y) * 2;', lambda unit: '(' in unit and 'y' in unit), '(y')
+
+    def test_repeat(self) -> None:
+        self.assertEqual(repeat('ab', 7), 'ababab')
+        self.assertEqual(repeat('abcdef', 2), 'abcdef')
+        self.assertEqual(repeat('é', 4), 'éé')
+
+    def test_measure(self) -> None:
+        cost = measure('var x = 5;' * 10, repeats=1)
+        self.assertEqual(cost.size, 100)
+        self.assertIsNone(cost.error)
+
+        self.assertIn('RecursionError', str(measure('(' * 5000, repeats=1).error))
+
+    def test_run(self) -> None:
+        fuzzer = Fuzzer(seed=1)
+        fuzzer.run(seconds=10, max_executions=len(fuzzer.corpus) + 5)
+
+        findings = fuzzer.findings(count=1, curve_size=256)
+
+        self.assertTrue(fuzzer.corpus)
+        self.assertTrue(findings)
+        for finding in findings:
+            self.assertTrue(finding.unit)
+            self.assertLessEqual(finding.curve[-1].size, 256)
@@ -0,0 +1,71 @@
+from typing import cast
+from unittest import TestCase
+
+from src.lexer.lexer import Lexer
+from src.parser.ast import ExpressionStatement, Infix, Program
+from src.parser.hashcons import NodeFactory
+from src.parser.parser import Parser
+
+
+class NodeFactoryTest(TestCase):
+
+    def test_identical_expressions_are_shared(self) -> None:
+        source: str = 'x * 2; x * 2; -1; -1;'
+        factory: NodeFactory = NodeFactory()
+        parser: Parser = Parser(Lexer(source), node_factory=factory)
+
+        program: Program = parser.parse_program()
+
+        self.assertEqual(len(parser.errors), 0)
+        expressions = [cast(ExpressionStatement, statement).expression
+                       for statement in program.statements]
+        self.assertIs(expressions[0], expressions[1])
+        self.assertIs(expressions[2], expressions[3])
+        self.assertIsNot(expressions[0], expressions[2])
+        self.assertEqual(str(program), '(x * 2)(x * 2)(-1)(-1)')
+
+    def test_shared_children(self) -> None:
+        source: str = 'a + b; a + b * a + b;'
+        factory: NodeFactory = NodeFactory()
+        parser: Parser = Parser(Lexer(source), node_factory=factory)
+
+        program: Program = parser.parse_program()
+
+        first = cast(Infix, cast(ExpressionStatement, program.statements[0]).expression)
+        second = cast(Infix, cast(ExpressionStatement, program.statements[1]).expression)
+        self.assertIs(cast(Infix, second.left).left, first.left)
+        self.assertIs(second.right, first.right)
+
+    def test_structural_hash(self) -> None:
+        first_parser: Parser = Parser(Lexer('x + 1;'), node_factory=NodeFactory())
+        second_parser: Parser = Parser(Lexer('x + 1;'), node_factory=NodeFactory())
+
+        first = cast(ExpressionStatement, first_parser.parse_program().statements[0])
+        second = cast(ExpressionStatement, second_parser.parse_program().statements[0])
+
+        assert first.expression and second.expression
+        self.assertIsNotNone(first.expression.structural_hash)
+        self.assertEqual(first.expression.structural_hash, second.expression.structural_hash)
+
+    def test_stats(self) -> None:
+        factory: NodeFactory = NodeFactory()
+        parser: Parser = Parser(Lexer('x * 2; x * 2;'), node_factory=factory)
+
+        parser.parse_program()
+        stats = factory.stats()
+
+        self.assertEqual(stats.requested, 6)
+        self.assertEqual(stats.unique, 3)
+        self.assertAlmostEqual(stats.dedup_ratio, 0.5)
+        self.assertGreater(stats.bytes_saved, 0)
+
+    def test_parser_without_factory(self) -> None:
+        parser: Parser = Parser(Lexer('x; x;'))
+
+        program: Program = parser.parse_program()
+
+        first = cast(ExpressionStatement, program.statements[0])
+        second = cast(ExpressionStatement, program.statements[1])
+        self.assertIsNot(first.expression, second.expression)
+        assert first.expression
+        self.assertIsNone(first.expression.structural_hash)
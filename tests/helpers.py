@@ -0,0 +1,13 @@
+from src.lexer.lexer import Lexer
+from src.parser.ast import Program
+from src.parser.parser import Parser
+
+
+def parse(source: str) -> Program:
+    """
+    The Program of a source the tests expect to parse without errors.
+    """
+    parser: Parser = Parser(Lexer(source))
+    program: Program = parser.parse_program()
+    assert not parser.errors, parser.errors
+    return program
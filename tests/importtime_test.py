@@ -0,0 +1,46 @@
+from json import load
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+from src.tools.importtime import ImportTime, Startup, check, forbidden_imports, measure, parse_importtime
+
+ROOT: str = dirname(dirname(abspath(__file__)))
+BUDGET: str = join(ROOT, 'importtime-budget.json')
+
+OUTPUT: str = '''import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      1330 |       4481 | site
+import time:       200 |        200 |     enum
+import time:        50 |        250 |   src.lexer.token
+import time:       900 |       1150 | src.lexer
+'''
+
+
+class ImportTimeTest(TestCase):
+
+    def setUp(self) -> None:
+        with open(BUDGET) as budget_file:
+            self.budget = load(budget_file)
+
+    def test_parse_importtime(self) -> None:
+        self.assertEqual(parse_importtime(OUTPUT), {
+            'enum': ImportTime(200, 200),
+            'src.lexer.token': ImportTime(50, 250),
+            'src.lexer': ImportTime(900, 1150),
+        })
+
+    def test_forbidden_imports(self) -> None:
+        for name, entry in self.budget.items():
+            startup = measure(entry['statement'], runs=1, directory=ROOT)
+            self.assertEqual(forbidden_imports(startup, entry['forbidden']), [], name)
+
+    def test_check(self) -> None:
+        # The budget is only checked by python -m src.tools.importtime, the times of a test run are noise.
+        budget = {'main': {'statement': 'import main', 'max_us': 1000, 'forbidden': ['src.lexer']}}
+        modules = parse_importtime(OUTPUT)
+
+        self.assertEqual(check(budget, {'main': Startup('import main', 900, {})}), [])
+        self.assertEqual(check(budget, {'main': Startup('import main', 1150, modules)}), [
+            "main: 'import main' takes 1150 us, the budget is 1000 us",
+            "main: 'import main' imports src.lexer",
+        ])
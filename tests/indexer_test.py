@@ -0,0 +1,78 @@
+from os import remove, utime
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from src.tools.indexer import SymbolIndex
+
+
+def write(path: str, source: str) -> None:
+    with open(path, 'w', encoding='utf-8') as source_file:
+        source_file.write(source)
+
+
+class SymbolIndexTest(TestCase):
+
+    def setUp(self) -> None:
+        self._directory = TemporaryDirectory()
+        self.root: str = self._directory.name
+        self.index: SymbolIndex = SymbolIndex(join(self.root, 'index.sqlite'))
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self._directory.cleanup()
+
+    def test_definitions_and_uses(self) -> None:
+        write(join(self.root, 'a.lang'), 'var x = 1;\nvar y = x + x;')
+        write(join(self.root, 'b.lang'), '\n  x * y;')
+        write(join(self.root, 'ignored.txt'), 'var x = 2;')
+
+        stats = self.index.update([self.root])
+
+        self.assertEqual((stats.scanned, stats.parsed, stats.removed), (2, 2, 0))
+        definitions = self.index.definitions('x')
+        self.assertEqual([(symbol.line, symbol.column) for symbol in definitions], [(1, 5)])
+        self.assertTrue(definitions[0].path.endswith('a.lang'))
+        uses = self.index.uses('x')
+        self.assertEqual([(symbol.path[-6:], symbol.line, symbol.column) for symbol in uses],
+                         [('a.lang', 2, 9), ('a.lang', 2, 13), ('b.lang', 2, 3)])
+        self.assertEqual(self.index.uses('missing'), [])
+
+    def test_function_parameters(self) -> None:
+        write(join(self.root, 'a.lang'), 'var f = func(x) {\n  x + y\n};')
+
+        self.index.update([self.root])
+
+        self.assertEqual([(symbol.line, symbol.column) for symbol in self.index.definitions('x')], [(1, 14)])
+        self.assertEqual([(symbol.line, symbol.column) for symbol in self.index.uses('x')], [(2, 3)])
+        self.assertEqual([symbol.line for symbol in self.index.uses('y')], [2])
+
+    def test_incremental_update(self) -> None:
+        path = join(self.root, 'a.lang')
+        write(path, 'var x = 1;')
+        write(join(self.root, 'b.lang'), 'var y = 1;')
+        self.index.update([self.root])
+
+        self.assertEqual(self.index.update([self.root]).parsed, 0)
+
+        write(path, 'var z = 1;')
+        utime(path, ns=(1, 1))
+        stats = self.index.update([self.root])
+
+        self.assertEqual(stats.parsed, 1)
+        self.assertEqual(self.index.definitions('x'), [])
+        self.assertEqual(len(self.index.definitions('z')), 1)
+
+        utime(path, ns=(2, 2))
+        self.assertEqual(self.index.update([self.root]).parsed, 0)
+
+    def test_removed_files(self) -> None:
+        path = join(self.root, 'a.lang')
+        write(path, 'var x = 1;')
+        self.index.update([self.root])
+
+        remove(path)
+        stats = self.index.update([self.root])
+
+        self.assertEqual(stats.removed, 1)
+        self.assertEqual(self.index.definitions('x'), [])
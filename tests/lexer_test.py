@@ -23,6 +23,15 @@ class LexerTest(TestCase):
 
         self.assertEqual(tokens, expected_tokens)
 
+    def test_reset(self) -> None:
+        lexer: Lexer = Lexer('a')
+        lexer.next_token()
+
+        lexer.reset('\nb;')
+
+        self.assertEqual(lexer.next_token(), Token(TokenType.IDENT, 'b'))
+        self.assertEqual(lexer.location(1), (2, 1))
+
     def test_one_character_operators(self) -> None:
         source: str = '=+-/*<>!'
         lexer: Lexer = Lexer(source)
@@ -229,3 +238,23 @@ class LexerTest(TestCase):
         ]
 
         self.assertEqual(tokens, expected_tokens)
+
+    def test_token_offsets(self) -> None:
+        source: str = 'var x = 10;\n  x != 5;'
+        lexer: Lexer = Lexer(source)
+
+        offsets: List[int] = []
+        for i in range(10):
+            offsets.append(lexer.next_token().offset)
+
+        self.assertEqual(offsets, [0, 4, 6, 8, 10, 14, 16, 19, 20, 21])
+
+    def test_location(self) -> None:
+        source: str = 'var x = 10;\n\n  x != 5;'
+        lexer: Lexer = Lexer(source)
+
+        self.assertEqual(lexer.location(0), (1, 1))
+        self.assertEqual(lexer.location(10), (1, 11))
+        self.assertEqual(lexer.location(12), (2, 1))
+        self.assertEqual(lexer.location(15), (3, 3))
+        self.assertEqual(str(lexer.location(15)), 'line 3, column 3')
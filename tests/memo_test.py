@@ -0,0 +1,110 @@
+from random import Random
+from typing import List, Optional, Tuple
+from unittest import TestCase
+
+from src.evaluator.evaluator import Evaluator
+from src.evaluator.memo import Memo, MemoStats, MISSING
+from src.evaluator.purity import analyze_purity
+from src.parser.ast import ExpressionStatement, Function
+from tests.helpers import parse
+
+FIB: str = 'var fib = func(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); };'
+
+
+def purity(source: str) -> Optional[Tuple[str, ...]]:
+    statement = parse(source).statements[0]
+    assert isinstance(statement, ExpressionStatement) and isinstance(statement.expression, Function)
+    return analyze_purity(statement.expression)
+
+
+class PurityTest(TestCase):
+
+    def test_pure_functions(self) -> None:
+        self.assertEqual(purity('func(x, y) { x * y + 1 }'), ())
+        self.assertEqual(purity('func(n) { if (n < 2) { return n; } return f(n - 1) + g(n); }'), ('f', 'g'))
+        self.assertEqual(purity('func() { !true }'), ())
+
+    def test_impure_functions(self) -> None:
+        for source in ['func(x) { x + y }',
+                       'func(x) { var y = x; y }',
+                       'func(f) { f(1) }',
+                       'func(x) { func(y) { y } }',
+                       'func(x) { g(x)(1) }']:
+            self.assertIsNone(purity(source), source)
+
+
+class MemoTest(TestCase):
+
+    def test_lru(self) -> None:
+        memo = Memo('f', (), max_size=2)
+        memo.put(1, 'one')
+        memo.put(2, 'two')
+        memo.get(1)
+        memo.put(3, 'three')
+
+        self.assertEqual(memo.get(1), 'one')
+        self.assertIs(memo.get(2), MISSING)
+        self.assertEqual(memo.stats(), MemoStats(name='f', hits=2, misses=1, size=2, max_size=2, enabled=True))
+
+    def test_statistics(self) -> None:
+        evaluator = Evaluator()
+
+        self.assertEqual(evaluator.evaluate(parse(FIB + 'fib(30);')), 832040)
+
+        stats = evaluator.memo_stats()
+        self.assertEqual([(item.name, item.hits, item.misses) for item in stats], [('fib', 28, 31)])
+
+    def test_impure_functions_are_not_memoized(self) -> None:
+        evaluator = Evaluator()
+
+        evaluator.evaluate(parse('var y = 1; var f = func(x) { x + y }; f(1); f(1);'))
+
+        self.assertEqual(evaluator.memo_stats(), [])
+
+    def test_opt_out(self) -> None:
+        evaluator = Evaluator(memo_exclude=['fib'])
+
+        self.assertEqual(evaluator.evaluate(parse(FIB + 'fib(15);')), 610)
+
+        stats = evaluator.memo_stats()
+        self.assertEqual([(item.name, item.hits, item.misses, item.enabled) for item in stats],
+                         [('fib', 0, 0, False)])
+
+    def test_redefined_callee(self) -> None:
+        evaluator = Evaluator()
+        source = '''
+        var g = func(x) { x + 1 };
+        var f = func(x) { g(x) * 2 };
+        var a = f(1);
+        var g = func(x) { x + 2 };
+        a * 10 + f(1);
+        '''
+
+        self.assertEqual(evaluator.evaluate(parse(source)), 46)
+
+    def test_booleans_are_not_integers(self) -> None:
+        source = 'var same = func(x) { x == x }; var id = func(x) { x }; var a = id(1); id(true) == true;'
+
+        self.assertEqual(Evaluator().evaluate(parse(source)), True)
+
+    def test_deep_tail_recursion(self) -> None:
+        evaluator = Evaluator()
+        source = 'var count = func(n, acc) { if (n == 0) { acc } else { count(n - 1, acc + 1) } };'
+
+        self.assertEqual(evaluator.evaluate(parse(source + 'count(20000, 0);')), 20000)
+        self.assertEqual(evaluator.evaluate(parse(source + 'count(20000, 0);')), 20000)
+
+    def test_same_results_as_unmemoized(self) -> None:
+        random = Random(37)
+        for _ in range(50):
+            terms = [random.choice(['x', 'y', str(random.randint(1, 5))]) for _ in range(4)]
+            body = ' '.join(f'{term} {random.choice(["+", "-", "*"])}' for term in terms[:-1]) + \
+                f' {terms[-1]} / {random.randint(1, 3)}'
+            source = f'''
+            var f = func(x, y) {{ if (x < {random.randint(1, 4)}) {{ return y; }} return {body}; }};
+            var g = func(n) {{ if (n < 1) {{ return 0; }} return f(n, n - 1) + g(n - 1); }};
+            '''
+            calls = ' + '.join(f'g({random.randint(0, 12)})' for _ in range(5)) + ';'
+            results = [evaluator.evaluate(parse(source + calls))
+                       for evaluator in (Evaluator(), Evaluator(memo_size=0), Evaluator(memo_size=1))]
+            self.assertEqual(results[1:], results[:1] * 2, source + calls)
@@ -3,9 +3,14 @@ from unittest import TestCase
 
 from src.lexer.lexer import Lexer
 from src.parser.ast import (
+    Boolean,
+    Call,
     Expression,
     ExpressionStatement,
+    Function,
     Identifier,
+    If,
+    ImportStatement,
     Integer,
     Infix,
     Prefix,
@@ -13,7 +18,7 @@ from src.parser.ast import (
     ReturnStatement,
     VarStatement,
 )
-from src.parser.parser import Parser
+from src.parser.parser import Parser, parse_many
 
 
 class ParserTest(TestCase):
@@ -66,6 +71,21 @@ class ParserTest(TestCase):
 
         self.assertEqual(names, expected_names)
 
+    def test_var_statement_values(self) -> None:
+        source: str = '''
+        var x = 5;
+        var y = x + 1;
+        var foo = -y
+        '''
+        parser: Parser = Parser(Lexer(source))
+
+        program: Program = parser.parse_program()
+
+        self.assertEqual(len(parser.errors), 0)
+        values: List[str] = [str(cast(VarStatement, statement).value)
+                             for statement in program.statements]
+        self.assertEqual(values, ['5', '(x + 1)', '(-y)'])
+
     def test_parse_errors(self) -> None:
         source: str = 'var x 5;'
         lexer: Lexer = Lexer(source)
@@ -75,6 +95,17 @@ class ParserTest(TestCase):
 
         self.assertEqual(len(parser.errors), 1)
 
+    def test_parse_errors_location(self) -> None:
+        source: str = 'var x = 5;\nvar y 5;'
+        parser: Parser = Parser(Lexer(source))
+
+        program: Program = parser.parse_program()
+
+        self.assertEqual(parser.errors, [
+            'The expected token was TokenType.ASSIGN but got TokenType.INT at line 2, column 7',
+        ])
+        self.assertEqual(program.statements[0].offset, 0)
+
     def test_return_statement(self) -> None:
         source: str = '''
         return 5;
@@ -92,6 +123,10 @@ class ParserTest(TestCase):
             self.assertEqual(statement.token_literal(), 'return')
             self.assertIsInstance(statement, ReturnStatement)
 
+        return_values: List[str] = [str(cast(ReturnStatement, statement).return_value)
+                                    for statement in program.statements]
+        self.assertEqual(return_values, ['5', 'foo'])
+
     def test_identifier_expression(self) -> None:
         source: str = 'foobar;'
         lexer: Lexer = Lexer(source)
@@ -120,6 +155,26 @@ class ParserTest(TestCase):
         assert expression_statement.expression
         self._test_literal_expression(expression_statement.expression, 5)
 
+    def test_long_integer_expressions(self) -> None:
+        source: str = '9' * 10000 + ';'
+        parser: Parser = Parser(Lexer(source))
+
+        program: Program = parser.parse_program()
+
+        self._test_program_statements(parser, program)
+        expression_statement = cast(ExpressionStatement, program.statements[0])
+        integer = cast(Integer, expression_statement.expression)
+        self.assertEqual(integer.value, 10 ** 10000 - 1)
+
+    def test_max_integer_digits(self) -> None:
+        source: str = '12345; 123456;'
+        parser: Parser = Parser(Lexer(source), max_integer_digits=5)
+
+        program: Program = parser.parse_program()
+
+        self.assertEqual(len(parser.errors), 1)
+        self.assertEqual(len(program.statements), 2)
+
     def test_prefix_expression(self) -> None:
         source: str = '!5; -15;'
         lexer: Lexer = Lexer(source)
@@ -178,6 +233,140 @@ class ParserTest(TestCase):
                                         expected_operator,
                                         expected_right)
 
+    def test_operator_precedence(self) -> None:
+        test_sources: List[Tuple[str, str]] = [
+            ('-a * b;', '((-a) * b)'),
+            ('!-a;', '(!(-a))'),
+            ('a + b / c;', '(a + (b / c))'),
+            ('3 + 4; -5 * 5;', '(3 + 4)((-5) * 5)'),
+            ('5 > 4 == 3 < 4;', '((5 > 4) == (3 < 4))'),
+            ('1 + (2 + 3) + 4;', '((1 + (2 + 3)) + 4)'),
+            ('(5 + 5) * 2;', '((5 + 5) * 2)'),
+            ('-(5 + 5);', '(-(5 + 5))'),
+            ('a + add(b * c) + d;', '((a + add((b * c))) + d)'),
+            ('add(a, b, 1, 2 * 3, 4 + 5, add(6, 7 * 8));', 'add(a, b, 1, (2 * 3), (4 + 5), add(6, (7 * 8)))'),
+            ('!true == false;', '((!true) == false)'),
+        ]
+        for source, expected_result in test_sources:
+            parser: Parser = Parser(Lexer(source))
+
+            program: Program = parser.parse_program()
+
+            self.assertEqual(len(parser.errors), 0)
+            self.assertEqual(str(program), expected_result)
+
+    def test_boolean_expressions(self) -> None:
+        program: Program = self._parse('true; false;')
+
+        values = [cast(Boolean, cast(ExpressionStatement, statement).expression).value
+                  for statement in program.statements]
+        self.assertEqual(values, [True, False])
+
+    def test_if_expression(self) -> None:
+        program: Program = self._parse('if (x < y) { x } else { y; z }')
+
+        if_expression = cast(If, cast(ExpressionStatement, program.statements[0]).expression)
+        self.assertIsInstance(if_expression, If)
+        self.assertEqual(str(if_expression.condition), '(x < y)')
+        assert if_expression.consequence and if_expression.alternative
+        self.assertEqual(len(if_expression.consequence.statements), 1)
+        self.assertEqual(len(if_expression.alternative.statements), 2)
+
+        program = self._parse('if (x) { }')
+        if_expression = cast(If, cast(ExpressionStatement, program.statements[0]).expression)
+        self.assertIsNone(if_expression.alternative)
+        self.assertEqual(str(if_expression), 'if (x) {}')
+
+    def test_function_literal(self) -> None:
+        for source, expected_parameters in [('func() {};', []),
+                                            ('func(x) {};', ['x']),
+                                            ('func(x, y, z) { return x + y; };', ['x', 'y', 'z'])]:
+            program: Program = self._parse(source)
+
+            function = cast(Function, cast(ExpressionStatement, program.statements[0]).expression)
+            self.assertIsInstance(function, Function)
+            self.assertEqual([parameter.value for parameter in function.parameters], expected_parameters)
+
+    def test_call_expression(self) -> None:
+        program: Program = self._parse('add(1, 2 * 3, 4 + 5);')
+
+        call = cast(Call, cast(ExpressionStatement, program.statements[0]).expression)
+        self.assertIsInstance(call, Call)
+        self.assertEqual(str(call.function), 'add')
+        self.assertEqual([str(argument) for argument in call.arguments], ['1', '(2 * 3)', '(4 + 5)'])
+
+    def test_function_errors(self) -> None:
+        for source in ['func(1) {}', 'func(x { x }', 'add(1, 2', 'func(x) { x']:
+            parser: Parser = Parser(Lexer(source))
+            parser.parse_program()
+
+            self.assertTrue(parser.errors, source)
+
+    def test_operator_after_failed_prefix(self) -> None:
+        for source in ['(*(*', 'f(*)+1;', 'f(1, *)(2);']:
+            parser: Parser = Parser(Lexer(source))
+            parser.parse_program()
+
+            self.assertTrue(parser.errors, source)
+
+    def test_import_statement(self) -> None:
+        program: Program = self._parse('import math; import strings\nvar x = 1;')
+
+        imports = cast(List[ImportStatement], program.statements[:2])
+        self.assertEqual([statement.token.literal for statement in imports], ['import', 'import'])
+        self.assertEqual([str(statement.module) for statement in imports], ['math', 'strings'])
+        self.assertEqual(str(program), 'import math;import strings;var x = 1;')
+
+    def test_import_errors(self) -> None:
+        tests: List[Tuple[str, str]] = [
+            ('import 5;', 'The expected token was TokenType.IDENT but got TokenType.INT at line 1, column 8'),
+            ('var x = 1;\nimport math;', 'The imports have to come before the other statements at line 2, column 1'),
+            ('func() { import math; };', 'The imports have to be at the top level at line 1, column 10'),
+        ]
+        for source, expected in tests:
+            parser: Parser = Parser(Lexer(source))
+            program: Program = parser.parse_program()
+
+            self.assertEqual(parser.errors[0], expected)
+            self.assertFalse(any(isinstance(statement, ImportStatement) for statement in program.statements))
+
+    def test_reset(self) -> None:
+        lexer: Lexer = Lexer('var x 5;')
+        parser: Parser = Parser(lexer)
+        parser.parse_program()
+        errors = parser.errors
+
+        parser.reset('a + b;')
+        program: Program = parser.parse_program()
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(parser.errors, [])
+        self.assertEqual(str(program), '(a + b)')
+
+        parser.reset(Lexer('-c;'))
+        self.assertEqual(str(parser.parse_program()), '(-c)')
+
+    def test_parse_many(self) -> None:
+        sources: List[str] = ['1 + 2;', 'var x 5;', 'var y = -x;']
+
+        results = [(str(program), len(errors)) for program, errors in parse_many(sources)]
+
+        self.assertEqual(results, [('(1 + 2)', 0), ('5', 1), ('var y = (-x);', 0)])
+
+    def test_dispatch_tables_built_once(self) -> None:
+        Parser(Lexer('x;'))
+        prefix_parse_fns = Parser._prefix_parse_fns
+
+        Parser(Lexer('y;'))
+
+        self.assertIs(Parser._prefix_parse_fns, prefix_parse_fns)
+
+    def _parse(self, source: str) -> Program:
+        parser: Parser = Parser(Lexer(source))
+        program: Program = parser.parse_program()
+        self.assertEqual(parser.errors, [])
+        return program
+
     def _test_infix_expression(self,
                                expression: Expression,
                                expected_left: Any,
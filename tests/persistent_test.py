@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from src.evaluator.evaluator import evaluate
+from src.evaluator.persistent import PersistentEnvironment, PersistentMap
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser
+
+
+class Colliding:
+    """
+    Key whose hash is chosen by the test, for the collision nodes.
+    """
+
+    def __init__(self, name: str, hash_: int) -> None:
+        self.name = name
+        self.hash = hash_
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Colliding) and other.name == self.name
+
+    def __hash__(self) -> int:
+        return self.hash
+
+
+class PersistentMapTest(TestCase):
+
+    def test_versions(self) -> None:
+        versions = [PersistentMap()]
+        for index in range(2000):
+            versions.append(versions[-1].set(f'x{index}', index))
+
+        self.assertEqual(len(versions[-1]), 2000)
+        self.assertEqual(len(versions[1000]), 1000)
+        self.assertEqual(versions[1000]['x999'], 999)
+        self.assertNotIn('x1000', versions[1000])
+        self.assertEqual(dict(versions[-1]), {f'x{index}': index for index in range(2000)})
+
+    def test_replace(self) -> None:
+        first = PersistentMap().set('a', 1).set('b', 2)
+
+        second = first.set('a', 3)
+
+        self.assertEqual(dict(first), {'a': 1, 'b': 2})
+        self.assertEqual(dict(second), {'a': 3, 'b': 2})
+        self.assertIs(second.set('a', 3), second)
+        with self.assertRaises(KeyError):
+            second['c']
+
+    def test_collisions(self) -> None:
+        keys = [Colliding(str(index), index % 3) for index in range(12)] + [Colliding('negative', -1)]
+        mapping = PersistentMap()
+        for index, key in enumerate(keys):
+            mapping = mapping.set(key, index)
+        replaced = mapping.set(Colliding('4', 1), 'four')
+
+        self.assertEqual(len(replaced), 13)
+        self.assertEqual(mapping[Colliding('4', 1)], 4)
+        self.assertEqual(replaced[Colliding('4', 1)], 'four')
+        self.assertEqual(replaced[Colliding('negative', -1)], 12)
+        self.assertNotIn(Colliding('12', 0), replaced)
+
+
+class PersistentEnvironmentTest(TestCase):
+
+    def test_snapshot_and_restore(self) -> None:
+        environment = PersistentEnvironment()
+        run = lambda source: evaluate(Parser(Lexer(source)).parse_program(), environment)
+
+        run('var count = func(n) { if (n == 0) { return 0; } return count(n - 1); }; var x = 1;')
+        snapshot = environment.snapshot()
+        run('var x = 2; var y = 3;')
+
+        self.assertEqual(run('count(100) + x + y'), 5)
+
+        environment.restore(snapshot)
+
+        self.assertEqual(run('count(100) + x'), 1)
+        self.assertEqual(len(environment.snapshot()), 2)
@@ -0,0 +1,81 @@
+from os.path import join
+from tempfile import TemporaryDirectory
+from typing import Dict
+from unittest import TestCase
+
+from src.cli import run
+from src.evaluator.profiler import Profiler, ProfileRow
+from src.lexer.lexer import Lexer
+from src.parser.parser import Parser
+
+SOURCE: str = '''var fib = func(n) {
+  if (n < 2) { return n; }
+  return fib(n - 1) + fib(n - 2);
+};
+var count = func(n) { if (n == 0) { return 0; } return count(n - 1); };
+count(20000);
+fib(16);
+'''
+
+
+def profile(source: str, **options: object) -> Profiler:
+    profiler = Profiler(source, interval=0.0005, memo_size=0, **options)
+    profiler.run(Parser(Lexer(source)).parse_program())
+    return profiler
+
+
+class ProfilerTest(TestCase):
+
+    def test_counts(self) -> None:
+        profiler = profile(SOURCE)
+
+        rows: Dict[str, ProfileRow] = {row.position: row for row in profiler.profile.rows()}
+        self.assertEqual((rows['1:11'].kind, rows['1:11'].label, rows['1:11'].executions), ('function', 'fib (1:11)', 3193))
+        self.assertEqual(rows['5:13'].label, 'count (5:13)')
+        self.assertEqual(rows['5:13'].executions, 20001)
+        self.assertEqual(rows['3:3'].executions, 1596)
+        self.assertEqual(rows['3:3'].label, 'return (fib((n - 1)) + fib((n - 2)));')
+        self.assertEqual(rows['7:1'].executions, 1)
+
+    def test_samples(self) -> None:
+        profiler = profile(SOURCE)
+
+        self.assertTrue(profiler.profile.samples)
+        rows = profiler.profile.rows()
+        self.assertGreater(sum(row.self_seconds for row in rows if row.kind == 'function'), 0)
+        for row in rows:
+            self.assertGreaterEqual(row.total_seconds, row.self_seconds - 1e-9)
+
+    def test_tail_calls_keep_the_stack_flat(self) -> None:
+        profiler = profile('var count = func(n) { if (n == 0) { return 0; } return count(n - 1); };\n'
+                           'count(50000);')
+
+        for line in profiler.profile.collapsed():
+            self.assertLessEqual(line.count('count (1:13)'), 1, line)
+
+    def test_collapsed(self) -> None:
+        profiler = profile(SOURCE)
+
+        lines = profiler.profile.collapsed()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith('<program>;line '), line)
+            self.assertGreater(int(count), 0)
+
+    def test_flat(self) -> None:
+        flat = profile(SOURCE).profile.flat().splitlines()
+
+        self.assertEqual(flat[0].split(), ['self', 'ms', 'total', 'ms', 'count', 'position', 'kind', 'source'])
+        self.assertIn('samples', flat[-1])
+
+    def test_run_command(self) -> None:
+        with TemporaryDirectory() as directory:
+            path = join(directory, 'fib.lang')
+            collapsed = join(directory, 'fib.folded')
+            with open(path, 'w', encoding='utf-8') as source_file:
+                source_file.write(SOURCE)
+
+            self.assertEqual(run(['run', '--collapsed', collapsed, path]), 0)
+            with open(collapsed, encoding='utf-8') as collapsed_file:
+                self.assertTrue(collapsed_file.read().startswith('<program>;'))
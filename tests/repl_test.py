@@ -0,0 +1,168 @@
+from io import StringIO
+from unittest import TestCase
+
+from src.lexer.repl import Repl, run_batch
+
+
+class ReplTest(TestCase):
+
+    def test_run(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed('var x = 1 + 2 * 3;')
+        repl.feed('x * 2')
+        repl.feed('x == 7')
+
+        self.assertEqual(output.getvalue(), '14\ntrue\n')
+
+    def test_evaluation_error(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed('1 +\n2 * y;')
+
+        self.assertEqual(repl.errors, 1)
+        self.assertEqual(output.getvalue(), 'Error: Unknown identifier y at line 2, column 5\n')
+
+    def test_format_command(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed(':format')
+        repl.feed('var x = 1 + 2 * y;')
+
+        self.assertEqual(output.getvalue(), 'var x = 1 + 2 * y;\n')
+
+    def test_multi_line_input(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed('var inc = func(x) {')
+        self.assertTrue(repl.pending)
+        repl.feed('    x + 1')
+        self.assertTrue(repl.pending)
+        self.assertEqual(output.getvalue(), '')
+
+        repl.feed('};')
+        self.assertFalse(repl.pending)
+        repl.feed('inc(41)')
+        self.assertEqual(output.getvalue(), '42\n')
+
+    def test_time_command(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed(':time')
+        repl.feed('x;')
+        repl.feed(':time')
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], 'Nothing was run yet')
+        self.assertTrue(lines[2].startswith('lex '))
+        self.assertIn(' parse ', lines[2])
+        self.assertIn(' eval ', lines[2])
+        self.assertIn(' total ', lines[2])
+
+    def test_tokens_command(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed(':tokens')
+        repl.feed('x;')
+
+        self.assertEqual(output.getvalue(),
+                         'Type: TokenType.IDENT, Literal: x\nType: TokenType.SEMICOLON, Literal: ;\n')
+
+    def test_memo_command(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed(':memo')
+        repl.feed('var double = func(x) { x * 2 };')
+        repl.feed('double(2) + double(2)')
+        repl.feed(':memo')
+
+        self.assertEqual(output.getvalue().splitlines(), [
+            'No memoized functions',
+            '8',
+            'double: 1 hits, 1 misses, 1/1024 cached',
+        ])
+
+    def test_snapshot_commands(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed('var x = 1;')
+        repl.feed(':snapshot')
+        repl.feed('var x = 2; var y = 3;')
+        repl.feed(':snapshot later')
+        repl.feed(':restore 1')
+        repl.feed('x')
+        repl.feed('y')
+        repl.feed(':restore later')
+        repl.feed('x + y')
+        repl.feed(':restore missing')
+        repl.feed(':restore')
+
+        self.assertEqual(output.getvalue().splitlines(), [
+            'Snapshot 1: 1 names',
+            'Snapshot later: 2 names',
+            '1',
+            'Error: Unknown identifier y at line 1, column 1',
+            '5',
+            'Unknown snapshot missing',
+            'Usage: :restore name',
+        ])
+
+    def test_deep_nesting(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed('(' * 3000 + '1' + ')' * 3000 + ';')
+        repl.feed('1 + 1;')
+
+        self.assertEqual(output.getvalue().splitlines(), ['Error: Maximum recursion depth exceeded while parsing', '2'])
+        self.assertEqual(repl.errors, 1)
+
+    def test_unnamed_snapshots(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed(':snapshot 2')
+        repl.feed('var x = 1;')
+        repl.feed(':snapshot')
+        repl.feed(':snapshot')
+        repl.feed(':restore 2')
+        repl.feed('x')
+
+        self.assertEqual(output.getvalue().splitlines(), [
+            'Snapshot 2: 0 names',
+            'Snapshot 1: 1 names',
+            'Snapshot 3: 1 names',
+            'Error: Unknown identifier x at line 1, column 1',
+        ])
+
+    def test_long_integers(self) -> None:
+        output = StringIO()
+        repl = Repl(output)
+
+        repl.feed('var x = 1' + '0' * 5000 + ';')
+        repl.feed('x * 3')
+        repl.feed(':format')
+        repl.feed('x;')
+
+        self.assertEqual(output.getvalue().splitlines(), ['3' + '0' * 5000, 'x;'])
+        self.assertEqual(repl.errors, 0)
+
+    def test_batch(self) -> None:
+        output = StringIO()
+        lines = ['var x = 1;\n', 'var y 2;\n', '(x\n', '+ 2);\n', 'exit()\n', 'ignored;\n']
+
+        errors = run_batch(lines, output)
+
+        self.assertEqual(errors, 1)
+        self.assertEqual(output.getvalue().splitlines(), [
+            'Error: The expected token was TokenType.ASSIGN but got TokenType.INT at line 1, column 7',
+            '3',
+        ])
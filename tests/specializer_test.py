@@ -0,0 +1,112 @@
+from random import Random
+from typing import Dict, List, Tuple
+from unittest import TestCase
+
+from src.evaluator.evaluator import EvaluationError, evaluate
+from src.evaluator.objects import Environment, Value
+from src.evaluator.specializer import SpecializationCache, binding_key, specialize
+from src.parser.ast import Program
+from tests.helpers import parse
+
+
+def run(program: Program, bindings: Dict[str, Value]) -> object:
+    try:
+        return evaluate(program, Environment(dict(bindings)))
+    except EvaluationError as error:
+        return error.message
+
+
+class SpecializerTest(TestCase):
+
+    def test_residual_programs(self) -> None:
+        tests: List[Tuple[str, Dict[str, Value], str]] = [
+            ('var rate = base * 2; var fee = rate + 3; var f = func(x) { x * rate + fee }; f(amount);',
+             {'base': 5, 'amount': 7},
+             'var f = func(x) { ((x * 10) + 13) };f(7)'),
+            ('-a + b * 2 == 10;', {'a': 2, 'b': 6}, 'true'),
+            ('!x;', {'x': 0}, 'true'),
+            ('a + b;', {'a': 1}, '(1 + b)'),
+            ('var h = func(scale) { scale * 2 }; h(4) + scale;', {'scale': 10},
+             'var h = func(scale) { (scale * 2) };(h(4) + 10)'),
+            ('var unused = 5 * 5; var keep = func() {}; 1 + 1;', {}, '2'),
+            ('var last = n;', {'n': 1}, 'var last = 1;'),
+        ]
+        for source, bindings, expected in tests:
+            self.assertEqual(str(specialize(parse(source), bindings)), expected, source)
+
+    def test_errors_are_kept(self) -> None:
+        for source in ['1 / zero;', '-flag;', 'flag + 1;', 'zero == flag;']:
+            residual = specialize(parse(source), {'zero': 0, 'flag': True})
+
+            self.assertEqual(run(residual, {'zero': 0, 'flag': True}), run(parse(source), {'zero': 0, 'flag': True}))
+
+    def test_names_that_change(self) -> None:
+        tests: List[Tuple[str, Dict[str, Value], str]] = [
+            ('var f = func(x) { x + limit }; var limit = 3; f(1);', {'limit': 10},
+             'var f = func(x) { (x + limit) };var limit = 3;f(1)'),
+            ('var g = func() { n }; var n = 1; var n = 2; g();', {}, 'var g = func() { n };var n = 1;var n = 2;g()'),
+            ('if (c) { var k = 1; } else { var k = 2; }; k * 3;', {'c': True},
+             'if (true) { var k = 1; } else { var k = 2; }(k * 3)'),
+            ('var f = func() { var y = 2; y * x }; f();', {'x': 4}, 'var f = func() { var y = 2; (y * 4) };f()'),
+        ]
+        for source, bindings, expected in tests:
+            residual = specialize(parse(source), bindings)
+
+            self.assertEqual(str(residual), expected, source)
+            self.assertEqual(run(residual, bindings), run(parse(source), bindings), source)
+
+    def test_imports(self) -> None:
+        modules = {'numbers': parse('var two = 2;')}
+        tests: List[Tuple[str, str]] = [
+            ('import numbers; two + 1;', 'import numbers;(two + 1)'),
+            ('import numbers; var f = func() { two }; f() + 1;', 'import numbers;var f = func() { two };(f() + 1)'),
+            ('import numbers; var one = 1; var g = func() { one }; g() + two;',
+             'import numbers;var g = func() { 1 };(g() + two)'),
+        ]
+        for source, expected in tests:
+            residual = specialize(parse(source), {'two': 10})
+
+            self.assertEqual(str(residual), expected, source)
+            self.assertEqual(evaluate(residual, Environment({'two': 10}), modules=modules),
+                             evaluate(parse(source), Environment({'two': 10}), modules=modules), source)
+
+    def test_program_not_modified(self) -> None:
+        program = parse('var f = func(x) { x + a }; f(a * 2);')
+
+        specialize(program, {'a': 3})
+
+        self.assertEqual(str(program), 'var f = func(x) { (x + a) };f((a * 2))')
+
+    def test_same_results(self) -> None:
+        random = Random(4)
+        source = '''
+            var scale = a * 3 - b;
+            var clamp = func(x) { if (x > limit) { return limit; } x };
+            var step = func(n, acc) { if (n == 0) { return acc; } step(n - 1, acc + clamp(n * scale)) };
+            if (enabled) { step(b, 0) } else { -a / (b + 1) };
+        '''
+        program = parse(source)
+        for _ in range(50):
+            bindings: Dict[str, Value] = {'a': random.randint(-5, 5), 'b': random.randint(0, 9),
+                                          'limit': random.randint(0, 30), 'enabled': random.random() < 0.5}
+
+            self.assertEqual(run(specialize(program, bindings), bindings), run(program, bindings), bindings)
+
+
+class SpecializationCacheTest(TestCase):
+
+    def test_cached_per_binding_set(self) -> None:
+        cache = SpecializationCache(parse('var y = x * 2; y + z;'))
+
+        first = cache.specialize({'x': 1, 'z': 1})
+        self.assertIs(cache.specialize({'z': 1, 'x': 1}), first)
+        self.assertIsNot(cache.specialize({'x': True, 'z': 1}), first)
+        self.assertEqual(cache.run({'x': 4, 'z': 1}), 9)
+
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 3, 3))
+
+    def test_binding_key(self) -> None:
+        self.assertEqual(binding_key({'b': 2, 'a': 1}), binding_key({'a': 1, 'b': 2}))
+        self.assertNotEqual(binding_key({'a': 1}), binding_key({'a': True}))
+        self.assertEqual(binding_key({'a': 1, 'f': None}), binding_key({'a': 1}))
@@ -0,0 +1,109 @@
+from typing import cast
+from unittest import TestCase, skipIf
+
+from src.evaluator.vectorized import (
+    compile_expression,
+    evaluate_batch,
+    evaluate_chunks,
+    evaluate_row,
+    np,
+)
+from src.lexer.lexer import Lexer
+from src.parser.ast import Expression, ExpressionStatement
+from src.parser.parser import Parser
+
+
+def parse_expression(source: str) -> Expression:
+    statement = cast(ExpressionStatement, Parser(Lexer(source)).parse_program().statements[0])
+    assert statement.expression
+    return statement.expression
+
+
+class CompileExpressionTest(TestCase):
+
+    def test_postfix_order(self) -> None:
+        compiled = compile_expression(parse_expression('a + 2 * -b'))
+
+        self.assertEqual([argument for _, argument in compiled.instructions],
+                         ['a', 2, 'b', '-', '*', '+'])
+        self.assertEqual(compiled.names, ('a', 'b'))
+
+    def test_evaluate_row(self) -> None:
+        expression = parse_expression('x * 2 - 7 / y > 0')
+
+        self.assertIs(evaluate_row(expression, {'x': 1, 'y': -2}), True)
+        self.assertIs(evaluate_row(expression, {'x': -3, 'y': 2}), False)
+        self.assertIs(evaluate_row(parse_expression('!0'), {}), True)
+        with self.assertRaises(TypeError):
+            evaluate_row(parse_expression('x < 1 == 1'), {'x': 0})
+        with self.assertRaises(ZeroDivisionError):
+            evaluate_row(parse_expression('1 / x'), {'x': 0})
+
+
+@skipIf(np is None, 'NumPy is not installed')
+class EvaluateBatchTest(TestCase):
+
+    def test_arithmetic(self) -> None:
+        columns = {'x': np.array([7, -7, 3, 0]), 'y': np.array([2, 2, -1, 5])}
+
+        result = evaluate_batch(parse_expression('x / y + x * -y'), columns)
+
+        self.assertEqual(result.tolist(), [-11, 10, 0, 0])
+
+    def test_comparisons(self) -> None:
+        columns = {'x': np.arange(5)}
+
+        result = evaluate_batch(parse_expression('x > 1 == x < 4'), columns)
+
+        self.assertEqual(result.dtype, np.bool_)
+        self.assertEqual(result.tolist(), [False, False, True, True, False])
+
+    def test_matches_row_evaluation(self) -> None:
+        expression = parse_expression('a * b - c / 3 > 10 != !a')
+        generator = np.random.default_rng(1)
+        columns = {name: generator.integers(-50, 50, 1000) for name in 'abc'}
+        columns['c'][columns['c'] == 0] = 1
+
+        result = evaluate_batch(expression, columns, chunk_size=128)
+
+        for index in range(1000):
+            row = {name: int(column[index]) for name, column in columns.items()}
+            self.assertEqual(result[index], evaluate_row(expression, row))
+
+    def test_chunks(self) -> None:
+        columns = {'x': np.arange(10)}
+
+        chunks = list(evaluate_chunks(parse_expression('x * 2'), columns, chunk_size=4))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+        self.assertEqual(np.concatenate(chunks).tolist(), list(range(0, 20, 2)))
+
+    def test_constant_expression(self) -> None:
+        result = evaluate_batch(parse_expression('1 + 2'), {'x': np.arange(3)})
+
+        self.assertEqual(result.tolist(), [3, 3, 3])
+
+    def test_integer_columns(self) -> None:
+        small = {'x': np.array([100, -3], dtype=np.int8)}
+        unsigned = {'x': np.array([2 ** 63 - 2, 0], dtype=np.uint64)}
+
+        self.assertEqual(evaluate_batch(parse_expression('x * x'), small).tolist(), [10000, 9])
+        result = evaluate_batch(parse_expression('x + 1'), unsigned)
+        self.assertEqual(result.dtype, np.int64)
+        self.assertEqual(result.tolist(), [2 ** 63 - 1, 1])
+        with self.assertRaisesRegex(OverflowError, 'do not fit in int64'):
+            evaluate_batch(parse_expression('x + 1'), {'x': np.array([2 ** 64 - 1], dtype=np.uint64)})
+
+    def test_errors(self) -> None:
+        columns = {'x': np.array([1, 0]), 'flag': np.array([True, False])}
+
+        with self.assertRaises(ZeroDivisionError):
+            evaluate_batch(parse_expression('1 / x'), columns)
+        with self.assertRaises(TypeError):
+            evaluate_batch(parse_expression('flag + 1'), columns)
+        with self.assertRaises(NameError):
+            evaluate_batch(parse_expression('missing'), columns)
+        with self.assertRaises(ValueError):
+            evaluate_batch(parse_expression('x'), {'x': np.arange(2), 'y': np.arange(3)})
+        with self.assertRaisesRegex(OverflowError, 'does not fit in int64'):
+            evaluate_batch(parse_expression('x + 9223372036854775808'), columns)
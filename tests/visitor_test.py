@@ -0,0 +1,101 @@
+from typing import List, Optional
+from unittest import TestCase
+
+from src.lexer.token import Token, TokenType
+from src.parser.ast import (
+    ASTNode,
+    Expression,
+    ExpressionStatement,
+    Identifier,
+    Infix,
+    Integer,
+    Prefix,
+)
+from src.parser.visitor import SKIP, NodeTransformer, NodeVisitor, children
+from tests.helpers import parse
+
+
+class NameCollector(NodeVisitor):
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.expressions: int = 0
+
+    def visit_Identifier(self, node: Identifier) -> None:
+        self.names.append(node.value)
+
+    def visit_Expression(self, node: Expression) -> None:
+        self.expressions += 1
+
+
+class PrefixSkipper(NameCollector):
+
+    def visit_Prefix(self, node: Prefix) -> object:
+        return SKIP
+
+
+class IntegerFolder(NodeTransformer):
+
+    def visit_Infix(self, node: Infix) -> Expression:
+        if isinstance(node.left, Integer) and isinstance(node.right, Integer) and node.operator == '+':
+            assert node.left.value is not None and node.right.value is not None
+            value = node.left.value + node.right.value
+            return Integer(token=Token(TokenType.INT, str(value)), value=value)
+        return node
+
+    def visit_ExpressionStatement(self, node: ExpressionStatement) -> Optional[ExpressionStatement]:
+        if isinstance(node.expression, Identifier) and node.expression.value == 'drop':
+            return None
+        return node
+
+
+class NodeVisitorTest(TestCase):
+
+    def test_visit_order(self) -> None:
+        collector = NameCollector()
+
+        collector.visit(parse('a + b * c; -d; e;'))
+
+        self.assertEqual(collector.names, ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(collector.expressions, 3)
+
+    def test_skip(self) -> None:
+        collector = PrefixSkipper()
+
+        collector.visit(parse('a + -b; !c; d;'))
+
+        self.assertEqual(collector.names, ['a', 'd'])
+
+    def test_dispatch_table_per_class(self) -> None:
+        NameCollector().visit(parse('-a;'))
+        PrefixSkipper().visit(parse('-a;'))
+
+        self.assertIs(NameCollector._dispatch_table[Prefix][0], NameCollector.visit_Expression)
+        self.assertIs(PrefixSkipper._dispatch_table[Prefix][0], PrefixSkipper.visit_Prefix)
+        self.assertNotIn(Prefix, NodeVisitor._dispatch_table)
+
+    def test_deep_tree(self) -> None:
+        collector = NameCollector()
+
+        collector.visit(parse(' + '.join(['x'] * 5000) + ';'))
+
+        self.assertEqual(len(collector.names), 5000)
+
+
+class NodeTransformerTest(TestCase):
+
+    def test_replace_bottom_up(self) -> None:
+        program = parse('1 + 2 + 3; x + 1 + 2; drop; 4 + 5;')
+
+        result = IntegerFolder().transform(program)
+
+        self.assertIs(result, program)
+        self.assertEqual(str(program), '6((x + 1) + 2)9')
+
+    def test_children(self) -> None:
+        program = parse('a + b;')
+        statement = program.statements[0]
+        nodes: List[ASTNode] = children(program)
+
+        self.assertEqual(nodes, [statement])
+        self.assertEqual([str(node) for node in children(children(statement)[0])], ['a', 'b'])